@@ -0,0 +1,569 @@
+"""
+aio.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Running heavy matrix operations off the calling thread, so that an event loop ( or any
+other latency sensitive caller ) is not blocked by them.
+
+Call: job = aio.inverse( mat ); ...; result = job.result( )
+	or, from an asyncio coroutine, result = await aio.inverse( mat )
+
+Jobs are run by a jobQueue, in worker threads or ( with kind = 'process' ) in a pool of
+processes. Two things keep one huge request from starving the rest:
+
+	backpressure - at most maxPending jobs may wait; submit( ) blocks, up to its
+	               timeout, while the queue is full and then raises queueFullError.
+	lanes        - jobs whose estimated cost is at least heavyCost only run on
+	               heavyWorkers of the workers, so the others stay free for small jobs,
+	               which are always taken first.
+
+Cancelling a job which has not started removes it from the queue. A running job is
+stopped at the next checkpoint( ), which the long elimination loops in this package call
+once per pivot; outside a job checkpoint( ) does nothing. Jobs running in another
+process cannot see the cancellation, so the job is abandoned instead and its result
+thrown away when it arrives.
+
+This module must not import the matrix modules at load time, since they import
+checkpoint( ) from here.
+"""
+
+import threading
+from collections import deque
+from time import time
+
+VERSION = "0.1"
+
+AIO_WORKERS = 2 # worker threads ( or processes ) in the default queue
+AIO_MAX_PENDING = 64 # jobs which may wait in the default queue before submit( ) blocks
+AIO_HEAVY_COST = 100 ** 3 # jobs with at least this estimated cost go in the heavy lane
+AIO_POLL_INTERVAL = 0.05 # seconds between cancellation checks while waiting on a process
+
+_local = threading.local( )
+_default = None # the default jobQueue, created by configure( ) or on first use
+_defaultLock = threading.Lock( )
+
+
+class cancelledError( Exception ):
+	"""
+	Raised by checkpoint( ) in a cancelled job, and by job.result( ) for a cancelled job.
+	"""
+	pass
+
+class queueFullError( Exception ):
+	"""
+	Raised by submit( ) when the queue stays full for longer than its timeout.
+	"""
+	pass
+
+class timeoutError( Exception ):
+	"""
+	Raised by job.result( ) when the job does not finish within its timeout.
+	"""
+	pass
+
+
+def checkpoint( ):
+	"""
+	Raises cancelledError if the job running in this thread has been cancelled. Long
+	loops call this once per pass; outside a job it does nothing.
+	"""
+	current = getattr( _local, 'job', None )
+	if current is not None and current.cancelled:
+		raise cancelledError( "The job was cancelled" )
+
+
+class job( object ):
+	"""
+	A submitted operation and, once it has finished, its result.
+	"""
+
+	def __init__( self, function, args, kwargs, cost, queue ):
+		"""
+		Constructor. Jobs are created by jobQueue.submit( ).
+
+		:Parameters:
+			function : function
+				The function to run
+			args : tuple
+				Its positional arguments
+			kwargs : dict
+				Its keyword arguments
+			cost : number
+				The estimated cost, which decides the lane the job runs in.
+			queue : jobQueue
+				The queue the job was submitted to.
+		"""
+		self.function = function
+		self.args = args
+		self.kwargs = kwargs
+		self.cost = cost
+		self.cancelled = False
+		self._queue = queue
+		self._lock = threading.Lock( )
+		self._finished = threading.Event( )
+		self._started = False
+		self._result = None
+		self._error = None
+		self._callbacks = list( )
+
+	def __await__( self ):
+		"""
+		Lets a job be awaited from an asyncio coroutine.
+		"""
+		return self.asFuture( ).__await__( )
+
+	def _finish( self, result, error ):
+		"""
+		Internal Function: records the outcome and runs the callbacks.
+		"""
+		with self._lock:
+			if self._finished.isSet( ):
+				return
+			self._result, self._error = result, error
+			self._finished.set( )
+			callbacks, self._callbacks = self._callbacks, list( )
+		for callback in callbacks:
+			callback( self )
+
+	def _run( self, pool ):
+		"""
+		Internal Function: runs the job in this thread, or in the process pool if there
+		is one.
+		"""
+		with self._lock:
+			if self.cancelled:
+				return
+			self._started = True
+		result = error = None
+		try:
+			if pool is None:
+				_local.job = self
+				try:
+					result = self.function( *self.args, **self.kwargs )
+				finally:
+					_local.job = None
+			else:
+				pending = pool.apply_async( self.function, self.args, self.kwargs )
+				while not pending.ready( ):
+					pending.wait( AIO_POLL_INTERVAL )
+					if self.cancelled:
+						raise cancelledError( "The job was cancelled" )
+				result = pending.get( )
+		except Exception as e:
+			error = e
+		self._finish( result, error )
+
+	def addDoneCallback( self, callback ):
+		"""
+		Arranges for a function to be called with this job when it finishes. It is called
+		at once if the job has already finished, and otherwise in the worker thread.
+
+		:Parameters:
+			callback : function
+				The function to call
+		"""
+		with self._lock:
+			if not self._finished.isSet( ):
+				self._callbacks.append( callback )
+				return
+		callback( self )
+
+	def asFuture( self, loop = None ):
+		"""
+		An asyncio future which is resolved, in the loop's thread, when this job finishes.
+		Needs the asyncio module.
+
+		:Parameters:
+			loop : asyncio.AbstractEventLoop
+				The event loop to resolve the future in. Defaults to the current loop.
+
+		:rtype: asyncio.Future
+		:returns: A future for the result of this job.
+		"""
+		import asyncio
+		if loop is None:
+			loop = asyncio.get_event_loop( )
+		future = loop.create_future( )
+
+		def resolve( finished ):
+			if future.cancelled( ):
+				return
+			if finished._error is not None:
+				future.set_exception( finished._error )
+			else:
+				future.set_result( finished._result )
+
+		def cancelled( f ):
+			if f.cancelled( ):
+				self.cancel( )
+
+		future.add_done_callback( cancelled )
+		self.addDoneCallback( lambda finished: loop.call_soon_threadsafe( resolve, finished ) )
+		return future
+
+	def cancel( self ):
+		"""
+		Cancels the job. A job which has not started is taken out of the queue; a running
+		one stops at its next checkpoint( ).
+
+		:rtype: boolean
+		:returns: False if the job had already finished.
+		"""
+		with self._lock:
+			if self._finished.isSet( ):
+				return False
+			self.cancelled = True
+			started = self._started
+		if not started:
+			self._queue._discard( self )
+			self._finish( None, cancelledError( "The job was cancelled" ) )
+		return True
+
+	def done( self ):
+		"""
+		Checks whether the job has finished, been cancelled or failed.
+
+		:rtype: boolean
+		:returns: True if the job has finished.
+		"""
+		return self._finished.isSet( )
+
+	def result( self, timeout = None ):
+		"""
+		Waits for the job to finish.
+
+		:Parameters:
+			timeout : float
+				The longest time to wait, in seconds. Waits for ever by default.
+
+		:rtype: object
+		:returns: The value the job's function returned. If it raised an exception, \
+		or the job was cancelled, that exception is raised here instead, and \
+		timeoutError is raised if it does not finish in time.
+		"""
+		if not self._finished.wait( timeout ):
+			raise timeoutError( "The job did not finish in time" )
+		if self._error is not None:
+			raise self._error
+		return self._result
+
+
+class jobQueue( object ):
+	"""
+	A queue of jobs with a fixed set of workers, a limit on waiting jobs and a separate
+	lane for heavy jobs.
+	"""
+
+	def __init__( self, workers = AIO_WORKERS, maxPending = AIO_MAX_PENDING, kind = 'thread',
+		heavyWorkers = None, heavyCost = AIO_HEAVY_COST ):
+		"""
+		Constructor.
+
+		:Parameters:
+			workers : int
+				The number of worker threads, and of processes if kind is 'process'.
+			maxPending : int
+				The most jobs which may wait to be run.
+			kind : string
+				'thread' to run jobs in the worker threads, or 'process' to run them in a \
+				pool of processes ( the function and its arguments must be picklable ).
+			heavyWorkers : int
+				The most workers which may run heavy jobs at once. Defaults to all but one.
+			heavyCost : number
+				The estimated cost at which a job counts as heavy.
+		"""
+		if ( workers < 1 ):
+			raise ValueError( "A job queue needs at least one worker" )
+		if not ( kind in ( 'thread', 'process' ) ):
+			raise ValueError( "Unknown job queue kind: %r" % ( kind, ) )
+		if heavyWorkers is None:
+			heavyWorkers = max( 1, workers - 1 )
+		self.workers = workers
+		self.maxPending = maxPending
+		self.kind = kind
+		self.heavyWorkers = heavyWorkers
+		self.heavyCost = heavyCost
+		self._light = deque( )
+		self._heavy = deque( )
+		self._heavyRunning = 0
+		self._condition = threading.Condition( )
+		self._closed = False
+		self._pool = None
+		if ( kind == 'process' ):
+			import multiprocessing
+			self._pool = multiprocessing.Pool( workers )
+		self._threads = list( )
+		for i in xrange( workers ):
+			thread = threading.Thread( target = self._work, name = 'aio-worker-%d' % i )
+			thread.daemon = True
+			thread.start( )
+			self._threads.append( thread )
+
+	def __getattr__( self, name ):
+		"""
+		Get attribute.
+
+		Call: queue.pending
+
+		:rtype: int
+		:returns: The number of jobs waiting to be run.
+		"""
+		if name == 'pending':
+			return len( self._light ) + len( self._heavy )
+		raise AttributeError( name )
+
+	def _discard( self, cancelled ):
+		"""
+		Internal Function: takes a cancelled job out of the queue, if it is still there.
+		"""
+		with self._condition:
+			for lane in ( self._light, self._heavy ):
+				try:
+					lane.remove( cancelled )
+				except ValueError:
+					continue
+				self._condition.notifyAll( )
+				return
+
+	def _next( self ):
+		"""
+		Internal Function: waits for the next job a worker may run. Small jobs are taken
+		first, and heavy ones only while fewer than heavyWorkers are running.
+
+		:rtype: tuple
+		:returns: The job and whether it is heavy, or None when the queue is closed.
+		"""
+		with self._condition:
+			while True:
+				if self._light:
+					self._condition.notifyAll( )
+					return self._light.popleft( ), False
+				if self._heavy and ( self._heavyRunning < self.heavyWorkers ):
+					self._heavyRunning += 1
+					self._condition.notifyAll( )
+					return self._heavy.popleft( ), True
+				if self._closed:
+					return None
+				self._condition.wait( )
+
+	def _work( self ):
+		"""
+		Internal Function: the worker thread.
+		"""
+		while True:
+			task = self._next( )
+			if task is None:
+				return
+			current, heavy = task
+			try:
+				current._run( self._pool )
+			finally:
+				if heavy:
+					with self._condition:
+						self._heavyRunning -= 1
+						self._condition.notifyAll( )
+
+	def close( self ):
+		"""
+		Stops the workers once the jobs already queued have run.
+		"""
+		with self._condition:
+			self._closed = True
+			self._condition.notifyAll( )
+		if self._pool is not None:
+			self._pool.close( )
+
+	def submit( self, function, args = ( ), kwargs = None, cost = 0, timeout = None ):
+		"""
+		Queues a job.
+
+		:Parameters:
+			function : function
+				The function to run
+			args : tuple
+				Its positional arguments
+			kwargs : dict
+				Its keyword arguments
+			cost : number
+				The estimated cost of the job, such as n ** 3 for an n x n elimination.
+			timeout : float
+				How long to wait, in seconds, if the queue is full. Waits for ever by \
+				default; 0 fails at once.
+
+		:rtype: job
+		:returns: The queued job.
+		"""
+		queued = job( function, tuple( args ), dict( kwargs or { } ), cost, self )
+		with self._condition:
+			if self._closed:
+				raise ValueError( "This job queue has been closed" )
+			if ( self.pending >= self.maxPending ):
+				deadline = None
+				if timeout is not None:
+					deadline = time( ) + timeout
+				while ( self.pending >= self.maxPending ):
+					remaining = None
+					if deadline is not None:
+						remaining = deadline - time( )
+						if ( remaining <= 0 ):
+							raise queueFullError( "Too many jobs are waiting" )
+					self._condition.wait( remaining )
+			if ( cost >= self.heavyCost ):
+				self._heavy.append( queued )
+			else:
+				self._light.append( queued )
+			self._condition.notifyAll( )
+		return queued
+
+
+def _cost( *values ):
+	"""
+	Internal Function: estimates the cost of an operation on matrices as the product of
+	the largest dimension of the first and the sizes of the others.
+	"""
+	first = values[ 0 ]
+	returnvalue = max( first.height, first.width ) ** 3
+	for value in values[ 1: ]:
+		if hasattr( value, 'width' ):
+			returnvalue = max( returnvalue, first.height * first.width * value.width )
+	return returnvalue
+
+def _determinant( value ):
+	"""
+	Internal Function: the determinant job; a module-level function so it can be pickled.
+	"""
+	return value.determinant( )
+
+def _inverse( value ):
+	"""
+	Internal Function: the inverse job.
+	"""
+	return value.inverse( )
+
+def _multiply( a, b ):
+	"""
+	Internal Function: the multiplication job.
+	"""
+	return a * b
+
+def _solve( value, b ):
+	"""
+	Internal Function: the solve job.
+	"""
+	return value.solve( b )
+
+def configure( workers = AIO_WORKERS, maxPending = AIO_MAX_PENDING, kind = 'thread', heavyWorkers = None,
+	heavyCost = AIO_HEAVY_COST ):
+	"""
+	Replaces the default queue used by submit( ) and the operations below. The old queue
+	finishes the jobs it already has. See jobQueue for the parameters.
+
+	:rtype: jobQueue
+	:returns: The new default queue.
+	"""
+	global _default
+	with _defaultLock:
+		old, _default = _default, jobQueue( workers, maxPending, kind, heavyWorkers, heavyCost )
+	if old is not None:
+		old.close( )
+	return _default
+
+def defaultQueue( ):
+	"""
+	The default queue, which is created with the default settings the first time it is needed.
+
+	:rtype: jobQueue
+	:returns: The default queue.
+	"""
+	global _default
+	with _defaultLock:
+		if _default is None:
+			_default = jobQueue( )
+		return _default
+
+def submit( function, args = ( ), kwargs = None, cost = 0, timeout = None ):
+	"""
+	Queues a job on the default queue ( see jobQueue.submit ).
+
+	:rtype: job
+	:returns: The queued job.
+	"""
+	return defaultQueue( ).submit( function, args, kwargs, cost, timeout )
+
+def determinant( value, timeout = None ):
+	"""
+	Finds the determinant of a matrix in the background.
+
+	:Parameters:
+		value : matrix
+			A square matrix
+		timeout : float
+			How long to wait if the queue is full.
+
+	:rtype: job
+	:returns: A job for the determinant.
+	"""
+	return submit( _determinant, ( value, ), cost = _cost( value ), timeout = timeout )
+
+def inverse( value, timeout = None ):
+	"""
+	Finds the inverse of a matrix in the background.
+
+	:Parameters:
+		value : matrix
+			A square matrix
+		timeout : float
+			How long to wait if the queue is full.
+
+	:rtype: job
+	:returns: A job for the inverse.
+	"""
+	return submit( _inverse, ( value, ), cost = _cost( value ), timeout = timeout )
+
+def multiply( a, b, timeout = None ):
+	"""
+	Multiplies two matrices in the background.
+
+	:Parameters:
+		a : matrix
+			The left factor
+		b : matrix; number
+			The right factor
+		timeout : float
+			How long to wait if the queue is full.
+
+	:rtype: job
+	:returns: A job for the product.
+	"""
+	return submit( _multiply, ( a, b ), cost = _cost( a, b ), timeout = timeout )
+
+def solve( value, b, timeout = None ):
+	"""
+	Solves value * x = b in the background ( see matrix.solve ).
+
+	:Parameters:
+		value : matrix
+			A square matrix
+		b : list; matrix
+			The right hand side
+		timeout : float
+			How long to wait if the queue is full.
+
+	:rtype: job
+	:returns: A job for the solution.
+	"""
+	return submit( _solve, ( value, b ), cost = _cost( value ), timeout = timeout )
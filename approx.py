@@ -0,0 +1,290 @@
+"""
+approx.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Floating point approximations of exact matrices, and exact results computed through them.
+
+solve, inverse and determinant do the elimination in floating point. For int and fraction
+matrices the floating point result is then turned back into the simplest nearby fractions,
+which are checked with exact integer arithmetic, so the answer is only computed exactly
+from scratch ( with the modular or echelon modules ) when the check fails. For a
+well-conditioned matrix whose solution has small denominators, this costs little more
+than the floating point elimination.
+"""
+
+from operator import mul
+import matrix as _matrix
+from matrix import matrix
+from fraction import fraction
+from primes import gcd
+from aio import checkpoint
+
+VERSION = "0.1"
+
+APPROX_TOLERANCE = 2.0 ** -30 # how far, relative to its size, a float may be from the fraction it is taken for
+APPROX_EPSILON = 2.0 ** -52
+APPROX_INFINITY = float( 'inf' )
+
+
+def _rationalize( x, tolerance ):
+	"""
+	Internal Function: the fraction with the smallest denominator within tolerance of a
+	float, found from the continued fraction expansion of the float.
+
+	:rtype: int or fraction
+	:returns: The fraction, or an int if its denominator is 1.
+	"""
+	n, d = x.as_integer_ratio( )
+	p0, q0, p1, q1 = 0, 1, 1, 0
+	while d:
+		a = n // d
+		p0, q0, p1, q1 = p1, q1, a * p1 + p0, a * q1 + q0
+		if ( abs( float( p1 ) / q1 - x ) <= tolerance ):
+			break
+		n, d = d, n - a * d
+	if ( q1 == 1 ):
+		return int( p1 )
+	return fraction( int( p1 ), int( q1 ) )
+
+def _rationalizeAll( values ):
+	"""
+	Internal Function: rationalizes a list of floats, each within APPROX_TOLERANCE of the
+	largest of them. Raises OverflowError if any of them is infinite or not a number.
+	"""
+	if [ x for x in values if not ( abs( x ) < APPROX_INFINITY ) ]:
+		raise OverflowError( "The floating point result is out of range" )
+	tolerance = APPROX_TOLERANCE * max( [ 1.0 ] + [ abs( x ) for x in values ] )
+	return [ _rationalize( x, tolerance ) for x in values ]
+
+def _scaled( values ):
+	"""
+	Internal Function: scales a list of ints and fractions to integers.
+
+	:rtype: tuple
+	:returns: The integers, and the common denominator they were multiplied by.
+	"""
+	denominator = 1
+	for x in values:
+		if ( type( x ) == fraction ):
+			d = abs( x.denominator )
+			denominator = denominator // gcd( denominator, d ) * d
+	if ( denominator == 1 ):
+		return list( values ), 1
+	return [ x.numerator * ( denominator // x.denominator ) if ( type( x ) == fraction ) else x * denominator for x in values ], denominator
+
+def _integerSystem( value ):
+	"""
+	Internal Function: scales each row of an int or fraction matrix to integers.
+
+	:rtype: tuple
+	:returns: The integer rows, and the multiplier of each row, or None if the matrix \
+	has items which are not ints or fractions.
+	"""
+	import modular
+	if isinstance( value, matrix ):
+		value = value.value
+	try:
+		rows, multipliers, scale = modular._integerRows( value, [ 1 ] * len( value ) )
+	except TypeError:
+		return None
+	return rows, multipliers
+
+def approximate( value ):
+	"""
+	Converts every fraction in a matrix to a float, in a single pass. Other items are
+	left as they are.
+
+	:Parameters:
+		value : matrix
+			A matrix ( or 2-dimensional list )
+
+	:rtype: matrix
+	:returns: A copy of the matrix with floats in place of fractions.
+	"""
+	if isinstance( value, matrix ):
+		value = value.value
+	return _matrix._fromRows( [ [ float( x ) if ( type( x ) == fraction ) else x for x in row ] for row in value ] )
+
+def determinant( value, exact = None ):
+	"""
+	Determinant, from an LU factorization in floating point. For an exact matrix the
+	float is rounded to the nearest integer multiple of one over the row multipliers
+	when the rounding error bound allows it, and the rounded value is checked modulo a
+	large prime; otherwise the exact determinant is found with the modular module.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list )
+		exact : boolean
+			Whether to return an exact determinant. By default, only for matrices of \
+			ints and fractions.
+
+	:rtype: number
+	:returns: The determinant
+	"""
+	import decompose
+	system = _integerSystem( value )
+	if exact is None:
+		exact = system is not None
+	if not exact:
+		return decompose.lu( value ).determinant( )
+	if system is None:
+		raise TypeError( "Exact results require integer or rational items" )
+	import modular
+	rows, multipliers = system
+	n = len( rows )
+	if not n:
+		return 1
+	scale = reduce( mul, multipliers, 1 )
+	try:
+		factors = decompose.lu( rows )
+		d = factors.determinant( )
+		largest = max( [ abs( x ) for row in rows for x in row ] ) or 1
+		growth = max( [ abs( factors.rows[ i ][ j ] ) for i in xrange( n ) for j in xrange( i, n ) ] ) / float( largest )
+		bounded = abs( d ) * 4 * n * max( growth, 1.0 ) * APPROX_EPSILON < 0.25
+	except OverflowError: # items beyond the range of a float
+		bounded = False
+	if bounded:
+		candidate = int( round( d ) )
+		p = modular.modularPrimes( 1 )[ 0 ]
+		if ( candidate % p == modular._determinantModP( ( rows, p ) ) ):
+			if ( scale == 1 ) or not ( candidate % scale ):
+				return candidate // scale
+			return fraction( candidate, scale )
+	return modular.determinant( value )
+
+def inverse( value, exact = None ):
+	"""
+	Inverse, from an LU factorization in floating point. For an exact matrix the result
+	is rationalized and checked by multiplying it back with integer arithmetic; if the
+	check fails the inverse is found by fraction-free elimination instead.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list )
+		exact : boolean
+			Whether to return an exact inverse. By default, only for matrices of ints \
+			and fractions.
+
+	:rtype: matrix
+	:returns: The inverse
+	"""
+	import decompose
+	system = _integerSystem( value )
+	if exact is None:
+		exact = system is not None
+	if not exact:
+		return decompose.lu( value ).inverse( )
+	if system is None:
+		raise TypeError( "Exact results require integer or rational items" )
+	rows, multipliers = system
+	n = len( rows )
+	if [ row for row in rows if not ( len( row ) == n ) ]:
+		raise ValueError( "Inverse is not defined for a non-square matrix" )
+	try:
+		factors = decompose.lu( rows )
+		columns = None
+		if not factors.singular:
+			# the inverse of the scaled rows, multiplied by the row multipliers, is the inverse
+			columns = list( )
+			for j in xrange( n ):
+				checkpoint( )
+				unit = [ 0.0 ] * n
+				unit[ j ] = 1.0
+				columns.append( _rationalizeAll( [ x * multipliers[ j ] for x in factors.solve( unit ) ] ) )
+	except OverflowError: # items beyond the range of a float
+		columns = None
+	if columns is not None:
+		integers, denominator = _scaled( [ x for column in columns for x in column ] )
+		integerColumns = [ integers[ j * n:( j + 1 ) * n ] for j in xrange( n ) ]
+		out = [ list( ) for i in xrange( n ) ]
+		_matrix._multiplyInto( rows, integerColumns, out )
+		# rows * inverse should be the diagonal matrix of multipliers
+		for i in xrange( n ):
+			expected = multipliers[ i ] * denominator
+			if [ j for j in xrange( n ) if not ( out[ i ][ j ] == ( expected if ( i == j ) else 0 ) ) ]:
+				break
+		else:
+			return _matrix._fromRows( [ list( row ) for row in zip( *columns ) ] )
+	import echelon
+	augmented = [ list( row ) + [ 0 ] * n for row in ( value.value if isinstance( value, matrix ) else value ) ]
+	for i in xrange( n ):
+		augmented[ i ][ n + i ] = 1
+	form = echelon.echelonForm( augmented )
+	if not ( form.pivots[ :n ] == tuple( xrange( n ) ) ):
+		raise ValueError( 'This matrix is not invertible' )
+	return _matrix._fromRows( [ row[ n: ] for row in form.rows ] )
+
+def solve( value, b, exact = None ):
+	"""
+	Solves the system value * x = b, from an LU factorization in floating point. For an
+	exact system the solution is rationalized and checked by substituting it back with
+	integer arithmetic; if the check fails the system is solved with the modular module.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list )
+		b : list
+			The right hand side, either a list of numbers or a matrix with one column.
+		exact : boolean
+			Whether to return an exact solution. By default, only when the matrix \
+			and b are ints and fractions.
+
+	:rtype: list or matrix
+	:returns: The solution x, as a one-column matrix if b was a matrix.
+	"""
+	import decompose
+	columnMatrix = isinstance( b, matrix )
+	if columnMatrix:
+		if not ( b.width == 1 ):
+			raise ValueError( "The right hand side must be a list or a matrix with one column" )
+		b = b.getColumn( 0 )
+	import modular
+	try:
+		rows, rhs, scale = modular._integerRows( value, b )
+	except TypeError:
+		if exact:
+			raise
+		rows = None
+	if exact is None:
+		exact = rows is not None
+	if not exact:
+		x = decompose.lu( value ).solve( list( b ) )
+	else:
+		n = len( rows )
+		if [ row for row in rows if not ( len( row ) == n ) ]:
+			raise ValueError( "Solve is only defined for a square matrix" )
+		if not ( len( rhs ) == n ):
+			raise ValueError( "The right hand side must have one item per row" )
+		x = None
+		try:
+			factors = decompose.lu( rows )
+			if not factors.singular:
+				x = _rationalizeAll( factors.solve( rhs ) )
+		except OverflowError: # items beyond the range of a float
+			x = None
+		if x is not None:
+			integers, denominator = _scaled( x )
+			for row, r in zip( rows, rhs ):
+				if not ( sum( map( mul, row, integers ) ) == r * denominator ):
+					x = None
+					break
+		if x is None:
+			x = modular.solve( value, b )
+	if columnMatrix:
+		return matrix( [ [ item ] for item in x ] )
+	return x
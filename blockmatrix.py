@@ -0,0 +1,386 @@
+"""
+blockmatrix.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Matrices assembled from blocks, which are kept as blocks.
+
+Call: blockMatrix( [ [ a, None ], [ b, c ] ] )
+
+Each block is a matrix, a structured matrix ( see the structured module ) or None for a
+block of zeros. Sums, products and transposes are worked out block by block, and any
+term with a zero block is skipped, so a large, mostly zero assembly is never formed.
+solve( ) eliminates a block at a time, using the Schur complement of each diagonal
+block. flatten( ) forms the whole matrix, and is only done when asked for.
+"""
+
+import types
+import matrix as _matrix
+from matrix import matrix
+
+VERSION = "0.1"
+
+BLOCKMATRIX_VALID_COLLECTIONS = ( types.ListType, types.TupleType )
+
+
+def _dense( block ):
+	"""
+	Internal Function: a block as an ordinary matrix.
+	"""
+	if isinstance( block, matrix ):
+		return block
+	return block.materialize( )
+
+def _add( a, b ):
+	"""
+	Internal Function: the sum of two blocks, either of which may be None.
+	"""
+	if a is None:
+		return b
+	if b is None:
+		return a
+	return _dense( a ) + _dense( b )
+
+def _pivotSolver( block ):
+	"""
+	Internal Function: a function which solves block * X = M for a matrix M. Structured
+	blocks solve directly, exact blocks through their exact inverse, and others through
+	an LU factorization in floating point.
+	"""
+	if not isinstance( block, matrix ):
+		return block.solve
+	if block._isExact( ):
+		inverse = block.inverse( )
+		return lambda value: inverse * value
+	import decompose
+	return decompose.lu( block ).solve
+
+
+class blockMatrix( object ):
+	"""
+	A matrix made of blocks. All of the blocks in a row of blocks have the same height,
+	and all of those in a column of blocks the same width.
+	"""
+
+	def __init__( self, blocks, rowSizes = None, columnSizes = None ):
+		"""
+		Constructor.
+
+		:Parameters:
+			blocks : list
+				A 2-dimensional list of blocks: matrices, structured matrices, or None \
+				for blocks of zeros.
+			rowSizes : list
+				The height of each row of blocks. Only needed for rows with no blocks \
+				other than None.
+			columnSizes : list
+				The width of each column of blocks. Only needed for columns with no \
+				blocks other than None.
+		"""
+		self.blocks = [ list( row ) for row in blocks ]
+		count = len( self.blocks[ 0 ] ) if self.blocks else 0
+		if [ row for row in self.blocks if not ( len( row ) == count ) ]:
+			raise ValueError( "Every row of blocks must have the same number of blocks" )
+		self.rowSizes = list( rowSizes ) if rowSizes else [ None ] * len( self.blocks )
+		self.columnSizes = list( columnSizes ) if columnSizes else [ None ] * count
+		for i, row in enumerate( self.blocks ):
+			for j, block in enumerate( row ):
+				if block is None:
+					continue
+				if self.rowSizes[ i ] is None:
+					self.rowSizes[ i ] = block.height
+				if self.columnSizes[ j ] is None:
+					self.columnSizes[ j ] = block.width
+				if not ( ( block.height, block.width ) == ( self.rowSizes[ i ], self.columnSizes[ j ] ) ):
+					raise ValueError( "Block %d, %d is the incorrect size" % ( i, j ) )
+		if ( None in self.rowSizes ) or ( None in self.columnSizes ):
+			raise ValueError( "The size of a row or column of zero blocks must be given" )
+
+	def __add__( self, value ):
+		"""
+		Addition, block by block. Requires the same partition into blocks.
+
+		Call: blk1 + blk2
+
+		:rtype: blockMatrix
+		:returns: The sum
+		"""
+		if not isinstance( value, blockMatrix ):
+			return NotImplemented
+		self._checkPartition( value )
+		return blockMatrix( [ [ _add( a, b ) for a, b in zip( rowA, rowB ) ] for rowA, rowB in zip( self.blocks, value.blocks ) ],
+			self.rowSizes, self.columnSizes )
+
+	def __getattr__( self, name ):
+		"""
+		Get attribute.
+
+		Call: blk.width; blk.height; blk.size; blk.shape
+
+		:rtype: int or tuple
+		:returns: The value requested. shape is the number of rows and columns of blocks.
+		"""
+		if name == 'width':
+			return sum( self.columnSizes )
+		if name == 'height':
+			return sum( self.rowSizes )
+		if name == 'size':
+			return ( self.width, self.height )
+		if name == 'shape':
+			return ( len( self.rowSizes ), len( self.columnSizes ) )
+		raise AttributeError( name )
+
+	def __mul__( self, value ):
+		"""
+		Multiplication
+
+		Call: blk * blk, blk * mat, blk * list, blk * x
+
+		:Parameters:
+			value : blockMatrix; matrix; list; number
+				What to multiply by. A matrix is split into rows of blocks to match \
+				the columns of blocks of this one, and a list is treated as a column vector.
+
+		:rtype: blockMatrix, matrix or list
+		:returns: The result of the multiplication ( Linear Algebra ), in the same form \
+		as value.
+		"""
+		if isinstance( value, blockMatrix ):
+			if not ( self.columnSizes == value.rowSizes ):
+				raise ValueError( "Matrices are not partitioned compatibly for '*'" )
+			blocks = list( )
+			for row in self.blocks:
+				newRow = list( )
+				for j in xrange( len( value.columnSizes ) ):
+					total = None
+					for a, rowB in zip( row, value.blocks ):
+						b = rowB[ j ]
+						if ( a is not None ) and ( b is not None ):
+							total = _add( total, a * b )
+					newRow.append( total )
+				blocks.append( newRow )
+			return blockMatrix( blocks, self.rowSizes, value.columnSizes )
+		if isinstance( value, matrix ):
+			if not ( value.height == self.width ):
+				raise ValueError( "Matrices are the incorrect size for '*'" )
+			return self._multiplyParts( self._split( value ) )
+		if ( type( value ) in BLOCKMATRIX_VALID_COLLECTIONS ):
+			if not ( len( value ) == self.width ):
+				raise ValueError( "Vector is the incorrect length for '*'" )
+			return self._multiplyParts( self._split( matrix( [ [ x ] for x in value ] ) ) ).getColumn( 0 )
+		if ( type( value ) in _matrix._scalarTypes ) or _matrix._lookupScalarType( type( value ) ):
+			return blockMatrix( [ [ None if ( block is None ) else block * value for block in row ] for row in self.blocks ],
+				self.rowSizes, self.columnSizes )
+		return NotImplemented
+
+	def __neg__( self ):
+		"""
+		Negative of a block matrix
+
+		:rtype: blockMatrix
+		:returns: A block matrix with the sign of each item changed.
+		"""
+		return self.__mul__( -1 )
+
+	def __repr__( self ):
+		"""
+		Representation. Shows which blocks are stored and the size of each.
+
+		Call: repr( blk ); str( blk )
+
+		:rtype: string
+		:returns: A description of the block structure.
+		"""
+		lines = [ "<blockMatrix %dx%d in %dx%d blocks>" % ( ( self.height, self.width ) + self.shape ) ]
+		for i, row in enumerate( self.blocks ):
+			lines.append( '[' + ''.join( [ ' %9s ' % ( '0' if ( block is None ) else '%dx%d' % ( block.height, block.width ) )
+				for block in row ] ) + ']' )
+		return '\n'.join( lines )
+
+	def __rmul__( self, value ):
+		"""
+		Right side multiplication
+
+		Call: mat * blk, x * blk
+
+		:rtype: matrix or blockMatrix
+		:returns: The result of the multiplication
+		"""
+		if isinstance( value, matrix ):
+			# M B = ( B' M' )'
+			return ( self.transpose( ) * value.transpose( ) ).transpose( )
+		return self.__mul__( value )
+
+	__str__ = __repr__
+
+	def __sub__( self, value ):
+		"""
+		Subtraction, block by block. Requires the same partition into blocks.
+
+		Call: blk1 - blk2
+
+		:rtype: blockMatrix
+		:returns: The difference
+		"""
+		if not isinstance( value, blockMatrix ):
+			return NotImplemented
+		return self.__add__( -value )
+
+	def _checkPartition( self, value ):
+		"""
+		Internal Function: checks that another block matrix has the same blocks sizes.
+		"""
+		if not ( ( self.rowSizes, self.columnSizes ) == ( value.rowSizes, value.columnSizes ) ):
+			raise ValueError( "Matrices must be partitioned the same way" )
+
+	def _multiplyParts( self, parts ):
+		"""
+		Internal Function: multiplies by a column of blocks ( matrices ), and stacks the
+		result into one matrix.
+		"""
+		width = parts[ 0 ].width if parts else 0
+		rows = list( )
+		for row, height in zip( self.blocks, self.rowSizes ):
+			total = None
+			for block, part in zip( row, parts ):
+				if block is not None:
+					total = _add( total, block * part )
+			if total is None:
+				rows.extend( [ [ 0 ] * width for i in xrange( height ) ] )
+			else:
+				rows.extend( [ list( r ) for r in _dense( total ).value ] )
+		return _matrix._fromRows( rows )
+
+	def _split( self, value ):
+		"""
+		Internal Function: splits the rows of a matrix into blocks matching the columns of
+		blocks of this one.
+		"""
+		parts = list( )
+		start = 0
+		for size in self.columnSizes:
+			parts.append( _matrix._fromRows( [ list( row ) for row in value.value[ start:start + size ] ] ) )
+			start += size
+		return parts
+
+	def block( self, i, j ):
+		"""
+		Get a block.
+
+		:Parameters:
+			i : int
+				The row of blocks
+			j : int
+				The column of blocks
+
+		:rtype: matrix, structuredMatrix or None
+		:returns: The block, or None for a block of zeros.
+		"""
+		return self.blocks[ i ][ j ]
+
+	def flatten( self ):
+		"""
+		Forms the whole matrix, with zero blocks filled in.
+
+		:rtype: matrix
+		:returns: The matrix
+		"""
+		rows = list( )
+		for blockRow, height in zip( self.blocks, self.rowSizes ):
+			parts = [ [ [ 0 ] * width ] * height if ( block is None ) else _dense( block ).value
+				for block, width in zip( blockRow, self.columnSizes ) ]
+			for i in xrange( height ):
+				newRow = list( )
+				for part in parts:
+					newRow.extend( part[ i ] )
+				rows.append( newRow )
+		return _matrix._fromRows( rows )
+
+	# Aliases for flatten
+	materialize = toMatrix = flatten
+
+	def solve( self, b ):
+		"""
+		Solves blk * x = b by block elimination without pivoting between blocks: each
+		diagonal block in turn is solved against the blocks to its right, and the
+		blocks below and to the right are replaced by their Schur complement. Zero
+		blocks add no work and stay zero unless they fill in. Only for square block
+		partitions whose diagonal blocks ( and their Schur complements ) are invertible.
+
+		:Parameters:
+			b : list; matrix
+				The right hand side; a list is a single column, and each column of a \
+				matrix is solved for separately.
+
+		:rtype: list or matrix
+		:returns: x, in the same form as b
+		"""
+		if not ( self.rowSizes == self.columnSizes ):
+			raise ValueError( "Block solve needs square diagonal blocks" )
+		vector = not isinstance( b, matrix )
+		if vector:
+			if not ( type( b ) in BLOCKMATRIX_VALID_COLLECTIONS ):
+				raise TypeError( "The right hand side must be a list or a matrix" )
+			b = matrix( [ [ x ] for x in b ] )
+		if not ( b.height == self.height ):
+			raise ValueError( "Right hand side is the incorrect size for solve" )
+		n = len( self.rowSizes )
+		a = [ list( row ) for row in self.blocks ]
+		if not ( b._isExact( ) and not [ block for row in a for block in row
+			if ( block is not None ) and not _dense( block )._isExact( ) ] ):
+			# mixing exact solutions of exact blocks with floats would turn floats into fractions
+			b = b.itemsToFloat( )
+		rhs = self._split( b )
+		# w[ k ] and u[ k ][ j ] are the diagonal block solved against the right hand side
+		# and against the blocks to its right.
+		w = [ None ] * n
+		u = [ dict( ) for k in xrange( n ) ]
+		for k in xrange( n ):
+			pivot = a[ k ][ k ]
+			if pivot is None:
+				raise ValueError( "Diagonal block %d is zero; block elimination needs pivoting" % k )
+			solve = _pivotSolver( pivot )
+			w[ k ] = _dense( solve( rhs[ k ] ) )
+			for j in xrange( k + 1, n ):
+				if a[ k ][ j ] is not None:
+					u[ k ][ j ] = _dense( solve( _dense( a[ k ][ j ] ) ) )
+			for i in xrange( k + 1, n ):
+				factor = a[ i ][ k ]
+				if factor is None:
+					continue
+				rhs[ i ] = _dense( rhs[ i ] ) - _dense( factor * w[ k ] )
+				for j, part in u[ k ].items( ):
+					a[ i ][ j ] = _add( a[ i ][ j ], -_dense( factor * part ) )
+		x = [ None ] * n
+		for k in xrange( n - 1, -1, -1 ):
+			total = w[ k ]
+			for j, part in u[ k ].items( ):
+				total = total - part * x[ j ]
+			x[ k ] = total
+		rows = [ list( row ) for part in x for row in part.value ]
+		if vector:
+			return [ row[ 0 ] for row in rows ]
+		return _matrix._fromRows( rows )
+
+	def transpose( self ):
+		"""
+		Transpose: the blocks are transposed, and so is their arrangement.
+
+		:rtype: blockMatrix
+		:returns: The transpose
+		"""
+		return blockMatrix( [ [ None if ( block is None ) else block.transpose( ) for block in column ]
+			for column in zip( *self.blocks ) ], self.columnSizes, self.rowSizes )
@@ -0,0 +1,348 @@
+"""
+charpoly.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Characteristic polynomials, and what they make cheap.
+
+Polynomials are lists of coefficients, highest degree first, so the characteristic
+polynomial det( xI - A ) of an n x n matrix is [ 1, c1, c2, ... cn ] for
+x ** n + c1 x ** ( n - 1 ) + ... + cn. For int and fraction matrices the coefficients
+are exact.
+"""
+
+import types
+from operator import mul
+import matrix as _matrix
+from matrix import matrix
+from fraction import fraction
+from primes import gcd
+from aio import checkpoint
+
+VERSION = "0.1"
+
+CHARPOLY_VALID_INTS = ( types.IntType, types.LongType )
+
+
+def _squareRows( value ):
+	"""
+	Internal Function: the rows of a square matrix ( or 2-dimensional list ).
+	"""
+	if isinstance( value, matrix ):
+		if not value.isSquare( ):
+			raise ValueError( "Characteristic polynomial is not defined for a non-square matrix" )
+		return [ list( row ) for row in value.value ]
+	for row in value:
+		if ( len( row ) != len( value ) ):
+			raise ValueError( "Characteristic polynomial is not defined for a non-square matrix" )
+	return [ list( row ) for row in value ]
+
+def _isExact( rows ):
+	"""
+	Internal Function: checks whether every item is an int, long or fraction.
+	"""
+	for row in rows:
+		for item in row:
+			if not ( type( item ) in CHARPOLY_VALID_INTS or type( item ) == fraction ):
+				return False
+	return True
+
+def _scaled( rows ):
+	"""
+	Internal Function: clears the denominators of exact rows.
+
+	:rtype: tuple
+	:returns: The least common denominator d, and the rows of d A as ints.
+	"""
+	denominator = 1
+	for row in rows:
+		for item in row:
+			if ( type( item ) == fraction ):
+				d = abs( item.denominator )
+				denominator = denominator // gcd( denominator, d ) * d
+	if ( denominator == 1 ):
+		return 1, rows
+	return denominator, [ [ _simplify( item * denominator ) for item in row ] for row in rows ]
+
+def _simplify( item ):
+	"""
+	Internal Function: turns a fraction with a denominator of 1 back into an int.
+	"""
+	if ( type( item ) == fraction ) and ( item.denominator in ( 1, -1 ) ) and \
+		( type( item.numerator ) in CHARPOLY_VALID_INTS ):
+		return int( item.numerator * item.denominator )
+	return item
+
+def _hessenberg( rows, exact ):
+	"""
+	Internal Function: reduces a matrix to upper Hessenberg form in place with elementary
+	( Gaussian ) similarity transformations. Exact rows must already hold fractions; float
+	rows are pivoted on the largest item.
+	"""
+	n = len( rows )
+	for k in xrange( n - 2 ):
+		checkpoint( )
+		candidates = [ i for i in xrange( k + 1, n ) if rows[ i ][ k ] ]
+		if not candidates:
+			continue
+		if exact:
+			p = candidates[ 0 ]
+		else:
+			p = max( candidates, key = lambda i: abs( rows[ i ][ k ] ) )
+		if ( p != k + 1 ):
+			rows[ p ], rows[ k + 1 ] = rows[ k + 1 ], rows[ p ]
+			for row in rows:
+				row[ p ], row[ k + 1 ] = row[ k + 1 ], row[ p ]
+		pivotRow = rows[ k + 1 ]
+		pivot = pivotRow[ k ]
+		for i in xrange( k + 2, n ):
+			row = rows[ i ]
+			if not row[ k ]:
+				continue
+			if exact:
+				# fraction arithmetic hands back ints when it can, so don't trust '/'
+				u = fraction( row[ k ], pivot )
+			else:
+				u = row[ k ] / pivot
+			row[ k: ] = [ x - u * y for x, y in zip( row[ k: ], pivotRow[ k: ] ) ]
+			# the inverse transformation adds u times column i to column k + 1
+			for r in rows:
+				r[ k + 1 ] = r[ k + 1 ] + u * r[ i ]
+
+def _polyMulMod( a, b, modulus ):
+	"""
+	Internal Function: multiplies two polynomials and reduces the product modulo a monic
+	polynomial. All three are lists of coefficients, lowest degree first.
+	"""
+	product = [ 0 ] * ( len( a ) + len( b ) - 1 )
+	for i, x in enumerate( a ):
+		if x:
+			for j, y in enumerate( b ):
+				product[ i + j ] += x * y
+	n = len( modulus ) - 1
+	for d in xrange( len( product ) - 1, n - 1, -1 ):
+		lead = product[ d ]
+		if lead:
+			for j in xrange( n ):
+				product[ d - n + j ] -= lead * modulus[ j ]
+		product[ d ] = 0
+	return product[ :n ] or [ 0 ]
+
+def _polyMod( polynomial, value ):
+	"""
+	Internal Function: reduces a polynomial ( highest degree first ) modulo the
+	characteristic polynomial of a matrix, which leaves its value at the matrix unchanged.
+	"""
+	modulus = characteristicPolynomial( value )[ ::-1 ]
+	return _polyMulMod( polynomial[ ::-1 ], [ 1 ], modulus )[ ::-1 ]
+
+def berkowitz( value ):
+	"""
+	Characteristic polynomial by Berkowitz's algorithm. It uses only addition, subtraction
+	and multiplication ( O( n ** 4 ) of them ), so int matrices stay in ints and any item
+	type supporting those operators can be used.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list )
+
+	:rtype: list
+	:returns: The coefficients of det( xI - A ), highest degree first.
+	"""
+	rows = _squareRows( value )
+	n = len( rows )
+	if not n:
+		return [ 1 ]
+	coefficients = [ 1, -rows[ 0 ][ 0 ] ]
+	for r in xrange( 1, n ):
+		checkpoint( )
+		# the r x r leading block M, the row and column beside it, and the new corner item
+		rowR = rows[ r ][ :r ]
+		column = [ rows[ i ][ r ] for i in xrange( r ) ]
+		block = [ row[ :r ] for row in rows[ :r ] ]
+		# first column of the Toeplitz matrix: 1, -a, -R C, -R M C, -R M^2 C, ...
+		toeplitz = [ 1, -rows[ r ][ r ] ]
+		vector = column
+		for k in xrange( r ):
+			toeplitz.append( -sum( map( mul, rowR, vector ) ) )
+			if ( k < r - 1 ):
+				vector = [ sum( map( mul, row, vector ) ) for row in block ]
+		coefficients = [ sum( [ toeplitz[ i - j ] * coefficients[ j ] for j in xrange( max( 0, i - r - 1 ), min( i, r ) + 1 ) ] )
+			for i in xrange( r + 2 ) ]
+	return coefficients
+
+def hessenbergPolynomial( value ):
+	"""
+	Characteristic polynomial by reduction to upper Hessenberg form, which takes O( n ** 3 )
+	operations. int and fraction matrices are reduced exactly in fractions; other matrices
+	are reduced in floating point with pivoting.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list )
+
+	:rtype: list
+	:returns: The coefficients of det( xI - A ), highest degree first.
+	"""
+	rows = _squareRows( value )
+	n = len( rows )
+	exact = _isExact( rows )
+	if exact:
+		rows = [ [ fraction( item ) if ( type( item ) in CHARPOLY_VALID_INTS ) else item for item in row ] for row in rows ]
+	_hessenberg( rows, exact )
+	# polynomials[ m ] is the characteristic polynomial of the leading m x m block, lowest
+	# degree first: p_m = ( x - h_mm ) p_m-1 - sum( h_im ( h_i+1,i ... h_m,m-1 ) p_i-1 )
+	polynomials = [ [ 1 ] ]
+	for m in xrange( n ):
+		previous = polynomials[ m ]
+		h = rows[ m ][ m ]
+		current = [ -h * previous[ 0 ] ] + [ previous[ j - 1 ] - h * previous[ j ] for j in xrange( 1, m + 1 ) ] + [ previous[ m ] ]
+		t = 1
+		for i in xrange( m - 1, -1, -1 ):
+			t = t * rows[ i + 1 ][ i ]
+			if not t:
+				break
+			f = t * rows[ i ][ m ]
+			if f:
+				for j, c in enumerate( polynomials[ i ] ):
+					current[ j ] = current[ j ] - f * c
+		polynomials.append( current )
+	return [ _simplify( c ) for c in reversed( polynomials[ n ] ) ]
+
+def characteristicPolynomial( value, method = None ):
+	"""
+	Characteristic polynomial of a square matrix.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list )
+		method : string
+			'berkowitz' or 'hessenberg'. By default int and fraction matrices use \
+			Berkowitz's algorithm, which needs no division, on the matrix scaled to ints, \
+			and all others the Hessenberg reduction.
+
+	:rtype: list
+	:returns: The coefficients of det( xI - A ), highest degree first.
+	"""
+	if method is None:
+		rows = _squareRows( value )
+		if not _isExact( rows ):
+			return hessenbergPolynomial( rows )
+		# the coefficients of d A are those of A times 1, d, d ** 2, ...
+		denominator, rows = _scaled( rows )
+		coefficients = berkowitz( rows )
+		if ( denominator == 1 ):
+			return coefficients
+		return [ _simplify( fraction( c, denominator ** k ) ) for k, c in enumerate( coefficients ) ]
+	if ( method == 'berkowitz' ):
+		return berkowitz( value )
+	if ( method == 'hessenberg' ):
+		return hessenbergPolynomial( value )
+	raise ValueError( "Unknown characteristic polynomial method: %r" % ( method, ) )
+
+def tracePowers( value, count = None ):
+	"""
+	The traces of the first few powers of a matrix, found exactly from its characteristic
+	polynomial with Newton's identities instead of by forming the powers.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list )
+		count : int
+			How many traces to return. Defaults to the size of the matrix.
+
+	:rtype: list
+	:returns: [ trace( A ), trace( A ** 2 ), ... trace( A ** count ) ]
+	"""
+	coefficients = characteristicPolynomial( value )
+	n = len( coefficients ) - 1
+	if count is None:
+		count = n
+	returnvalue = list( )
+	for k in xrange( 1, count + 1 ):
+		# p_k = -k c_k - sum( c_i p_k-i ), with c_k = 0 beyond the degree
+		total = -k * coefficients[ k ] if ( k <= n ) else 0
+		for i in xrange( 1, min( k - 1, n ) + 1 ):
+			total -= coefficients[ i ] * returnvalue[ k - i - 1 ]
+		returnvalue.append( _simplify( total ) )
+	return returnvalue
+
+def evaluate( polynomial, value, reduce = True ):
+	"""
+	Evaluates a polynomial at a square matrix by Horner's rule.
+
+	:Parameters:
+		polynomial : list
+			The coefficients, highest degree first.
+		value : matrix
+			A square matrix
+		reduce : boolean
+			If True, a polynomial of degree n or more is first reduced modulo the \
+			characteristic polynomial of the n x n matrix ( Cayley-Hamilton ), so at most \
+			n - 1 matrix products are needed whatever its degree.
+
+	:rtype: matrix
+	:returns: The value of the polynomial at the matrix.
+	"""
+	if not isinstance( value, matrix ):
+		value = matrix( value )
+	if not value.isSquare( ):
+		raise ValueError( "Polynomials can only be evaluated at a square matrix" )
+	n = value.height
+	if reduce and ( len( polynomial ) > n ):
+		polynomial = _polyMod( polynomial, value )
+	while ( len( polynomial ) > 1 ) and not polynomial[ 0 ]:
+		polynomial = polynomial[ 1: ]
+	returnvalue = _matrix.identMatrix( n ) * polynomial[ 0 ]
+	for c in polynomial[ 1: ]:
+		returnvalue = returnvalue * value
+		if c:
+			rows = returnvalue.value
+			for i in xrange( n ):
+				rows[ i ][ i ] = rows[ i ][ i ] + c
+	return returnvalue
+
+def power( value, exponent ):
+	"""
+	Raises a square matrix to a non-negative integer power using the Cayley-Hamilton
+	theorem: x ** exponent is reduced modulo the characteristic polynomial by repeated
+	squaring of polynomials, and the remainder, of degree below n, is evaluated at the
+	matrix. This needs n - 1 matrix products whatever the exponent, and is exact for int
+	and fraction matrices.
+
+	:Parameters:
+		value : matrix
+			A square matrix
+		exponent : int
+			The power to raise the matrix to
+
+	:rtype: matrix
+	:returns: The matrix raised to the power.
+	"""
+	if ( exponent < 0 ):
+		raise ValueError( "Exponent must not be negative" )
+	modulus = characteristicPolynomial( value )[ ::-1 ]
+	if ( len( modulus ) == 1 ):
+		return matrix( )
+	remainder = _polyMulMod( [ 1 ], [ 1 ], modulus )
+	base = _polyMulMod( [ 0, 1 ], [ 1 ], modulus )
+	while exponent:
+		if ( exponent & 1 ):
+			remainder = _polyMulMod( remainder, base, modulus )
+		exponent >>= 1
+		if exponent:
+			base = _polyMulMod( base, base, modulus )
+	return evaluate( [ _simplify( c ) for c in remainder[ ::-1 ] ], value, False )
@@ -0,0 +1,473 @@
+"""
+decompose.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+LU, QR and Cholesky factorizations of real matrices, in floating point.
+
+Each factorization is done once, when the object is created, and kept, so solving
+against many right hand sides only costs the substitutions.
+"""
+
+import types
+from math import sqrt, log
+from operator import mul
+import matrix as _matrix
+from matrix import matrix
+from aio import checkpoint
+
+VERSION = "0.1"
+
+DECOMPOSE_VALID_COLLECTIONS = ( types.ListType, types.TupleType )
+
+
+def _floatRows( value ):
+	"""
+	Internal Function: copies the rows of a matrix ( or 2-dimensional list ) as floats.
+	"""
+	if isinstance( value, matrix ):
+		value = value.value
+	return [ [ float( item ) for item in row ] for row in value ]
+
+def _forward( rows, b, unit = False ):
+	"""
+	Internal Function: solves L y = b by forward substitution, where L is the lower
+	triangle of rows ( with a unit diagonal if unit is True ).
+	"""
+	y = list( b )
+	for i in xrange( len( y ) ):
+		row = rows[ i ]
+		if i:
+			y[ i ] -= sum( map( mul, row[ :i ], y[ :i ] ) )
+		if not unit:
+			y[ i ] /= row[ i ]
+	return y
+
+def _backward( rows, b ):
+	"""
+	Internal Function: solves U x = b by back substitution, where U is the upper triangle
+	of the first len( b ) rows and columns of rows.
+	"""
+	n = len( b )
+	x = list( b )
+	for i in xrange( n - 1, -1, -1 ):
+		row = rows[ i ]
+		x[ i ] = ( x[ i ] - sum( map( mul, row[ i + 1:n ], x[ i + 1: ] ) ) ) / row[ i ]
+	return x
+
+
+class factorization( object ):
+	"""
+	The parts shared by the factorizations: solving for a vector or for each column of a
+	matrix, and the inverse. Each factorization provides _solveVector, which solves for a
+	single right hand side ( a list of floats ) with its own factors.
+	"""
+
+	def __getattr__( self, name ):
+		"""
+		Get attribute.
+
+		Call: factors.width; factors.height; factors.size
+
+		:rtype: int or tuple
+		:returns: The value requested.
+		"""
+		if name == 'size':
+			return ( self.width, self.height )
+		raise AttributeError( name )
+
+	def det( self ):
+		"""
+		Determinant of the factored matrix.
+
+		:rtype: float
+		:returns: The determinant
+		"""
+		return self.determinant( )
+
+	def inverse( self ):
+		"""
+		Inverse of the factored matrix, found by solving for each column of the identity.
+
+		:rtype: matrix
+		:returns: The inverse
+		"""
+		if not ( self.width == self.height ):
+			raise ValueError( "Inverse is not defined for a non-square matrix" )
+		return self.solve( _matrix.identMatrix( self.height ) )
+
+	def solve( self, b ):
+		"""
+		Solves A x = b using the stored factors.
+
+		:Parameters:
+			b : list; matrix
+				The right hand side; a list is a single column, and each column of a \
+				matrix is solved for separately.
+
+		:rtype: list or matrix
+		:returns: x, in the same form as b
+		"""
+		if isinstance( b, matrix ):
+			if not ( b.height == self.height ):
+				raise ValueError( "Right hand side is the incorrect size for solve" )
+			columns = [ self._solveVector( [ float( item ) for item in column ] ) for column in zip( *b.value ) ]
+			return matrix( [ list( row ) for row in zip( *columns ) ] )
+		if not ( type( b ) in DECOMPOSE_VALID_COLLECTIONS ) or not ( len( b ) == self.height ):
+			raise ValueError( "Right hand side is the incorrect size for solve" )
+		return self._solveVector( [ float( item ) for item in b ] )
+
+
+class luFactorization( factorization ):
+	"""
+	LU factorization with partial pivoting, P A = L U, of a square matrix.
+	"""
+
+	def __init__( self, value ):
+		"""
+		Constructor.
+
+		:Parameters:
+			value : matrix
+				A square matrix ( or 2-dimensional list )
+		"""
+		rows = _floatRows( value )
+		n = len( rows )
+		if [ row for row in rows if not ( len( row ) == n ) ]:
+			raise ValueError( "LU factorization is only defined here for square matrices" )
+		self.width = self.height = n
+		self.permutation = range( n )
+		self.sign = 1
+		self.singular = False
+		for k in xrange( n ):
+			checkpoint( )
+			p = max( xrange( k, n ), key = lambda i: abs( rows[ i ][ k ] ) )
+			if ( p != k ):
+				rows[ k ], rows[ p ] = rows[ p ], rows[ k ]
+				self.permutation[ k ], self.permutation[ p ] = self.permutation[ p ], self.permutation[ k ]
+				self.sign = -self.sign
+			pivotRow = rows[ k ]
+			pivot = pivotRow[ k ]
+			if not pivot:
+				self.singular = True
+				continue
+			for i in xrange( k + 1, n ):
+				row = rows[ i ]
+				f = row[ k ] / pivot
+				row[ k ] = f
+				if f:
+					row[ k + 1: ] = [ x - f * y for x, y in zip( row[ k + 1: ], pivotRow[ k + 1: ] ) ]
+		self.rows = rows
+
+	def _solveVector( self, b ):
+		"""
+		Internal Function: solves for a single right hand side.
+		"""
+		if self.singular:
+			raise ValueError( 'This matrix is not invertible' )
+		y = _forward( self.rows, [ b[ i ] for i in self.permutation ], True )
+		return _backward( self.rows, y )
+
+	def determinant( self ):
+		"""
+		Determinant of the factored matrix: the product of the pivots.
+
+		:rtype: float
+		:returns: The determinant
+		"""
+		returnvalue = float( self.sign )
+		for i in xrange( self.height ):
+			returnvalue *= self.rows[ i ][ i ]
+		return returnvalue
+
+	def l( self ):
+		"""
+		The unit lower triangular factor.
+
+		:rtype: matrix
+		:returns: L
+		"""
+		n = self.height
+		return matrix( [ self.rows[ i ][ :i ] + [ 1.0 ] + [ 0.0 ] * ( n - i - 1 ) for i in xrange( n ) ] )
+
+	def logdet( self ):
+		"""
+		Natural log of the absolute value of the determinant, which does not overflow.
+
+		:rtype: float
+		:returns: log( abs( det( A ) ) ), or -inf if A is singular.
+		"""
+		if self.singular:
+			return float( '-inf' )
+		return sum( [ log( abs( self.rows[ i ][ i ] ) ) for i in xrange( self.height ) ] )
+
+	def u( self ):
+		"""
+		The upper triangular factor.
+
+		:rtype: matrix
+		:returns: U
+		"""
+		n = self.height
+		return matrix( [ [ 0.0 ] * i + self.rows[ i ][ i: ] for i in xrange( n ) ] )
+
+
+class qrFactorization( factorization ):
+	"""
+	QR factorization by Householder reflections, A = Q R, of a matrix with at least as
+	many rows as columns. For a tall matrix, solve( ) gives the least squares solution.
+	"""
+
+	def __init__( self, value ):
+		"""
+		Constructor.
+
+		:Parameters:
+			value : matrix
+				A matrix ( or 2-dimensional list ) with at least as many rows as columns.
+		"""
+		rows = _floatRows( value )
+		m = len( rows )
+		n = m and len( rows[ 0 ] )
+		if ( m < n ):
+			raise ValueError( "QR factorization needs at least as many rows as columns" )
+		self.height, self.width = m, n
+		self.reflections = list( ) # ( k, v, 2 / v.v ) for each reflection I - 2 v v' / v.v
+		for k in xrange( min( m - 1, n ) ):
+			checkpoint( )
+			x = [ rows[ i ][ k ] for i in xrange( k, m ) ]
+			norm = sqrt( sum( map( mul, x, x ) ) )
+			if ( norm == 0.0 ) or not [ t for t in x[ 1: ] if t ]:
+				continue
+			alpha = norm if ( x[ 0 ] < 0 ) else -norm
+			v = x
+			v[ 0 ] -= alpha
+			beta = 2.0 / sum( map( mul, v, v ) )
+			w = [ 0.0 ] * ( n - k )
+			for vi, row in zip( v, rows[ k: ] ):
+				w = [ s + vi * t for s, t in zip( w, row[ k: ] ) ]
+			for vi, row in zip( v, rows[ k: ] ):
+				f = beta * vi
+				if f:
+					row[ k: ] = [ t - f * s for t, s in zip( row[ k: ], w ) ]
+			rows[ k ][ k ] = alpha
+			for i in xrange( k + 1, m ):
+				rows[ i ][ k ] = 0.0
+			self.reflections.append( ( k, v, beta ) )
+		self.rows = rows
+
+	def _applyQt( self, b ):
+		"""
+		Internal Function: multiplies a vector by Q'.
+		"""
+		b = list( b )
+		for k, v, beta in self.reflections:
+			f = beta * sum( map( mul, v, b[ k: ] ) )
+			if f:
+				b[ k: ] = [ t - f * s for t, s in zip( b[ k: ], v ) ]
+		return b
+
+	def _solveVector( self, b ):
+		"""
+		Internal Function: solves for a single right hand side, in the least squares sense.
+		"""
+		n = self.width
+		for i in xrange( n ):
+			if not self.rows[ i ][ i ]:
+				raise ValueError( 'This matrix does not have full column rank' )
+		return _backward( self.rows, self._applyQt( b )[ :n ] )
+
+	def determinant( self ):
+		"""
+		Determinant of the factored matrix. Only for square matrices. Each reflection has
+		a determinant of -1.
+
+		:rtype: float
+		:returns: The determinant
+		"""
+		if not ( self.width == self.height ):
+			raise ValueError( "Determinant is not defined for non-square matrix" )
+		returnvalue = -1.0 if ( len( self.reflections ) % 2 ) else 1.0
+		for i in xrange( self.width ):
+			returnvalue *= self.rows[ i ][ i ]
+		return returnvalue
+
+	def logdet( self ):
+		"""
+		Natural log of the absolute value of the determinant. Only for square matrices.
+
+		:rtype: float
+		:returns: log( abs( det( A ) ) ), or -inf if A is singular.
+		"""
+		if not ( self.width == self.height ):
+			raise ValueError( "Determinant is not defined for non-square matrix" )
+		diagonal = [ abs( self.rows[ i ][ i ] ) for i in xrange( self.width ) ]
+		if not all( diagonal ):
+			return float( '-inf' )
+		return sum( [ log( d ) for d in diagonal ] )
+
+	def q( self ):
+		"""
+		The orthogonal factor, formed from the stored reflections.
+
+		:rtype: matrix
+		:returns: Q, which is square ( height x height ).
+		"""
+		m = self.height
+		rows = list( )
+		for j in xrange( m ):
+			e = [ 0.0 ] * m
+			e[ j ] = 1.0
+			# row j of Q is Q' e_j
+			rows.append( self._applyQt( e ) )
+		return matrix( rows )
+
+	def r( self ):
+		"""
+		The upper triangular factor.
+
+		:rtype: matrix
+		:returns: R, the same size as A.
+		"""
+		return matrix( [ list( row ) for row in self.rows ] )
+
+	def residual( self, b ):
+		"""
+		The norm of the least squares residual, || A x - b ||, found without forming x.
+
+		:Parameters:
+			b : list
+				The right hand side
+
+		:rtype: float
+		:returns: The 2-norm of the residual of the least squares solution.
+		"""
+		if not ( len( b ) == self.height ):
+			raise ValueError( "Right hand side is the incorrect size for solve" )
+		rest = self._applyQt( [ float( item ) for item in b ] )[ self.width: ]
+		return sqrt( sum( map( mul, rest, rest ) ) )
+
+
+class choleskyFactorization( factorization ):
+	"""
+	Cholesky factorization, A = L L', of a symmetric positive definite matrix. It takes
+	about half the work of an LU factorization. Only the lower triangle of A is read.
+	"""
+
+	def __init__( self, value ):
+		"""
+		Constructor.
+
+		:Parameters:
+			value : matrix
+				A symmetric positive definite matrix ( or 2-dimensional list )
+		"""
+		rows = _floatRows( value )
+		n = len( rows )
+		if [ row for row in rows if not ( len( row ) == n ) ]:
+			raise ValueError( "Cholesky factorization is only defined for square matrices" )
+		self.width = self.height = n
+		lower = list( )
+		for i in xrange( n ):
+			checkpoint( )
+			row = rows[ i ]
+			newRow = list( )
+			for j in xrange( i ):
+				previous = lower[ j ]
+				newRow.append( ( row[ j ] - sum( map( mul, newRow, previous[ :j ] ) ) ) / previous[ j ] )
+			s = row[ i ] - sum( map( mul, newRow, newRow ) )
+			if not ( s > 0.0 ):
+				raise ValueError( "This matrix is not positive definite" )
+			newRow.append( sqrt( s ) )
+			lower.append( newRow + [ 0.0 ] * ( n - i - 1 ) )
+		self.rows = lower
+		self.upper = [ list( row ) for row in zip( *lower ) ]
+
+	def _solveVector( self, b ):
+		"""
+		Internal Function: solves for a single right hand side.
+		"""
+		return _backward( self.upper, _forward( self.rows, b ) )
+
+	def determinant( self ):
+		"""
+		Determinant of the factored matrix: the square of the product of the diagonal of L.
+
+		:rtype: float
+		:returns: The determinant
+		"""
+		returnvalue = 1.0
+		for i in xrange( self.height ):
+			returnvalue *= self.rows[ i ][ i ]
+		return returnvalue * returnvalue
+
+	def l( self ):
+		"""
+		The lower triangular factor.
+
+		:rtype: matrix
+		:returns: L
+		"""
+		return matrix( [ list( row ) for row in self.rows ] )
+
+	def logdet( self ):
+		"""
+		Natural log of the determinant, which does not overflow.
+
+		:rtype: float
+		:returns: log( det( A ) )
+		"""
+		return 2.0 * sum( [ log( self.rows[ i ][ i ] ) for i in xrange( self.height ) ] )
+
+
+def cholesky( value ):
+	"""
+	Cholesky factorization of a symmetric positive definite matrix.
+
+	:Parameters:
+		value : matrix
+			A symmetric positive definite matrix
+
+	:rtype: choleskyFactorization
+	:returns: The factorization
+	"""
+	return choleskyFactorization( value )
+
+def lu( value ):
+	"""
+	LU factorization with partial pivoting.
+
+	:Parameters:
+		value : matrix
+			A square matrix
+
+	:rtype: luFactorization
+	:returns: The factorization
+	"""
+	return luFactorization( value )
+
+def qr( value ):
+	"""
+	QR factorization by Householder reflections.
+
+	:Parameters:
+		value : matrix
+			A matrix with at least as many rows as columns
+
+	:rtype: qrFactorization
+	:returns: The factorization
+	"""
+	return qrFactorization( value )
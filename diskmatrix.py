@@ -0,0 +1,659 @@
+"""
+diskmatrix.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Matrices of floats kept in memory-mapped files, for matrices too large to hold as lists.
+
+Call: diskMatrix( path ), create( path, height, width ) or fromMatrix( mat, path )
+
+The file is a short header followed by the items as doubles ( in the byte order of the
+machine ), row by row. Only the rows being worked on are read into lists. Multiply,
+transpose and the elementwise operations work through the matrices in tiles, sized so
+that the lists they hold at once stay within a memory budget, and in an order which
+reads and writes each file in long runs so the page cache is used well.
+"""
+
+import os
+import mmap
+import atexit
+import struct
+import weakref
+import tempfile
+from array import array
+import matrix as _matrix
+from matrix import matrix
+
+VERSION = "0.1"
+
+DISKMATRIX_MAGIC = 'DISKMAT1'
+DISKMATRIX_HEADER = struct.Struct( '=8sQQ' ) # magic, height, width
+DISKMATRIX_ITEM_SIZE = array( 'd' ).itemsize
+DISKMATRIX_TILE = 256 # the default height and width of a tile
+DISKMATRIX_MEMORY = 64 * 1024 * 1024 # the default memory budget, in bytes
+
+_temporaries = weakref.WeakSet( ) # open temporary results, deleted at exit if still open
+
+
+class diskMatrix( object ):
+	"""
+	A matrix of floats stored in a memory-mapped file. It has the read API of a matrix,
+	and multiply, transpose and elementwise operations which write their results to new
+	files. Results go to temporary files unless a path is given; these are deleted by
+	close( ), when the result is no longer referenced, or at exit. A diskMatrix can be
+	used in a with statement, which closes it at the end.
+	"""
+
+	def __init__( self, path, readonly = False, tile = None, memory = None ):
+		"""
+		Constructor. Opens an existing file ( see create( ) to make a new one ).
+
+		:Parameters:
+			path : string
+				The file holding the matrix.
+			readonly : boolean
+				If True, the file is mapped read-only.
+			tile : int
+				The height and width of the tiles operations work in. Defaults to DISKMATRIX_TILE.
+			memory : int
+				How many bytes of lists operations may hold at once. Defaults to DISKMATRIX_MEMORY.
+		"""
+		self.path = path
+		self.readonly = readonly
+		self.tile = tile or DISKMATRIX_TILE
+		self.memory = memory or DISKMATRIX_MEMORY
+		self.temporary = False
+		self._map = None
+		self._file = open( path, 'rb' if readonly else 'r+b' )
+		try:
+			header = self._file.read( DISKMATRIX_HEADER.size )
+			if not ( len( header ) == DISKMATRIX_HEADER.size ):
+				raise ValueError( "%s is not a disk matrix file" % path )
+			magic, self._height, self._width = DISKMATRIX_HEADER.unpack( header )
+			if not ( magic == DISKMATRIX_MAGIC ):
+				raise ValueError( "%s is not a disk matrix file" % path )
+			self._map = mmap.mmap( self._file.fileno( ), 0, access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE )
+		except:
+			# close( ) only closes files which were mapped, so close this one here
+			self._file.close( )
+			raise
+
+	def __del__( self ):
+		"""
+		Closes the file ( deleting it if it is a temporary result ) once the matrix is no
+		longer referenced.
+		"""
+		self.close( )
+
+	def __enter__( self ):
+		"""
+		Context manager support.
+
+		Call: with diskMatrix( path ) as disk: ...
+
+		:rtype: diskMatrix
+		:returns: This matrix
+		"""
+		return self
+
+	def __exit__( self, *excinfo ):
+		"""
+		Closes the matrix at the end of a with statement.
+		"""
+		self.close( )
+		return False
+
+	def __getattr__( self, name ):
+		"""
+		Get attribute.
+
+		Call: disk.width; disk.height; disk.size
+
+		:rtype: int or tuple
+		:returns: The value requested.
+		"""
+		if name == 'width':
+			return self._width
+		if name == 'height':
+			return self._height
+		if name == 'size':
+			return ( self._width, self._height )
+		raise AttributeError( name )
+
+	def __add__( self, obj ):
+		"""
+		Addition
+
+		Call: disk + disk, disk + mat
+
+		:rtype: diskMatrix
+		:returns: The sum, in a temporary file.
+		"""
+		return self.add( obj )
+
+	def __getitem__( self, index ):
+		"""
+		Get a row of the matrix.
+
+		Call: disk[x] or disk[x][y]
+
+		:rtype: list
+		:returns: A copy of the row requested
+		"""
+		return self.getRow( index )
+
+	def __iter__( self ):
+		"""
+		Iterates over each item in the matrix, first row0, then row1, etc. Rows are read a
+		band at a time.
+
+		:rtype: generator
+		:returns: A generator over the items of the matrix
+		"""
+		band = self._band( 1 )
+		for start in xrange( 0, self._height, band ):
+			for row in self._readRows( start, min( start + band, self._height ) ):
+				for item in row:
+					yield item
+
+	def __mul__( self, obj ):
+		"""
+		Multiplication
+
+		Call: disk * disk, disk * mat, disk * x
+
+		:rtype: diskMatrix
+		:returns: The product ( Linear Algebra ), in a temporary file.
+		"""
+		if isinstance( obj, ( diskMatrix, matrix ) ):
+			return self.multiply( obj )
+		if ( type( obj ) in ( int, long, float ) ):
+			return self.map( lambda x: x * obj )
+		return NotImplemented
+
+	def __repr__( self ):
+		"""
+		Representation. Formats the matrix for printing, reading it only if it is small
+		enough to be printed in full.
+
+		Call: repr( disk ); str( disk )
+
+		:rtype: string
+		:returns: A formatted representation of the matrix.
+		"""
+		if ( self._width * self._height <= _matrix.MATRIX_REPR_THRESHOLD ):
+			return repr( self.materialize( ) )
+		return "<diskMatrix %dx%d in %s>" % ( self._height, self._width, self.path )
+
+	def __rmul__( self, obj ):
+		"""
+		Right side multiplication
+
+		Call: mat * disk, x * disk
+
+		:rtype: diskMatrix
+		:returns: The product ( Linear Algebra ), in a temporary file.
+		"""
+		if isinstance( obj, matrix ):
+			if not ( obj.width == self._height ):
+				raise ValueError( "Matrices are the incorrect size for '*'" )
+			return _multiply( obj, self, None, self.tile, self.memory )
+		if ( type( obj ) in ( int, long, float ) ):
+			return self.map( lambda x: obj * x )
+		return NotImplemented
+
+	__str__ = __repr__
+
+	def __sub__( self, obj ):
+		"""
+		Subtraction
+
+		Call: disk - disk, disk - mat
+
+		:rtype: diskMatrix
+		:returns: The difference, in a temporary file.
+		"""
+		return self.subtract( obj )
+
+	def _band( self, count, width = None ):
+		"""
+		Internal Function: how many rows of the given width count matrices can each hold
+		in lists within the memory budget. Python floats take about 4 times the space
+		of doubles once they are in a list.
+		"""
+		if width is None:
+			width = self._width
+		return max( 1, self.memory // ( 4 * DISKMATRIX_ITEM_SIZE * max( width, 1 ) * count ) )
+
+	def _checkIndex( self, row, column = None ):
+		"""
+		Internal Function: checks a row ( and column, if given ), counting negative
+		values from the end.
+
+		:rtype: tuple
+		:returns: The row and column as non-negative indices.
+		"""
+		if ( row < 0 ):
+			row += self._height
+		if not ( 0 <= row < self._height ):
+			raise IndexError( 'Invalid index, row %d does not exist' % row )
+		if column is not None:
+			if ( column < 0 ):
+				column += self._width
+			if not ( 0 <= column < self._width ):
+				raise IndexError( 'Invalid index, column %d does not exist' % column )
+		return row, column
+
+	def _offset( self, row, column = 0 ):
+		"""
+		Internal Function: the byte offset of an item in the file.
+		"""
+		return DISKMATRIX_HEADER.size + ( row * self._width + column ) * DISKMATRIX_ITEM_SIZE
+
+	def _readRows( self, start, stop, first = 0, last = None ):
+		"""
+		Internal Function: reads columns first to last of rows start to stop.
+		"""
+		if last is None:
+			last = self._width
+		returnvalue = list( )
+		m = self._map
+		if ( first == 0 ) and ( last == self._width ):
+			# whole rows are contiguous, so read them in one go
+			items = array( 'd' )
+			items.fromstring( m[ self._offset( start ):self._offset( stop ) ] )
+			width = self._width
+			if not width:
+				return [ list( ) for r in xrange( start, stop ) ]
+			return [ items[ i:i + width ].tolist( ) for i in xrange( 0, len( items ), width ) ]
+		for r in xrange( start, stop ):
+			items = array( 'd' )
+			items.fromstring( m[ self._offset( r, first ):self._offset( r, last ) ] )
+			returnvalue.append( items.tolist( ) )
+		return returnvalue
+
+	def _writeRows( self, start, rows, first = 0 ):
+		"""
+		Internal Function: writes rows ( or parts of rows, starting at column first )
+		from row start on.
+		"""
+		m = self._map
+		for r, row in enumerate( rows, start ):
+			offset = self._offset( r, first )
+			m[ offset:offset + len( row ) * DISKMATRIX_ITEM_SIZE ] = array( 'd', row ).tostring( )
+
+	def _elementwise( self, function, other, path ):
+		"""
+		Internal Function: applies function to the items of this matrix ( and the matching
+		items of other ), a band of rows at a time.
+		"""
+		if other is not None and not ( ( other.height, other.width ) == ( self._height, self._width ) ):
+			raise ValueError( "Matrices are the incorrect size for an elementwise operation" )
+		returnvalue = _new( path, self._height, self._width, self.tile, self.memory )
+		band = self._band( 3 )
+		for start in xrange( 0, self._height, band ):
+			stop = min( start + band, self._height )
+			rows = self._readRows( start, stop )
+			if other is None:
+				rows = [ map( function, row ) for row in rows ]
+			else:
+				rows = [ map( function, row, otherRow ) for row, otherRow in zip( rows, _rowsOf( other, start, stop ) ) ]
+			returnvalue._writeRows( start, rows )
+		return returnvalue
+
+	def add( self, other, path = None ):
+		"""
+		Elementwise sum.
+
+		:Parameters:
+			other : diskMatrix; matrix
+				The matrix to add, of the same size.
+			path : string
+				Where to store the result. Defaults to a temporary file.
+
+		:rtype: diskMatrix
+		:returns: The sum
+		"""
+		return self._elementwise( lambda x, y: x + y, other, path )
+
+	def close( self ):
+		"""
+		Flushes and unmaps the file, and deletes it if it is a temporary result.
+		"""
+		if self._map is None:
+			return
+		if not self.readonly:
+			self._map.flush( )
+		self._map.close( )
+		self._file.close( )
+		self._map = None
+		if self.temporary:
+			os.remove( self.path )
+			_temporaries.discard( self )
+
+	def flush( self ):
+		"""
+		Writes any changes to the file.
+		"""
+		self._map.flush( )
+
+	def getColumn( self, column ):
+		"""
+		Get a column from the matrix. The column is read one band of rows at a time.
+
+		:Parameters:
+			column : int
+				The column to get.
+
+		:rtype: list
+		:returns: The column as a list
+		"""
+		if ( column < 0 ):
+			column += self._width
+		if not ( 0 <= column < self._width ):
+			raise IndexError( 'Invalid index, column %d does not exist' % column )
+		returnvalue = list( )
+		band = self._band( 1 )
+		for start in xrange( 0, self._height, band ):
+			returnvalue.extend( [ row[ 0 ] for row in self._readRows( start, min( start + band, self._height ), column, column + 1 ) ] )
+		return returnvalue
+
+	def getRow( self, row ):
+		"""
+		Get a row from the matrix
+
+		:Parameters:
+			row : int
+				The row to get.
+
+		:rtype: list
+		:returns: The row as a list
+		"""
+		if ( row < 0 ):
+			row += self._height
+		if not ( 0 <= row < self._height ):
+			raise IndexError( 'Invalid index, row %d does not exist' % row )
+		return self._readRows( row, row + 1 )[ 0 ]
+
+	def hadamard( self, other, path = None ):
+		"""
+		Elementwise product.
+
+		:Parameters:
+			other : diskMatrix; matrix
+				The matrix to multiply by, of the same size.
+			path : string
+				Where to store the result. Defaults to a temporary file.
+
+		:rtype: diskMatrix
+		:returns: The elementwise product
+		"""
+		return self._elementwise( lambda x, y: x * y, other, path )
+
+	def item( self, row, column ):
+		"""
+		Get a single item of the matrix
+
+		:rtype: float
+		:returns: The item at row, column.
+		"""
+		row, column = self._checkIndex( row, column )
+		return self._readRows( row, row + 1, column, column + 1 )[ 0 ][ 0 ]
+
+	def map( self, function, path = None ):
+		"""
+		Applies a function to every item.
+
+		:Parameters:
+			function : function
+				Takes an item and returns the new item.
+			path : string
+				Where to store the result. Defaults to a temporary file.
+
+		:rtype: diskMatrix
+		:returns: The result
+		"""
+		return self._elementwise( function, None, path )
+
+	def map2( self, function, other, path = None ):
+		"""
+		Applies a function to the matching items of this matrix and another.
+
+		:Parameters:
+			function : function
+				Takes an item of each matrix and returns the new item.
+			other : diskMatrix; matrix
+				A matrix of the same size.
+			path : string
+				Where to store the result. Defaults to a temporary file.
+
+		:rtype: diskMatrix
+		:returns: The result
+		"""
+		return self._elementwise( function, other, path )
+
+	def materialize( self ):
+		"""
+		Reads the whole matrix into memory.
+
+		:rtype: matrix
+		:returns: The matrix
+		"""
+		return _matrix._fromRows( self._readRows( 0, self._height ) )
+
+	# An alias for materialize
+	toMatrix = materialize
+
+	def multiply( self, other, path = None ):
+		"""
+		Matrix product, computed a tile at a time ( see _multiply ).
+
+		:Parameters:
+			other : diskMatrix; matrix
+				The right factor.
+			path : string
+				Where to store the result. Defaults to a temporary file.
+
+		:rtype: diskMatrix
+		:returns: The product
+		"""
+		if not ( self._width == other.height ):
+			raise ValueError( "Matrices are the incorrect size for '*'" )
+		return _multiply( self, other, path, self.tile, self.memory )
+
+	def setItem( self, row, column, value ):
+		"""
+		Set a single item of the matrix
+
+		:Parameters:
+			row : int
+				The row of the item
+			column : int
+				The column of the item
+			value : number
+				The new value
+		"""
+		row, column = self._checkIndex( row, column )
+		self._writeRows( row, [ [ float( value ) ] ], column )
+
+	def setRow( self, row, values ):
+		"""
+		Replace a row of the matrix
+
+		:Parameters:
+			row : int
+				The row to replace
+			values : list
+				The new items, one for each column.
+		"""
+		row = self._checkIndex( row )[ 0 ]
+		if not ( len( values ) == self._width ):
+			raise ValueError( "Row is the incorrect length" )
+		self._writeRows( row, [ [ float( x ) for x in values ] ] )
+
+	def subtract( self, other, path = None ):
+		"""
+		Elementwise difference.
+
+		:Parameters:
+			other : diskMatrix; matrix
+				The matrix to subtract, of the same size.
+			path : string
+				Where to store the result. Defaults to a temporary file.
+
+		:rtype: diskMatrix
+		:returns: The difference
+		"""
+		return self._elementwise( lambda x, y: x - y, other, path )
+
+	def transpose( self, path = None ):
+		"""
+		Transpose, a tile at a time. The tiles are visited one band of result rows at a
+		time, so the result is written from start to end, and each tile is read as a run
+		of short contiguous pieces of rows.
+
+		:Parameters:
+			path : string
+				Where to store the result. Defaults to a temporary file.
+
+		:rtype: diskMatrix
+		:returns: The transpose
+		"""
+		returnvalue = _new( path, self._width, self._height, self.tile, self.memory )
+		tile = self.tile
+		for first in xrange( 0, self._width, tile ):
+			last = min( first + tile, self._width )
+			for start in xrange( 0, self._height, tile ):
+				stop = min( start + tile, self._height )
+				rows = self._readRows( start, stop, first, last )
+				returnvalue._writeRows( first, [ list( column ) for column in zip( *rows ) ], start )
+		return returnvalue
+
+
+def _rowsOf( value, start, stop, first = 0, last = None ):
+	"""
+	Internal Function: columns first to last of rows start to stop of a diskMatrix or matrix.
+	"""
+	if isinstance( value, diskMatrix ):
+		return value._readRows( start, stop, first, last )
+	if last is None:
+		last = value.width
+	return [ row[ first:last ] for row in value.value[ start:stop ] ]
+
+def _new( path, height, width, tile, memory ):
+	"""
+	Internal Function: creates a result, in a temporary file if path is None.
+	"""
+	temporary = path is None
+	if temporary:
+		handle, path = tempfile.mkstemp( suffix = '.mat' )
+		os.close( handle )
+	returnvalue = create( path, height, width, tile, memory )
+	returnvalue.temporary = temporary
+	if temporary:
+		_temporaries.add( returnvalue )
+	return returnvalue
+
+def _multiply( a, b, path, tile, memory ):
+	"""
+	Internal Function: the product of two diskMatrix ( or matrix ) factors. A band of rows
+	of a is read at a time, and multiplied by b a panel of columns at a time. If all of b
+	fits in the budget it is read once; otherwise each panel of b is read as a contiguous
+	piece of each row. Each band of the result is written once, in order.
+	"""
+	m, k, n = a.height, a.width, b.width
+	returnvalue = _new( path, m, n, tile, memory )
+	budget = max( 1, memory // ( 4 * DISKMATRIX_ITEM_SIZE ) ) # items
+	if ( k * n + tile * ( k + n ) <= budget ):
+		panel = max( n, 1 )
+		whole = zip( *_rowsOf( b, 0, k ) )
+	else:
+		panel = min( tile, n )
+		whole = None
+	band = max( 1, ( budget - k * panel ) // ( k + n ) ) if ( budget > k * panel ) else 1
+	for start in xrange( 0, m, band ):
+		stop = min( start + band, m )
+		rowsA = _rowsOf( a, start, stop )
+		out = [ [ 0.0 ] * n for i in xrange( stop - start ) ]
+		for first in xrange( 0, n, panel ):
+			last = min( first + panel, n )
+			if whole is None:
+				columns = zip( *_rowsOf( b, 0, k, first, last ) )
+			else:
+				columns = whole
+			block = [ list( ) for i in xrange( stop - start ) ]
+			_matrix._multiplyInto( rowsA, columns, block )
+			for row, part in zip( out, block ):
+				row[ first:last ] = part
+		returnvalue._writeRows( start, out )
+	return returnvalue
+
+def create( path, height, width, tile = None, memory = None ):
+	"""
+	Creates a file for a height x width matrix of zeros.
+
+	:Parameters:
+		path : string
+			The file to create ( or overwrite ).
+		height : int
+			The number of rows
+		width : int
+			The number of columns
+		tile : int
+			The height and width of the tiles operations work in.
+		memory : int
+			How many bytes of lists operations may hold at once.
+
+	:rtype: diskMatrix
+	:returns: The new matrix
+	"""
+	f = open( path, 'wb' )
+	try:
+		f.write( DISKMATRIX_HEADER.pack( DISKMATRIX_MAGIC, height, width ) )
+		f.truncate( DISKMATRIX_HEADER.size + height * width * DISKMATRIX_ITEM_SIZE )
+	finally:
+		f.close( )
+	return diskMatrix( path, False, tile, memory )
+
+def fromMatrix( value, path, tile = None, memory = None ):
+	"""
+	Writes a matrix ( or 2-dimensional list ) of ints and floats to a new file.
+
+	:Parameters:
+		value : matrix
+			The matrix to store.
+		path : string
+			The file to create ( or overwrite ).
+
+	:rtype: diskMatrix
+	:returns: The stored matrix
+	"""
+	if isinstance( value, matrix ):
+		value = value.value
+	height = len( value )
+	width = height and len( value[ 0 ] )
+	returnvalue = create( path, height, width, tile, memory )
+	returnvalue._writeRows( 0, [ [ float( x ) for x in row ] for row in value ] )
+	return returnvalue
+
+def _closeTemporaries( ):
+	"""
+	Internal Function: deletes the temporary results which are still open at exit.
+	"""
+	for value in list( _temporaries ):
+		value.close( )
+
+atexit.register( _closeTemporaries )
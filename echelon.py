@@ -0,0 +1,325 @@
+"""
+echelon.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Reduced row echelon form, rank, null space and column space from a single Gauss-Jordan
+elimination.
+
+int and fraction matrices are eliminated exactly: each row is scaled to integers and
+the elimination is fraction-free, so no fractions are made until the pivot rows are
+divided through at the end. Other matrices are eliminated in floating point with partial
+pivoting, and items no larger than a tolerance count as zero.
+"""
+
+import types
+from fraction import fraction
+from primes import gcd
+from matrix import matrix
+from aio import checkpoint
+
+VERSION = "0.1"
+
+ECHELON_VALID_INTS = ( types.IntType, types.LongType )
+ECHELON_EPSILON = 2.0 ** -52
+
+
+def _rows( value ):
+	"""
+	Internal Function: copies the rows of a matrix ( or 2-dimensional list ).
+	"""
+	if isinstance( value, matrix ):
+		value = value.value
+	return [ list( row ) for row in value ]
+
+def _integerRows( rows ):
+	"""
+	Internal Function: scales each row to integers, which leaves the row space unchanged.
+
+	:rtype: list
+	:returns: The scaled rows, or None if any item is not an int or fraction.
+	"""
+	returnvalue = list( )
+	for row in rows:
+		denominator = None # stays None if the row has no fractions
+		for item in row:
+			if ( type( item ) == fraction ):
+				if not ( type( item.numerator ) in ECHELON_VALID_INTS ):
+					return None
+				d = abs( item.denominator )
+				if denominator is None:
+					denominator = d
+				else:
+					denominator = denominator // gcd( denominator, d ) * d
+			elif not ( type( item ) in ECHELON_VALID_INTS ):
+				return None
+		if denominator is not None:
+			returnvalue.append( [ int( item * denominator ) for item in row ] )
+		else:
+			returnvalue.append( list( row ) )
+	return returnvalue
+
+def _simplify( item ):
+	"""
+	Internal Function: turns a fraction with a denominator of 1 back into an int.
+	"""
+	if ( type( item ) == fraction ) and ( item.denominator in ( 1, -1 ) ):
+		return int( item.numerator * item.denominator )
+	return item
+
+def _fractionFree( rows, stopEarly = False ):
+	"""
+	Internal Function: fraction-free Gauss-Jordan elimination of integer rows, in place.
+	Every division is exact. Pivot rows are moved to the top; each is left as a multiple
+	of its row in the reduced row echelon form.
+
+	:Parameters:
+		rows : list
+			A list of lists of integers.
+		stopEarly : boolean
+			If True, give up as soon as a column without a pivot is found.
+
+	:rtype: list
+	:returns: The pivot columns, or None if stopEarly was set and one was missing.
+	"""
+	height = len( rows )
+	width = height and len( rows[ 0 ] )
+	pivots = list( )
+	previous = 1
+	r = 0
+	for c in xrange( width ):
+		checkpoint( )
+		if ( r == height ):
+			break
+		for p in xrange( r, height ):
+			if rows[ p ][ c ]:
+				break
+		else:
+			if stopEarly:
+				return None
+			continue
+		rows[ r ], rows[ p ] = rows[ p ], rows[ r ]
+		pivotRow = rows[ r ]
+		pivot = pivotRow[ c ]
+		for i in xrange( height ):
+			if ( i == r ):
+				continue
+			row = rows[ i ]
+			f = row[ c ]
+			if ( previous == 1 ):
+				rows[ i ] = [ pivot * x - f * y for x, y in zip( row, pivotRow ) ]
+			else:
+				rows[ i ] = [ ( pivot * x - f * y ) // previous for x, y in zip( row, pivotRow ) ]
+		previous = pivot
+		pivots.append( c )
+		r += 1
+	return pivots
+
+def _partialPivoting( rows, tolerance = None, stopEarly = False ):
+	"""
+	Internal Function: Gauss-Jordan elimination with partial pivoting, in place. Pivot rows
+	are moved to the top and divided through by their pivots.
+
+	:Parameters:
+		rows : list
+			A list of lists of numbers.
+		tolerance : float
+			Items no larger than this count as zero. Defaults to the largest dimension \
+			times the machine epsilon times the largest item.
+		stopEarly : boolean
+			If True, give up as soon as a column without a pivot is found.
+
+	:rtype: list
+	:returns: The pivot columns, or None if stopEarly was set and one was missing.
+	"""
+	height = len( rows )
+	width = height and len( rows[ 0 ] )
+	if tolerance is None:
+		largest = max( [ 0.0 ] + [ abs( x ) for row in rows for x in row ] )
+		tolerance = max( height, width ) * ECHELON_EPSILON * largest
+	pivots = list( )
+	r = 0
+	for c in xrange( width ):
+		checkpoint( )
+		if ( r == height ):
+			break
+		p = max( xrange( r, height ), key = lambda i: abs( rows[ i ][ c ] ) )
+		if ( abs( rows[ p ][ c ] ) <= tolerance ):
+			if stopEarly:
+				return None
+			for i in xrange( r, height ):
+				rows[ i ][ c ] = 0.0
+			continue
+		rows[ r ], rows[ p ] = rows[ p ], rows[ r ]
+		scale = 1.0 / rows[ r ][ c ]
+		pivotRow = rows[ r ] = [ x * scale for x in rows[ r ] ]
+		pivotRow[ c ] = 1.0
+		for i in xrange( height ):
+			if ( i == r ):
+				continue
+			row = rows[ i ]
+			f = row[ c ]
+			if f:
+				rows[ i ] = [ x - f * y for x, y in zip( row, pivotRow ) ]
+				rows[ i ][ c ] = 0.0
+		pivots.append( c )
+		r += 1
+	return pivots
+
+
+class echelonForm( object ):
+	"""
+	The result of eliminating a matrix: its reduced row echelon form and pivot columns,
+	from which the rank, a null space basis and a column space basis follow without any
+	further elimination.
+	"""
+
+	def __init__( self, value, tolerance = None ):
+		"""
+		Constructor.
+
+		:Parameters:
+			value : matrix
+				A matrix ( or 2-dimensional list )
+			tolerance : float
+				For matrices which are not int or fraction, items no larger than this \
+				count as zero.
+		"""
+		self.original = _rows( value )
+		rows = _integerRows( self.original )
+		self.exact = rows is not None
+		if self.exact:
+			self.pivots = tuple( _fractionFree( rows ) )
+			for r, c in enumerate( self.pivots ):
+				pivot = rows[ r ][ c ]
+				rows[ r ] = [ _simplify( fraction( x, pivot ) ) if x else 0 for x in rows[ r ] ]
+			for r in xrange( len( self.pivots ), len( rows ) ):
+				rows[ r ] = [ 0 ] * len( rows[ r ] )
+		else:
+			rows = [ list( row ) for row in self.original ]
+			self.pivots = tuple( _partialPivoting( rows, tolerance ) )
+		self.rows = rows
+
+	def __getattr__( self, name ):
+		"""
+		Get attribute.
+
+		Call: form.rank; form.width; form.height
+
+		:rtype: int
+		:returns: The value requested.
+		"""
+		if name == 'rank':
+			return len( self.pivots )
+		if name == 'height':
+			return len( self.original )
+		if name == 'width':
+			return self.original and len( self.original[ 0 ] )
+		raise AttributeError( name )
+
+	def columnspace( self ):
+		"""
+		A basis for the column space: the columns of the original matrix at the pivots.
+
+		:rtype: matrix
+		:returns: A matrix whose columns are the basis vectors.
+		"""
+		if not self.pivots:
+			return matrix( )
+		return matrix( [ [ row[ c ] for c in self.pivots ] for row in self.original ] )
+
+	def nullspace( self ):
+		"""
+		A basis for the null space, with one vector for each column without a pivot.
+
+		:rtype: matrix
+		:returns: A matrix whose columns are the basis vectors.
+		"""
+		width = self.width
+		pivots = set( self.pivots )
+		free = [ c for c in xrange( width ) if not ( c in pivots ) ]
+		if not free:
+			return matrix( )
+		vectors = list( )
+		for f in free:
+			vector = [ 0 ] * width
+			vector[ f ] = 1
+			for r, c in enumerate( self.pivots ):
+				vector[ c ] = -self.rows[ r ][ f ]
+			vectors.append( vector )
+		return matrix( [ list( row ) for row in zip( *vectors ) ] )
+
+	def rref( self ):
+		"""
+		The reduced row echelon form.
+
+		:rtype: matrix
+		:returns: A copy of the reduced row echelon form.
+		"""
+		return matrix( [ list( row ) for row in self.rows ] )
+
+
+def echelon( value, tolerance = None ):
+	"""
+	Eliminates a matrix once, for its reduced row echelon form, rank, null space and
+	column space.
+
+	:Parameters:
+		value : matrix
+			A matrix ( or 2-dimensional list )
+		tolerance : float
+			For matrices which are not int or fraction, items no larger than this count as zero.
+
+	:rtype: echelonForm
+	:returns: The results of the elimination.
+	"""
+	return echelonForm( value, tolerance )
+
+def isInvertible( value, tolerance = None ):
+	"""
+	Checks whether a matrix is invertible, stopping at the first column without a pivot.
+
+	:Parameters:
+		value : matrix
+			A matrix ( or 2-dimensional list )
+		tolerance : float
+			For matrices which are not int or fraction, items no larger than this count as zero.
+
+	:rtype: boolean
+	:returns: True if the matrix can be inverted.
+	"""
+	rows = _rows( value )
+	if [ row for row in rows if ( len( row ) != len( rows ) ) ]:
+		return False
+	integerRows = _integerRows( rows )
+	if integerRows is not None:
+		return _fractionFree( integerRows, True ) is not None
+	return _partialPivoting( rows, tolerance, True ) is not None
+
+def rank( value, tolerance = None ):
+	"""
+	The rank of a matrix.
+
+	:Parameters:
+		value : matrix
+			A matrix ( or 2-dimensional list )
+		tolerance : float
+			For matrices which are not int or fraction, items no larger than this count as zero.
+
+	:rtype: int
+	:returns: The number of linearly independent rows ( or columns ).
+	"""
+	return echelonForm( value, tolerance ).rank
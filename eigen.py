@@ -0,0 +1,593 @@
+"""
+eigen.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Eigenvalues and eigenvectors of float and complex matrices.
+
+Real symmetric matrices are reduced to tridiagonal form with Householder transformations
+and solved with the implicit QL method ( tred2 and tql2, from EISPACK by way of JAMA ).
+Other real matrices are reduced to upper Hessenberg form and solved with the Francis
+double shift QR algorithm ( hqr ), and complex matrices with a single shift QR iteration
+on their Hessenberg form. Eigenvectors of non-symmetric matrices are found by inverse
+iteration.
+"""
+
+import types
+from math import sqrt, hypot
+from operator import mul
+from matrix import matrix
+from aio import checkpoint
+
+VERSION = "0.1"
+
+EIGEN_MAX_ITERATIONS = 30 # QR iterations allowed per eigenvalue before giving up.
+EIGEN_INVERSE_ITERATIONS = 3 # inverse iteration steps per eigenvector.
+EIGEN_EPSILON = 2.0 ** -52
+
+
+def _rows( value ):
+	"""
+	Internal Function: copies a square matrix ( or 2-dimensional list ) into a list of rows
+	of floats, or of complex numbers if any item is complex.
+
+	:rtype: tuple
+	:returns: The rows, and True if they are complex.
+	"""
+	if isinstance( value, matrix ):
+		if not value.isSquare( ):
+			raise ValueError( "Eigenvalues are not defined for a non-square matrix" )
+		value = value.value
+	isComplex = False
+	for row in value:
+		if ( len( row ) != len( value ) ):
+			raise ValueError( "Eigenvalues are not defined for a non-square matrix" )
+		for item in row:
+			if ( type( item ) == types.ComplexType ):
+				isComplex = True
+	if isComplex:
+		return [ [ complex( item ) for item in row ] for row in value ], True
+	return [ [ float( item ) for item in row ] for row in value ], False
+
+def _isSymmetric( rows ):
+	"""
+	Internal Function: checks whether a list of rows is symmetric.
+	"""
+	n = len( rows )
+	for i in xrange( n ):
+		row = rows[ i ]
+		for j in xrange( i ):
+			if ( row[ j ] != rows[ j ][ i ] ):
+				return False
+	return True
+
+def _tred2( w, vectors ):
+	"""
+	Internal Function: Householder reduction of a real symmetric matrix to tridiagonal form.
+	w holds the transpose of JAMA's V ( which is the same matrix to start with ), so that the
+	column operations of the original become operations on rows. On return, if vectors is
+	True, the rows of w hold the accumulated transformation.
+
+	:rtype: tuple
+	:returns: The diagonal and the subdiagonal ( in items 1 to n-1 ) of the tridiagonal form.
+	"""
+	n = len( w )
+	d = list( w[ n - 1 ] )
+	e = [ 0.0 ] * n
+	for i in xrange( n - 1, 0, -1 ):
+		checkpoint( )
+		scale = sum( [ abs( x ) for x in d[ :i ] ] )
+		h = 0.0
+		if ( scale == 0.0 ):
+			e[ i ] = d[ i - 1 ]
+			for j in xrange( i ):
+				d[ j ] = w[ j ][ i - 1 ]
+				w[ j ][ i ] = 0.0
+				w[ i ][ j ] = 0.0
+		else:
+			d[ :i ] = [ x / scale for x in d[ :i ] ]
+			h = sum( map( mul, d[ :i ], d[ :i ] ) )
+			f = d[ i - 1 ]
+			g = sqrt( h )
+			if ( f > 0 ):
+				g = -g
+			e[ i ] = scale * g
+			h = h - f * g
+			d[ i - 1 ] = f - g
+			e[ :i ] = [ 0.0 ] * i
+			for j in xrange( i ):
+				f = d[ j ]
+				wj = w[ j ]
+				w[ i ][ j ] = f
+				g = e[ j ] + wj[ j ] * f
+				if ( j + 1 < i ):
+					g += sum( map( mul, wj[ j + 1:i ], d[ j + 1:i ] ) )
+					e[ j + 1:i ] = [ x + y * f for x, y in zip( e[ j + 1:i ], wj[ j + 1:i ] ) ]
+				e[ j ] = g
+			e[ :i ] = [ x / h for x in e[ :i ] ]
+			f = sum( map( mul, e[ :i ], d[ :i ] ) )
+			hh = f / ( h + h )
+			e[ :i ] = [ x - hh * y for x, y in zip( e[ :i ], d[ :i ] ) ]
+			for j in xrange( i ):
+				f = d[ j ]
+				g = e[ j ]
+				wj = w[ j ]
+				wj[ j:i ] = [ x - ( f * y + g * z ) for x, y, z in zip( wj[ j:i ], e[ j:i ], d[ j:i ] ) ]
+				d[ j ] = wj[ i - 1 ]
+				wj[ i ] = 0.0
+		d[ i ] = h
+	if not vectors:
+		# without the accumulation, the diagonal is simply what is left on the diagonal of w.
+		return [ w[ i ][ i ] for i in xrange( n ) ], e
+	for i in xrange( n - 1 ):
+		checkpoint( )
+		wi = w[ i ]
+		wi[ n - 1 ] = wi[ i ]
+		wi[ i ] = 1.0
+		h = d[ i + 1 ]
+		column = w[ i + 1 ]
+		if ( h != 0.0 ):
+			d[ :i + 1 ] = [ x / h for x in column[ :i + 1 ] ]
+			for j in xrange( i + 1 ):
+				wj = w[ j ]
+				g = sum( map( mul, column[ :i + 1 ], wj[ :i + 1 ] ) )
+				wj[ :i + 1 ] = [ x - g * y for x, y in zip( wj[ :i + 1 ], d[ :i + 1 ] ) ]
+		column[ :i + 1 ] = [ 0.0 ] * ( i + 1 )
+	for j in xrange( n ):
+		d[ j ] = w[ j ][ n - 1 ]
+		w[ j ][ n - 1 ] = 0.0
+	w[ n - 1 ][ n - 1 ] = 1.0
+	return d, e
+
+def _tql2( d, e, w ):
+	"""
+	Internal Function: the implicit QL method for a symmetric tridiagonal matrix. d and e
+	are changed in place; if w is not None its rows are rotated along with them, turning
+	the transformation from _tred2 into the eigenvectors.
+
+	:rtype: list
+	:returns: The eigenvalues, in ascending order, with the rows of w in the same order.
+	"""
+	n = len( d )
+	e[ :n - 1 ] = e[ 1: ]
+	e[ n - 1 ] = 0.0
+	f = 0.0
+	tst1 = 0.0
+	for l in xrange( n ):
+		checkpoint( )
+		tst1 = max( tst1, abs( d[ l ] ) + abs( e[ l ] ) )
+		m = l
+		while ( m < n ):
+			if ( abs( e[ m ] ) <= EIGEN_EPSILON * tst1 ):
+				break
+			m += 1
+		if ( m > l ):
+			iterations = 0
+			while True:
+				iterations += 1
+				if ( iterations > EIGEN_MAX_ITERATIONS * 2 ):
+					raise ValueError( "Eigenvalues did not converge" )
+				g = d[ l ]
+				p = ( d[ l + 1 ] - g ) / ( 2.0 * e[ l ] )
+				r = hypot( p, 1.0 )
+				if ( p < 0 ):
+					r = -r
+				d[ l ] = e[ l ] / ( p + r )
+				d[ l + 1 ] = e[ l ] * ( p + r )
+				dl1 = d[ l + 1 ]
+				h = g - d[ l ]
+				for i in xrange( l + 2, n ):
+					d[ i ] -= h
+				f = f + h
+				p = d[ m ]
+				c = c2 = c3 = 1.0
+				el1 = e[ l + 1 ]
+				s = s2 = 0.0
+				for i in xrange( m - 1, l - 1, -1 ):
+					c3 = c2
+					c2 = c
+					s2 = s
+					g = c * e[ i ]
+					h = c * p
+					r = hypot( p, e[ i ] )
+					e[ i + 1 ] = s * r
+					s = e[ i ] / r
+					c = p / r
+					p = c * d[ i ] - s * g
+					d[ i + 1 ] = h + s * ( c * g + s * d[ i ] )
+					if w is not None:
+						a, b = w[ i ], w[ i + 1 ]
+						w[ i + 1 ] = [ s * x + c * y for x, y in zip( a, b ) ]
+						w[ i ] = [ c * x - s * y for x, y in zip( a, b ) ]
+				p = -s * s2 * c3 * el1 * e[ l ] / dl1
+				e[ l ] = s * p
+				d[ l ] = c * p
+				if not ( abs( e[ l ] ) > EIGEN_EPSILON * tst1 ):
+					break
+		d[ l ] = d[ l ] + f
+		e[ l ] = 0.0
+	order = sorted( xrange( n ), key = d.__getitem__ )
+	if w is not None:
+		w[ : ] = [ w[ i ] for i in order ]
+	return [ d[ i ] for i in order ]
+
+def _hessenberg( a ):
+	"""
+	Internal Function: reduces a matrix ( real or complex ) to upper Hessenberg form in
+	place with Householder similarity transformations.
+	"""
+	n = len( a )
+	for k in xrange( n - 2 ):
+		checkpoint( )
+		x = [ a[ i ][ k ] for i in xrange( k + 1, n ) ]
+		norm = sqrt( sum( [ abs( t ) ** 2 for t in x ] ) )
+		if ( norm == 0.0 ):
+			continue
+		# v = x - alpha e1, with alpha chosen opposite to x[ 0 ] to avoid cancellation
+		if x[ 0 ]:
+			alpha = -x[ 0 ] / abs( x[ 0 ] ) * norm
+		else:
+			alpha = -norm
+		v = x
+		v[ 0 ] = v[ 0 ] - alpha
+		vv = sum( [ abs( t ) ** 2 for t in v ] )
+		if ( vv == 0.0 ):
+			continue
+		vc = [ t.conjugate( ) for t in v ]
+		# left: A = ( I - 2 v v* / v*v ) A, on rows k+1..n-1
+		rows = a[ k + 1: ]
+		wrow = [ 0.0 ] * ( n - k )
+		for vi, row in zip( vc, rows ):
+			if vi:
+				wrow = [ s + vi * t for s, t in zip( wrow, row[ k: ] ) ]
+		for vi, row in zip( v, rows ):
+			f = 2.0 * vi / vv
+			if f:
+				row[ k: ] = [ t - f * s for t, s in zip( row[ k: ], wrow ) ]
+		# right: A = A ( I - 2 v v* / v*v ), on columns k+1..n-1
+		for row in a:
+			f = 2.0 * sum( map( mul, row[ k + 1: ], v ) ) / vv
+			if f:
+				row[ k + 1: ] = [ t - f * s for t, s in zip( row[ k + 1: ], vc ) ]
+		a[ k + 1 ][ k ] = alpha
+		for i in xrange( k + 2, n ):
+			a[ i ][ k ] = 0.0
+
+def _hqr( h ):
+	"""
+	Internal Function: eigenvalues of a real upper Hessenberg matrix by the Francis double
+	shift QR algorithm ( after hqr in Numerical Recipes ). The matrix is destroyed.
+
+	:rtype: list
+	:returns: The eigenvalues, as floats or complex numbers.
+	"""
+	n = len( h )
+	# work with 1-based indices, as the original does.
+	a = [ [ 0.0 ] * ( n + 1 ) ] + [ [ 0.0 ] + list( row ) for row in h ]
+	wr = [ 0.0 ] * ( n + 1 )
+	wi = [ 0.0 ] * ( n + 1 )
+	anorm = 0.0
+	for i in xrange( 1, n + 1 ):
+		for j in xrange( max( i - 1, 1 ), n + 1 ):
+			anorm += abs( a[ i ][ j ] )
+	nn = n
+	t = 0.0
+	while ( nn >= 1 ):
+		its = 0
+		while True:
+			checkpoint( )
+			l = 1
+			for m in xrange( nn, 1, -1 ):
+				s = abs( a[ m - 1 ][ m - 1 ] ) + abs( a[ m ][ m ] )
+				if ( s == 0.0 ):
+					s = anorm
+				if ( abs( a[ m ][ m - 1 ] ) + s == s ):
+					a[ m ][ m - 1 ] = 0.0
+					l = m
+					break
+			x = a[ nn ][ nn ]
+			if ( l == nn ):
+				wr[ nn ] = x + t
+				wi[ nn ] = 0.0
+				nn -= 1
+				break
+			y = a[ nn - 1 ][ nn - 1 ]
+			w = a[ nn ][ nn - 1 ] * a[ nn - 1 ][ nn ]
+			if ( l == nn - 1 ):
+				p = 0.5 * ( y - x )
+				q = p * p + w
+				z = sqrt( abs( q ) )
+				x += t
+				if ( q >= 0.0 ):
+					if ( p < 0 ):
+						z = p - z
+					else:
+						z = p + z
+					wr[ nn - 1 ] = wr[ nn ] = x + z
+					if z:
+						wr[ nn ] = x - w / z
+					wi[ nn - 1 ] = wi[ nn ] = 0.0
+				else:
+					wr[ nn - 1 ] = wr[ nn ] = x + p
+					wi[ nn ] = z
+					wi[ nn - 1 ] = -z
+				nn -= 2
+				break
+			if ( its == EIGEN_MAX_ITERATIONS ):
+				raise ValueError( "Eigenvalues did not converge" )
+			if ( its % 10 == 0 ) and its:
+				# exceptional shift
+				t += x
+				for i in xrange( 1, nn + 1 ):
+					a[ i ][ i ] -= x
+				s = abs( a[ nn ][ nn - 1 ] ) + abs( a[ nn - 1 ][ nn - 2 ] )
+				y = x = 0.75 * s
+				w = -0.4375 * s * s
+			its += 1
+			m = nn - 2
+			while ( m >= l ):
+				z = a[ m ][ m ]
+				r = x - z
+				s = y - z
+				p = ( r * s - w ) / a[ m + 1 ][ m ] + a[ m ][ m + 1 ]
+				q = a[ m + 1 ][ m + 1 ] - z - r - s
+				r = a[ m + 2 ][ m + 1 ]
+				s = abs( p ) + abs( q ) + abs( r )
+				p /= s
+				q /= s
+				r /= s
+				if ( m == l ):
+					break
+				u = abs( a[ m ][ m - 1 ] ) * ( abs( q ) + abs( r ) )
+				v = abs( p ) * ( abs( a[ m - 1 ][ m - 1 ] ) + abs( z ) + abs( a[ m + 1 ][ m + 1 ] ) )
+				if ( u + v == v ):
+					break
+				m -= 1
+			for i in xrange( m + 2, nn + 1 ):
+				a[ i ][ i - 2 ] = 0.0
+				if ( i != m + 2 ):
+					a[ i ][ i - 3 ] = 0.0
+			for k in xrange( m, nn ):
+				if ( k != m ):
+					p = a[ k ][ k - 1 ]
+					q = a[ k + 1 ][ k - 1 ]
+					r = 0.0
+					if ( k != nn - 1 ):
+						r = a[ k + 2 ][ k - 1 ]
+					x = abs( p ) + abs( q ) + abs( r )
+					if ( x != 0.0 ):
+						p /= x
+						q /= x
+						r /= x
+				s = sqrt( p * p + q * q + r * r )
+				if ( p < 0 ):
+					s = -s
+				if ( s != 0.0 ):
+					if ( k == m ):
+						if ( l != m ):
+							a[ k ][ k - 1 ] = -a[ k ][ k - 1 ]
+					else:
+						a[ k ][ k - 1 ] = -s * x
+					p += s
+					x = p / s
+					y = q / s
+					z = r / s
+					q /= p
+					r /= p
+					rowK, rowK1 = a[ k ], a[ k + 1 ]
+					if ( k != nn - 1 ):
+						rowK2 = a[ k + 2 ]
+						ps = [ u + q * v + r * c for u, v, c in zip( rowK[ k:nn + 1 ], rowK1[ k:nn + 1 ], rowK2[ k:nn + 1 ] ) ]
+						rowK2[ k:nn + 1 ] = [ c - g * z for c, g in zip( rowK2[ k:nn + 1 ], ps ) ]
+					else:
+						ps = [ u + q * v for u, v in zip( rowK[ k:nn + 1 ], rowK1[ k:nn + 1 ] ) ]
+					rowK1[ k:nn + 1 ] = [ v - g * y for v, g in zip( rowK1[ k:nn + 1 ], ps ) ]
+					rowK[ k:nn + 1 ] = [ u - g * x for u, g in zip( rowK[ k:nn + 1 ], ps ) ]
+					for i in xrange( l, min( nn, k + 3 ) + 1 ):
+						row = a[ i ]
+						p = x * row[ k ] + y * row[ k + 1 ]
+						if ( k != nn - 1 ):
+							p += z * row[ k + 2 ]
+							row[ k + 2 ] -= p * r
+						row[ k + 1 ] -= p * q
+						row[ k ] -= p
+	returnvalue = list( )
+	for i in xrange( 1, n + 1 ):
+		if wi[ i ]:
+			returnvalue.append( complex( wr[ i ], wi[ i ] ) )
+		else:
+			returnvalue.append( wr[ i ] )
+	return returnvalue
+
+def _complexQR( a ):
+	"""
+	Internal Function: eigenvalues of a complex upper Hessenberg matrix by shifted QR
+	iteration with Wilkinson shifts and Givens rotations. The matrix is destroyed.
+
+	:rtype: list
+	:returns: The eigenvalues
+	"""
+	n = len( a )
+	returnvalue = [ 0j ] * n
+	hi = n - 1
+	its = 0
+	while ( hi >= 0 ):
+		checkpoint( )
+		if not hi:
+			returnvalue[ 0 ] = a[ 0 ][ 0 ]
+			break
+		# find the start of the unreduced block ending at hi
+		l = hi
+		while ( l > 0 ):
+			s = abs( a[ l - 1 ][ l - 1 ] ) + abs( a[ l ][ l ] )
+			if ( abs( a[ l ][ l - 1 ] ) <= EIGEN_EPSILON * s ) or not s and not a[ l ][ l - 1 ]:
+				a[ l ][ l - 1 ] = 0j
+				break
+			l -= 1
+		if ( l == hi ):
+			returnvalue[ hi ] = a[ hi ][ hi ]
+			hi -= 1
+			its = 0
+			continue
+		if ( its == EIGEN_MAX_ITERATIONS * 2 ):
+			raise ValueError( "Eigenvalues did not converge" )
+		its += 1
+		# Wilkinson shift: the eigenvalue of the trailing 2x2 block closest to the last item
+		p, q = a[ hi - 1 ][ hi - 1 ], a[ hi - 1 ][ hi ]
+		r, s = a[ hi ][ hi - 1 ], a[ hi ][ hi ]
+		if ( its % 10 == 0 ):
+			shift = s + abs( r ) # exceptional shift
+		else:
+			half = ( p - s ) / 2.0
+			root = ( half * half + q * r ) ** 0.5
+			if ( abs( half + root ) < abs( half - root ) ):
+				root = -root
+			if ( half + root ):
+				shift = s - q * r / ( half + root )
+			else:
+				shift = s
+		for i in xrange( l, hi + 1 ):
+			a[ i ][ i ] -= shift
+		rotations = list( )
+		for k in xrange( l, hi ):
+			x, y = a[ k ][ k ], a[ k + 1 ][ k ]
+			norm = sqrt( abs( x ) ** 2 + abs( y ) ** 2 )
+			if ( norm == 0.0 ):
+				c, sn = 1.0, 0j
+			else:
+				c, sn = x / norm, y / norm
+			cc, snc = c.conjugate( ), sn.conjugate( )
+			rowK, rowK1 = a[ k ], a[ k + 1 ]
+			for j in xrange( k, hi + 1 ):
+				u, v = rowK[ j ], rowK1[ j ]
+				rowK[ j ] = cc * u + snc * v
+				rowK1[ j ] = c * v - sn * u
+			rotations.append( ( k, c, sn ) )
+		for k, c, sn in rotations:
+			for i in xrange( l, min( k + 2, hi ) + 1 ):
+				row = a[ i ]
+				u, v = row[ k ], row[ k + 1 ]
+				row[ k ] = u * c + v * sn
+				row[ k + 1 ] = v * c.conjugate( ) - u * sn.conjugate( )
+		for i in xrange( l, hi + 1 ):
+			a[ i ][ i ] += shift
+	return returnvalue
+
+def _inverseIteration( rows, value ):
+	"""
+	Internal Function: finds an eigenvector for a known eigenvalue by inverse iteration,
+	solving ( A - value I ) y = x repeatedly.
+
+	:rtype: list
+	:returns: The eigenvector, scaled to unit length.
+	"""
+	n = len( rows )
+	norm = max( [ sum( [ abs( t ) for t in row ] ) for row in rows ] ) or 1.0
+	# perturb the shift slightly so that the system is not exactly singular
+	shift = value + norm * EIGEN_EPSILON * 16
+	lu = [ [ complex( t ) for t in row ] for row in rows ]
+	for i in xrange( n ):
+		lu[ i ][ i ] -= shift
+	pivots = range( n )
+	for k in xrange( n ):
+		p = max( xrange( k, n ), key = lambda i: abs( lu[ i ][ k ] ) )
+		lu[ k ], lu[ p ] = lu[ p ], lu[ k ]
+		pivots[ k ], pivots[ p ] = pivots[ p ], pivots[ k ]
+		pivot = lu[ k ][ k ]
+		if not pivot:
+			pivot = lu[ k ][ k ] = norm * EIGEN_EPSILON
+		rowK = lu[ k ]
+		for i in xrange( k + 1, n ):
+			row = lu[ i ]
+			f = row[ k ] / pivot
+			row[ k ] = f
+			if f:
+				row[ k + 1: ] = [ t - f * u for t, u in zip( row[ k + 1: ], rowK[ k + 1: ] ) ]
+	x = [ 1.0 + 0j ] * n
+	for iteration in xrange( EIGEN_INVERSE_ITERATIONS ):
+		y = [ x[ pivots[ i ] ] for i in xrange( n ) ]
+		for i in xrange( n ):
+			y[ i ] -= sum( map( mul, lu[ i ][ :i ], y[ :i ] ) )
+		for i in xrange( n - 1, -1, -1 ):
+			y[ i ] = ( y[ i ] - sum( map( mul, lu[ i ][ i + 1: ], y[ i + 1: ] ) ) ) / lu[ i ][ i ]
+		size = sqrt( sum( [ abs( t ) ** 2 for t in y ] ) )
+		x = [ t / size for t in y ]
+	# make the largest component real and positive, so real eigenvectors come out real
+	big = max( x, key = abs )
+	phase = big.conjugate( ) / abs( big )
+	x = [ t * phase for t in x ]
+	if not ( type( value ) == types.ComplexType ) and not [ t for t in x if abs( t.imag ) > sqrt( EIGEN_EPSILON ) ]:
+		return [ t.real for t in x ]
+	return x
+
+def eigenvalues( value, symmetric = None ):
+	"""
+	Eigenvalues of a square matrix of floats, ints, fractions or complex numbers.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list )
+		symmetric : boolean
+			Whether the matrix is real and symmetric. Checked if not given.
+
+	:rtype: list
+	:returns: The eigenvalues, repeated according to multiplicity. Symmetric matrices give \
+	floats in ascending order, others floats and complex numbers sorted by real part.
+	"""
+	rows, isComplex = _rows( value )
+	if not rows:
+		return list( )
+	if symmetric is None:
+		symmetric = not isComplex and _isSymmetric( rows )
+	if symmetric:
+		d, e = _tred2( rows, False )
+		return _tql2( d, e, None )
+	_hessenberg( rows )
+	if isComplex:
+		returnvalue = _complexQR( rows )
+	else:
+		returnvalue = _hqr( rows )
+	return sorted( returnvalue, key = lambda v: ( v.real, v.imag ) )
+
+def eigenvectors( value, symmetric = None ):
+	"""
+	Eigenvalues and eigenvectors of a square matrix of floats, ints, fractions or complex
+	numbers. Eigenvectors of non-symmetric matrices are found by inverse iteration, so for
+	a repeated eigenvalue the same vector may be returned more than once.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list )
+		symmetric : boolean
+			Whether the matrix is real and symmetric. Checked if not given.
+
+	:rtype: tuple
+	:returns: The eigenvalues, as for eigenvalues( ), and a matrix whose columns are the \
+	matching eigenvectors, each of unit length.
+	"""
+	rows, isComplex = _rows( value )
+	if not rows:
+		return list( ), matrix( )
+	if symmetric is None:
+		symmetric = not isComplex and _isSymmetric( rows )
+	if symmetric:
+		w = [ list( row ) for row in rows ]
+		d, e = _tred2( w, True )
+		values = _tql2( d, e, w )
+		return values, matrix( [ list( row ) for row in zip( *w ) ] )
+	values = eigenvalues( rows, False )
+	vectors = [ _inverseIteration( rows, v ) for v in values ]
+	return values, matrix( [ list( row ) for row in zip( *vectors ) ] )
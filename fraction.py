@@ -20,22 +20,27 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
 from __future__ import division # forward compatibility. I don't like this change, but I want to make sure things work in python 3.0
 import types
 from sys import maxint as MAXINT
+import primes
 
 VERSION = "0.1"
 
 FRACTION_VALID_TYPES = ( types.IntType, types.LongType, types.ComplexType, types.FloatType )
 FRACTION_FLOAT_ACCURACY = 8 # how many decimal places to round floats to. This may be overidden to increase/decrease accuracy, but don't make it too large.
 
+_POWERS_OF_TEN = [ 10 ** i for i in range( 32 ) ] # denominators for the decimal parser, so the common cases skip the '**'
+
 
 class fraction( object ):
 	"""
 	A class for dealing with fractions
 	"""
 
+	__matrixscalar__ = True # fractions are valid matrix items
+
 	def __init__( self, *arg ):
 		"""
-		Constructor. Takes either 2 ints ( or longs ) or a fraction. Passing the constructor a
-		fraction simply makes a copy of the original.
+		Constructor. Takes either 2 ints ( or longs ), a fraction, or a string such as "-355/113",
+		"3.14159" or "1.5e-3". Passing the constructor a fraction simply makes a copy of the original.
 
 		:Parameters:
 			arg : int
@@ -71,6 +76,8 @@ class fraction( object ):
 			elif ( type( arg[ 0 ] ) == type( self ) ): # if the argument is a fraction, copy it.
 				self.numerator = arg[ 0 ].numerator
 				self.denominator = arg[ 0 ].denominator
+			elif ( type( arg[ 0 ] ) in types.StringTypes ): # text such as "-355/113" or "3.14159"
+				self.numerator, self.denominator = _parseParts( arg[ 0 ] )
 			else:
 				try: # check to see if the object has a __fraction__ method that returns a fraction. If not, raise an error.
 					f = arg[ 0 ].__fraction__( )
@@ -111,23 +118,32 @@ class fraction( object ):
 		"""
 		Internal Function: reduces the fraction to it's simplest form.
 		"""
-		numFactors = self._factor( self.numerator )
-		denFactors = self._factor( self.denominator )
-		i = j = 0
-		while ( i < len( numFactors ) ):
-			j = 0
-			while ( j < len( denFactors ) ):
-				if ( numFactors[ i ] == denFactors[ j ] ):
-					self.numerator /= numFactors[ i ]
-					self.denominator /= denFactors[ j ]
-					numFactors.pop( i )
-					denFactors.pop( j )
-					j = 0
-				else:
-					j+=1
-				if ( i >= len( numFactors ) ): #make sure that wasn't the last factor
-					break
-			i+=1
+		if ( types.ComplexType in ( type( self.numerator ), type( self.denominator ) ) ):
+			numFactors = self._factor( self.numerator )
+			denFactors = self._factor( self.denominator )
+			i = j = 0
+			while ( i < len( numFactors ) ):
+				j = 0
+				while ( j < len( denFactors ) ):
+					if ( numFactors[ i ] == denFactors[ j ] ):
+						self.numerator /= numFactors[ i ]
+						self.denominator /= denFactors[ j ]
+						numFactors.pop( i )
+						denFactors.pop( j )
+						j = 0
+					else:
+						j+=1
+					if ( i >= len( numFactors ) ): #make sure that wasn't the last factor
+						break
+				i+=1
+		else:
+			# no need to factor anything for real values, the gcd is all we need.
+			divisor = primes.gcd( self.numerator, self.denominator )
+			if ( divisor > 1 ):
+				self.numerator //= divisor
+				self.denominator //= divisor
+			if ( self.numerator < 0 ) and ( self.denominator < 0 ):
+				self.numerator, self.denominator = -self.numerator, -self.denominator
 		# we can sometimes simplify complex fractions more if the denominator has no real component
 		if ( type( self.denominator ) == types.ComplexType ) and not ( self.denominator.real ):
 			self.numerator *= -1j
@@ -188,18 +204,7 @@ class fraction( object ):
 					value /= v
 				returnvalue.append( value )
 		else:
-			if value < 0:
-				value = -value
-				returnvalue.append( -1 )
-			i = 2
-			while ( i*i <= value ):
-				if not ( value % i ):
-					returnvalue.append( i )
-					value /= i
-				else:
-					i+=1
-			if ( value > 1 ):
-				returnvalue.append( value ) # at this point 'value' is a float, but it doesn't seem to affect things.
+			returnvalue = primes.factor( int( value ) )
 		return returnvalue
 
 	def __abs__( self ):
@@ -605,6 +610,16 @@ class fraction( object ):
 
 		return self + ( -value )
 
+	def factors( self ):
+		"""
+		Determines the prime factors of the numerator and denominator of this fraction.
+
+		:rtype: tuple
+		:returns: A 2 item tuple containing a list of the prime factors of the numerator \
+		in item 0 and a list of the prime factors of the denominator in item 1.
+		"""
+		return ( self._factor( self.numerator ), self._factor( self.denominator ) )
+
 	def inverse( self ):
 		"""
 		Returns the multiplicative inverse of this fraction
@@ -614,3 +629,148 @@ class fraction( object ):
 		"""
 		return fraction( self.denominator, self.numerator )
 
+def _pow10( exponent ):
+	"""
+	Internal Function: returns 10 ** exponent for a non-negative exponent.
+	"""
+	if ( exponent < len( _POWERS_OF_TEN ) ):
+		return _POWERS_OF_TEN[ exponent ]
+	return 10 ** exponent
+
+def _parseDecimal( text ):
+	"""
+	Internal Function: parses an integer or decimal literal ( with an optional exponent )
+	into an exact numerator/denominator pair without going through float.
+	"""
+	if not ( '.' in text or 'e' in text or 'E' in text ):
+		return int( text ), 1
+	mantissa, e, exponent = text.replace( 'E', 'e' ).partition( 'e' )
+	whole, point, decimals = mantissa.strip( ).partition( '.' )
+	digits = whole + decimals
+	if ( ( not digits ) or digits in ( '+', '-' ) ):
+		raise ValueError
+	numerator = int( digits )
+	denominator = _pow10( len( decimals ) )
+	if e:
+		exponent = int( exponent )
+		if ( exponent > 0 ):
+			numerator *= _pow10( exponent )
+		else:
+			denominator *= _pow10( -exponent )
+	return numerator, denominator
+
+def _parseParts( text ):
+	"""
+	Internal Function: parses text into a reduced numerator/denominator pair.
+	"""
+	try:
+		numerator, slash, denominator = text.partition( '/' )
+		numerator, scale = _parseDecimal( numerator )
+		if slash:
+			denominator, denominatorScale = _parseDecimal( denominator )
+			numerator *= denominatorScale
+			denominator *= scale
+		else:
+			denominator = scale
+	except ValueError:
+		raise ValueError( "Invalid literal for fraction: %r" % text )
+	if not denominator:
+		raise ZeroDivisionError( "Denominator of a fraction cannot be 0" )
+	divisor = primes.gcd( numerator, denominator )
+	if ( divisor > 1 ):
+		numerator //= divisor
+		denominator //= divisor
+	if ( numerator < 0 ) and ( denominator < 0 ):
+		numerator, denominator = -numerator, -denominator
+	return numerator, denominator
+
+def parseFraction( text ):
+	"""
+	Creates a fraction from a string. This is the same as fraction( text ), but skips the
+	constructor's type checks.
+
+	:Parameters:
+		text : string
+			A fraction ( "-355/113" ), integer ( "42" ) or decimal ( "3.14159", "1.5e-3" ) literal.
+
+	:rtype: fraction
+	:returns: The fraction represented by text
+	"""
+	returnvalue = fraction.__new__( fraction )
+	returnvalue.numerator, returnvalue.denominator = _parseParts( text )
+	return returnvalue
+
+def parseFractions( source ):
+	"""
+	Parses many fractions. This is a generator, so arbitrarily large inputs can be
+	streamed through it.
+
+	:Parameters:
+		source : iterable or file
+			Either an iterable of literals, one per item, or a file ( anything with a \
+			'read' method ) containing whitespace-separated literals.
+
+	:rtype: generator
+	:returns: A generator yielding a fraction for each literal in source.
+	"""
+	new = fraction.__new__
+	parse = _parseParts
+	if hasattr( source, 'read' ):
+		for line in source:
+			for token in line.split( ):
+				f = new( fraction )
+				f.numerator, f.denominator = parse( token )
+				yield f
+	else:
+		for token in source:
+			f = new( fraction )
+			f.numerator, f.denominator = parse( token )
+			yield f
+
+def formatFractions( values, separator = '\n' ):
+	"""
+	Formats many fractions ( or other numbers ) at once, in the same format as repr( fraction ).
+
+	:Parameters:
+		values : iterable
+			The values to format
+		separator : string
+			The string placed between the formatted values
+
+	:rtype: string
+	:returns: The formatted values, joined by separator.
+	"""
+	fractionType = fraction
+	return separator.join( [ ( "%s/%s" % ( v.numerator, v.denominator ) ) if ( type( v ) is fractionType ) else str( v ) for v in values ] )
+
+def writeFractions( values, file, separator = '\n', chunkSize = 4096 ):
+	"""
+	Writes many fractions ( or other numbers ) to a file, formatting them in chunks
+	so that arbitrarily large inputs never have to be held in memory at once.
+
+	:Parameters:
+		values : iterable
+			The values to write
+		file : file
+			The file ( anything with a 'write' method ) to write to.
+		separator : string
+			The string written after each value
+		chunkSize : int
+			How many values to format per write.
+	"""
+	fractionType = fraction
+	write = file.write
+	chunk = list( )
+	append = chunk.append
+	for v in values:
+		if ( type( v ) is fractionType ):
+			append( "%s/%s" % ( v.numerator, v.denominator ) )
+		else:
+			append( str( v ) )
+		if ( len( chunk ) >= chunkSize ):
+			append( '' )
+			write( separator.join( chunk ) )
+			del chunk[ : ]
+	if chunk:
+		append( '' )
+		write( separator.join( chunk ) )
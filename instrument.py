@@ -0,0 +1,324 @@
+"""
+instrument.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Operation counters and timing for the matrix and fraction classes.
+
+Nothing in the matrix or fraction classes refers to this module. enable( ) wraps their
+methods in place and disable( ) puts the originals back, so leaving instrumentation
+switched off costs nothing at all.
+
+Every call to an instrumented method which is not made from inside another one is timed,
+and the events below are attributed to it:
+
+	allocations  - matrix and fraction objects constructed
+	scalar ops   - fraction arithmetic and comparison operators called
+	reductions   - fraction._reduce calls
+	copies       - matrices constructed from another matrix ( minor, +matrix, etc. )
+	validations  - rows and columns checked by insertRow and insertColumn
+
+Arithmetic on plain ints and floats is done by the interpreter and is not counted.
+"""
+
+import threading
+from time import time
+
+import matrix as _matrix
+import fraction as _fraction
+
+VERSION = "0.1"
+
+INSTRUMENT_COUNTERS = ( 'allocations', 'scalar ops', 'reductions', 'copies', 'validations' )
+INSTRUMENT_OPERATORS = ( '__abs__', '__add__', '__contains__', '__div__', '__divmod__', '__eq__', '__float__',
+	'__ge__', '__gt__', '__int__', '__invert__', '__le__', '__long__', '__lt__', '__mod__', '__mul__', '__ne__',
+	'__neg__', '__nonzero__', '__pos__', '__pow__', '__radd__', '__rdiv__', '__rmul__', '__rsub__', '__sub__',
+	'__truediv__', '__rtruediv__' )
+
+_enabled = False
+_originals = dict( ) # ( class, name ) -> the original function, while enabled
+_watched = list( ) # ( class, { name : counter function } )
+_lock = threading.RLock( )
+_local = threading.local( )
+_totals = None # the profileReport of everything collected so far, created below
+_reports = list( )
+
+
+def _allocation( args ):
+	"""
+	Internal Function: counter for constructors.
+	"""
+	return ( 'allocations', )
+
+def _matrixAllocation( args ):
+	"""
+	Internal Function: counter for the matrix constructor, which also counts copies.
+	"""
+	if ( len( args ) == 2 ) and isinstance( args[ 1 ], _matrix.matrix ):
+		return ( 'allocations', 'copies' )
+	return ( 'allocations', )
+
+def _scalarOp( args ):
+	"""
+	Internal Function: counter for fraction operators.
+	"""
+	return ( 'scalar ops', )
+
+def _reduction( args ):
+	"""
+	Internal Function: counter for fraction._reduce.
+	"""
+	return ( 'reductions', )
+
+def _validation( args ):
+	"""
+	Internal Function: counter for insertRow and insertColumn.
+	"""
+	return ( 'validations', )
+
+
+class profileReport( object ):
+	"""
+	The statistics collected by instrumentation, per public method.
+	"""
+
+	def __init__( self, stats = None ):
+		"""
+		Constructor.
+
+		:Parameters:
+			stats : dict
+				A dictionary mapping method names to dictionaries of statistics.
+		"""
+		self.stats = dict( )
+		if stats:
+			for name, record in stats.items( ):
+				self.stats[ name ] = dict( record )
+
+	def __getitem__( self, name ):
+		"""
+		Get the statistics for a method.
+
+		Call: report[ 'matrix.inverse' ]
+
+		:rtype: dict
+		:returns: A dictionary with 'calls', 'time' and a count for each of INSTRUMENT_COUNTERS.
+		"""
+		return self.stats[ name ]
+
+	def __repr__( self ):
+		"""
+		Representation. Formats the report as a table, slowest methods first.
+
+		:rtype: string
+		:returns: A formatted table of the statistics.
+		"""
+		names = sorted( self.stats, key = lambda n: -self.stats[ n ][ 'time' ] )
+		width = max( [ len( 'method' ) ] + [ len( n ) for n in names ] )
+		columns = ( 'calls', 'time' ) + INSTRUMENT_COUNTERS
+		lines = [ ' '.join( [ 'method'.ljust( width ) ] + [ c.rjust( 12 ) for c in columns ] ) ]
+		for name in names:
+			record = self.stats[ name ]
+			line = [ name.ljust( width ), str( record[ 'calls' ] ).rjust( 12 ), ( '%.6f' % record[ 'time' ] ).rjust( 12 ) ]
+			for c in INSTRUMENT_COUNTERS:
+				line.append( str( record[ c ] ).rjust( 12 ) )
+			lines.append( ' '.join( line ) )
+		return '\n'.join( lines )
+
+	__str__ = __repr__
+
+	def _add( self, name, elapsed, counts ):
+		"""
+		Internal Function: adds one call to the statistics.
+		"""
+		record = self.stats.get( name )
+		if record is None:
+			record = self.stats[ name ] = dict.fromkeys( ( 'calls', 'time' ) + INSTRUMENT_COUNTERS, 0 )
+		record[ 'calls' ] += 1
+		record[ 'time' ] += elapsed
+		for c, n in counts.items( ):
+			record[ c ] += n
+
+
+def _state( ):
+	"""
+	Internal Function: the per-thread call state; the outermost public method being
+	run and the event counts for it.
+	"""
+	try:
+		return _local.state
+	except AttributeError:
+		_local.state = [ None, dict( ) ]
+		return _local.state
+
+def _wrap( cls, name, function, counter ):
+	"""
+	Internal Function: creates the instrumented version of a method.
+	"""
+	label = '%s.%s' % ( cls.__name__, name )
+
+	def wrapper( *args, **kwargs ):
+		state = _state( )
+		if counter is not None:
+			counts = state[ 1 ]
+			for c in counter( args ):
+				counts[ c ] = counts.get( c, 0 ) + 1
+		if ( state[ 0 ] is not None ):
+			return function( *args, **kwargs )
+		state[ 0 ] = label
+		start = time( )
+		try:
+			return function( *args, **kwargs )
+		finally:
+			elapsed = time( ) - start
+			counts = state[ 1 ]
+			state[ 0 ] = None
+			state[ 1 ] = dict( )
+			_record( label, elapsed, counts )
+
+	wrapper.__name__ = function.__name__
+	wrapper.__doc__ = function.__doc__
+	return wrapper
+
+def _record( label, elapsed, counts ):
+	"""
+	Internal Function: adds a finished outermost call to the totals and any active profiles.
+	"""
+	with _lock:
+		_totals._add( label, elapsed, counts )
+		for report in _reports:
+			report._add( label, elapsed, counts )
+
+def watch( cls, counters = None ):
+	"""
+	Adds a class to the set of instrumented classes. Its public methods and arithmetic
+	operators are timed.
+
+	:Parameters:
+		cls : type
+			The class to instrument
+		counters : dict
+			Maps method names to functions which take the method's arguments and return \
+			the names of the counters to increase for each call.
+	"""
+	with _lock:
+		_watched.append( ( cls, dict( counters or { } ) ) )
+		if _enabled:
+			_patch( cls, dict( counters or { } ) )
+
+def _patch( cls, counters ):
+	"""
+	Internal Function: replaces the methods of a class with instrumented versions.
+	"""
+	for name, value in cls.__dict__.items( ):
+		if not callable( value ) or isinstance( value, type ):
+			continue
+		if not ( name in counters or not name.startswith( '_' ) or name in INSTRUMENT_OPERATORS ):
+			continue
+		_originals[ ( cls, name ) ] = value
+		setattr( cls, name, _wrap( cls, name, value, counters.get( name ) ) )
+
+def enable( ):
+	"""
+	Switches instrumentation on.
+	"""
+	global _enabled
+	with _lock:
+		if _enabled:
+			return
+		_enabled = True
+		for cls, counters in _watched:
+			_patch( cls, counters )
+
+def disable( ):
+	"""
+	Switches instrumentation off, restoring the original methods.
+	"""
+	global _enabled
+	with _lock:
+		if not _enabled:
+			return
+		_enabled = False
+		for ( cls, name ), value in _originals.items( ):
+			setattr( cls, name, value )
+		_originals.clear( )
+
+def isEnabled( ):
+	"""
+	Checks whether instrumentation is switched on.
+
+	:rtype: boolean
+	:returns: True if instrumentation is enabled
+	"""
+	return _enabled
+
+def snapshot( ):
+	"""
+	Returns the statistics collected since instrumentation was first enabled ( or since
+	the last reset( ) ).
+
+	:rtype: profileReport
+	:returns: A copy of the collected statistics.
+	"""
+	with _lock:
+		return profileReport( _totals.stats )
+
+def reset( ):
+	"""
+	Clears the collected statistics.
+	"""
+	with _lock:
+		_totals.stats.clear( )
+
+
+class profile( object ):
+	"""
+	A context manager which collects a report of the calls made while it is active
+	( in any thread ), enabling instrumentation for the duration if needed.
+
+	Call: with profile( ) as report: ...
+	"""
+
+	def __init__( self ):
+		"""
+		Constructor.
+		"""
+		self.report = profileReport( )
+		self._enabledHere = False
+
+	def __enter__( self ):
+		with _lock:
+			if not _enabled:
+				enable( )
+				self._enabledHere = True
+			_reports.append( self.report )
+		return self.report
+
+	def __exit__( self, *exc ):
+		with _lock:
+			_reports.remove( self.report )
+			if self._enabledHere:
+				disable( )
+		return False
+
+
+_totals = profileReport( )
+watch( _matrix.matrix, {
+	'__init__' : _matrixAllocation,
+	'insertRow' : _validation,
+	'insertColumn' : _validation } )
+watch( _fraction.fraction, dict( [ ( name, _scalarOp ) for name in INSTRUMENT_OPERATORS ] +
+	[ ( '__init__', _allocation ), ( '_reduce', _reduction ) ] ) )
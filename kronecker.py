@@ -0,0 +1,248 @@
+"""
+kronecker.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+"""
+
+import types
+import matrix as _matrix
+from matrix import matrix
+
+VERSION = "0.1"
+
+KRONECKER_VALID_COLLECTIONS = ( types.ListType, types.TupleType )
+
+
+class kroneckerMatrix( object ):
+	"""
+	The Kronecker product of two matrices, kept as its two factors instead of being
+	materialized. For an m x n factor A and a p x q factor B the product is mp x nq, but
+	only the mn + pq items of the factors are stored.
+
+	Multiplying by a vector uses the identity ( A x B ) vec( X ) = vec( A X B' ), where
+	vec( X ) is the n x q matrix X read row by row, and determinant, inverse and transpose
+	are found from the factors.
+	"""
+
+	def __init__( self, a, b ):
+		"""
+		Constructor.
+
+		:Parameters:
+			a : matrix
+				The left factor
+			b : matrix
+				The right factor
+		"""
+		self.a = a
+		self.b = b
+
+	def __getattr__( self, name ):
+		"""
+		Get attribute.
+
+		Call: kron.width; kron.height; kron.size
+
+		:rtype: int or tuple
+		:returns: The value requested.
+		"""
+		if name == 'width':
+			return self.a.width * self.b.width
+		if name == 'height':
+			return self.a.height * self.b.height
+		if name == 'size':
+			return ( self.width, self.height )
+		raise AttributeError( name )
+
+	def __getitem__( self, index ):
+		"""
+		Computes a row of the product.
+
+		Call: kron[x] or kron[x][y]
+
+		:Parameters:
+			index : int
+				The row requested.
+
+		:rtype: list
+		:returns: The row requested.
+		"""
+		if ( index < 0 ):
+			index += self.height
+		i, j = divmod( index, self.b.height )
+		rowB = self.b[ j ]
+		return [ x * y for x in self.a[ i ] for y in rowB ]
+
+	def __invert__( self ):
+		"""
+		Inverse.
+
+		Call: ~kron
+
+		:rtype: kroneckerMatrix
+		:returns: The inverse of the product.
+		"""
+		return self.inverse( )
+
+	def __iter__( self ):
+		"""
+		Iterates over each item in the product, first row0, then row1, etc.
+
+		:rtype: generator
+		:returns: A generator over the items of the product
+		"""
+		for i in xrange( self.height ):
+			for item in self[ i ]:
+				yield item
+
+	def __mul__( self, value ):
+		"""
+		Multiplication
+
+		Call: kron * mat, kron * kron, kron * list, kron * x
+
+		:Parameters:
+			value : number; matrix; kroneckerMatrix; list
+				What to multiply by. A list is treated as a column vector.
+
+		:rtype: matrix, kroneckerMatrix or list
+		:returns: The result of the multiplication ( Linear Algebra ). The product of \
+		two Kronecker products with compatible factors is again a Kronecker product.
+		"""
+		if isinstance( value, kroneckerMatrix ):
+			if ( self.a.width == value.a.height ) and ( self.b.width == value.b.height ):
+				# the mixed-product property: ( A x B )( C x D ) = AC x BD
+				return kroneckerMatrix( self.a * value.a, self.b * value.b )
+			value = value.materialize( )
+		if isinstance( value, matrix ):
+			if not ( self.width == value.height ):
+				raise ValueError( "Matrices are the incorrect size for '*'" )
+			columns = [ self._multiplyVector( column ) for column in value.itercols( ) ]
+			return matrix( [ list( row ) for row in zip( *columns ) ] )
+		if ( type( value ) in KRONECKER_VALID_COLLECTIONS ):
+			if not ( self.width == len( value ) ):
+				raise ValueError( "Vector is the incorrect length for '*'" )
+			return self._multiplyVector( value )
+		try:
+			return kroneckerMatrix( self.a * value, self.b )
+		except TypeError:
+			return NotImplemented
+
+	def __repr__( self ):
+		"""
+		Representation. Formats the product for printing, materializing it only if it
+		is small enough to be printed in full.
+
+		Call: repr( kron ); str( kron )
+
+		:rtype: string
+		:returns: A formatted representation of the product.
+		"""
+		if ( self.width * self.height <= _matrix.MATRIX_REPR_THRESHOLD ):
+			return repr( self.materialize( ) )
+		return "<kroneckerMatrix %dx%d of %dx%d and %dx%d factors>" % ( self.height, self.width,
+			self.a.height, self.a.width, self.b.height, self.b.width )
+
+	def __rmul__( self, value ):
+		"""
+		Right side multiplication
+
+		Call: mat * kron, x * kron
+
+		:rtype: matrix or kroneckerMatrix
+		:returns: The result of the multiplication ( Linear Algebra )
+		"""
+		if isinstance( value, matrix ):
+			# M K = ( K' M' )'
+			return ( self.transpose( ) * value.transpose( ) ).transpose( )
+		return self.__mul__( value )
+
+	__str__ = __repr__
+
+	def _multiplyVector( self, vector ):
+		"""
+		Internal Function: multiplies the product by a column vector ( given as a list )
+		without forming the product: reshape the vector into X, row by row, and return
+		A X B', row by row.
+		"""
+		n, q = self.a.width, self.b.width
+		rowsA = [ self.a[ i ] for i in xrange( self.a.height ) ]
+		rowsB = [ self.b[ j ] for j in xrange( self.b.height ) ]
+		x = [ vector[ k * q:( k + 1 ) * q ] for k in xrange( n ) ]
+		# T = X B', which is n x p
+		t = [ [ sum( [ u * v for u, v in zip( rowX, rowB ) ] ) for rowB in rowsB ] for rowX in x ]
+		columnsT = zip( *t )
+		# Y = A T, which is m x p
+		returnvalue = list( )
+		for rowA in rowsA:
+			returnvalue.extend( [ sum( [ u * v for u, v in zip( rowA, columnT ) ] ) for columnT in columnsT ] )
+		return returnvalue
+
+	def determinant( self ):
+		"""
+		Determinant. Only for square factors: det( A x B ) = det( A ) ** p * det( B ) ** m
+		for an m x m factor A and a p x p factor B.
+
+		:rtype: number
+		:returns: The determinant of the product
+		"""
+		if not ( self.a.isSquare( ) and self.b.isSquare( ) ):
+			raise ValueError( "Determinant is only defined here for square factors" )
+		return ( self.a.determinant( ) ** self.b.height ) * ( self.b.determinant( ) ** self.a.height )
+
+	# An alias for determinant
+	det = determinant
+
+	def inverse( self ):
+		"""
+		Inverse. Only for square factors: inv( A x B ) = inv( A ) x inv( B )
+
+		:rtype: kroneckerMatrix
+		:returns: The inverse of the product.
+		"""
+		if not ( self.a.isSquare( ) and self.b.isSquare( ) ):
+			raise ValueError( "Inverse is only defined here for square factors" )
+		return kroneckerMatrix( self.a.inverse( ), self.b.inverse( ) )
+
+	def isSquare( self ):
+		"""
+		Checks for a square product
+
+		:rtype: boolean
+		:returns: True if the product is square
+		"""
+		return self.width == self.height
+
+	def materialize( self ):
+		"""
+		Forms the full product.
+
+		:rtype: matrix
+		:returns: The Kronecker product as a matrix.
+		"""
+		return matrix( [ self[ i ] for i in xrange( self.height ) ] )
+
+	# An alias for materialize
+	toMatrix = materialize
+
+	def transpose( self ):
+		"""
+		Transpose: ( A x B )' = A' x B'
+
+		:rtype: kroneckerMatrix
+		:returns: The transpose of the product.
+		"""
+		return kroneckerMatrix( self.a.transpose( ), self.b.transpose( ) )
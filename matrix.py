@@ -18,8 +18,10 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
 """
 
 import types
-from sys import argv
-import os
+import hashlib
+from itertools import chain, izip, repeat
+from operator import add, mul, neg, sub
+from aio import checkpoint
 
 VERSION = "0.3-pre"
 
@@ -27,14 +29,129 @@ MATRIX_VALID_TYPES = ( types.IntType, types.FloatType, types.LongType, types.Com
 MATRIX_VALID_TYPENAMES = ( 'int', 'float', 'long', 'complex' )
 MATRIX_VALID_INTS = ( types.IntType, types.LongType )
 MATRIX_VALID_COLLECTIONS = ( types.ListType, types.TupleType )
-MATRIX_USE_FRACTION = False
+MATRIX_USE_FRACTION = True # use exact fractions for division when the fraction module is available
+MATRIX_MODULAR_THRESHOLD = 4 # integer matrices at least this size use the multi-modular determinant
+MATRIX_REPR_THRESHOLD = 1000 # matrices with more items than this are summarized by repr( )
+MATRIX_REPR_EDGEITEMS = 3 # how many rows and columns a summary shows at each edge
 
-# add the fraction class if it is available
-if os.path.exists( os.path.join( os.path.abspath( os.path.dirname( argv[ 0 ] ) ), "fraction.py" ) ):
-	import fraction as _fraction
-	MATRIX_USE_FRACTION = True
-	MATRIX_VALID_TYPES = MATRIX_VALID_TYPES + ( type( _fraction.fraction( 1, 2 ) ), )
-	MATRIX_VALID_TYPENAMES += ( 'fraction', )
+# The scalar type registry maps each valid item type to its name, so checking an item is a
+# single dictionary lookup. MATRIX_VALID_TYPES and MATRIX_VALID_TYPENAMES are kept in step with it.
+_scalarTypes = dict( zip( MATRIX_VALID_TYPES, MATRIX_VALID_TYPENAMES ) )
+_scalarTypeMessage = "Values must be of type 'int' or 'float' or 'long' or 'complex'"
+_fraction = None # the fraction module, once it has been loaded by _loadFraction( )
+_fractionLoaded = False
+
+
+def _loadFraction( ):
+	"""
+	Internal Function: imports the fraction module the first time it is needed and registers
+	the fraction class as a scalar type.
+
+	:rtype: module
+	:returns: The fraction module, or None if it is not available.
+	"""
+	global _fraction, _fractionLoaded
+	if not _fractionLoaded:
+		_fractionLoaded = True
+		try:
+			import fraction
+		except ImportError:
+			return None
+		_fraction = fraction
+		registerScalarType( fraction.fraction, 'fraction' )
+	return _fraction
+
+def _canonical( item ):
+	"""
+	Internal Function: a string form of a matrix item which is the same for all values
+	of the built-in types and fractions which are exactly equal, for fingerprint( ). A
+	finite float is exactly a fraction, so it is written as that fraction.
+
+	:rtype: string
+	:returns: The canonical string for item
+	"""
+	itemType = type( item )
+	if ( itemType in MATRIX_VALID_INTS ):
+		return str( item )
+	if ( itemType == types.FloatType ):
+		if not ( item - item == 0 ): # infinite, or not a number
+			return repr( item )
+		numerator, denominator = item.as_integer_ratio( )
+	elif ( itemType == types.ComplexType ):
+		if not item.imag:
+			return _canonical( item.real )
+		return repr( item )
+	else:
+		numerator = getattr( item, 'numerator', None )
+		denominator = getattr( item, 'denominator', None )
+	if ( type( numerator ) in MATRIX_VALID_INTS ) and ( type( denominator ) in MATRIX_VALID_INTS ):
+		if ( denominator < 0 ):
+			numerator, denominator = -numerator, -denominator
+		if ( denominator == 1 ):
+			return str( numerator )
+		return '%d/%d' % ( numerator, denominator )
+	return repr( item )
+
+def _rowFormatter( itemwidth ):
+	"""
+	Internal Function: creates the function which formats a row of a matrix for __repr__,
+	with each item padded to itemwidth.
+
+	:rtype: function
+	:returns: A function taking a row and returning its formatted string.
+	"""
+	floatFormat = " %%%d.3f " % itemwidth
+	otherFormat = " %%%ds " % itemwidth
+	floatType = types.FloatType
+	def formatRow( row ):
+		return '[' + ''.join( [ ( floatFormat if ( type( item ) == floatType ) else otherFormat ) % item for item in row ] ) + ']'
+	return formatRow
+
+def _multiplyInto( rows, columns, out, modulo = None ):
+	"""
+	Internal Function: multiplies a list of rows by the columns of another matrix ( a list
+	of tuples, as from zip( *rows ) ), writing the product into the existing rows of out.
+
+	:Parameters:
+		rows : list
+			The rows of the left factor.
+		columns : list
+			The columns of the right factor.
+		out : list
+			As many lists as there are rows, which are overwritten with the product.
+		modulo : int
+			If given, each item of the product is reduced modulo this.
+	"""
+	if modulo is None:
+		for row, outRow in izip( rows, out ):
+			checkpoint( )
+			outRow[ : ] = [ sum( map( mul, row, column ) ) for column in columns ]
+	else:
+		for row, outRow in izip( rows, out ):
+			checkpoint( )
+			outRow[ : ] = [ sum( map( mul, row, column ) ) % modulo for column in columns ]
+
+def _lookupScalarType( itemType ):
+	"""
+	Internal Function: the slow path of the scalar type check, for types which are not
+	registered yet. Loads the fraction class if that hasn't been done, and registers any type
+	which declares itself a matrix scalar with a true '__matrixscalar__' attribute.
+
+	:Parameters:
+		itemType : type
+			The type to check
+
+	:rtype: boolean
+	:returns: True if itemType is a valid matrix item type.
+	"""
+	if not _fractionLoaded:
+		_loadFraction( )
+		if itemType in _scalarTypes:
+			return True
+	if getattr( itemType, '__matrixscalar__', False ):
+		registerScalarType( itemType )
+		return True
+	return False
 
 
 class matrix( object ):
@@ -57,7 +174,7 @@ class matrix( object ):
 
 		if rows:
 			# if the value passed into the constructor is a matrix
-			if ( ( len( rows ) == 1 ) and ( type( rows[ 0 ] ) == type( self ) ) ):
+			if ( ( len( rows ) == 1 ) and isinstance( rows[ 0 ], matrix ) ):
 				for row in rows[ 0 ].value:
 					newRow = list( )
 					for item in row: # this should make a deep copy.
@@ -99,13 +216,7 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: a copy of the matrix with all values changed to their absolute value
 		"""
-		returnvalue = matrix( )
-		for row in self._value:
-			newRow = list()
-			for item in row: # this should make a deep copy.
-				newRow.append( abs( item ) )
-			returnvalue.append( newRow )
-		return returnvalue
+		return self.map( abs )
 
 	def __add__( self, obj ):
 		"""
@@ -116,17 +227,11 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: The result of adding mat1 and mat2 ( Linear Algebra )
 		"""
-		if not ( type( self ) == type( obj ) ):
+		if not isinstance( obj, matrix ):
 			return NotImplemented
 		if not ( self.size == obj.size ):
-			raise matrixSizeError( "Matrices must be the same size for '+'" )
-		returnvalue = matrix( )
-		for i in range( self._height ):
-			currentRow = list( )
-			for j in range( self._width ):
-				currentRow.append( self._value[ i ][ j ] + obj.value[ i ][ j ] )
-			returnvalue.addRow( *currentRow )
-		return returnvalue
+			raise ValueError( "Matrices must be the same size for '+'" )
+		return self.map2( add, obj )
 
 	def __contains__( self, item ):
 		"""
@@ -157,18 +262,19 @@ class matrix( object ):
 			obj : number
 				The number to divide each item in the matrix by.
 		"""
-		if ( type( obj ) in MATRIX_VALID_TYPES):
+		if ( type( obj ) in _scalarTypes or _lookupScalarType( type( obj ) ) ):
+			useFraction = MATRIX_USE_FRACTION and _loadFraction( )
 			returnvalue = matrix( )
 			for row in self._value:
 				newRow = list( )
 				for item in row:
-					if ( MATRIX_USE_FRACTION ):
+					if ( useFraction ):
 						newItem = _fraction.fraction( item, obj )
 					else:
 						newItem = item / obj
 					# convert all of the round values to int.
 					if ( type( newItem ) != types.ComplexType ) and ( round( newItem, 4 ) == long( newItem ) ):
-						if not ( MATRIX_USE_FRACTION and ( type( newItem ) == type( _fraction.fraction( 1, 2 ) ) ) ):
+						if not ( useFraction and ( type( newItem ) == _fraction.fraction ) ):
 							newItem = int( round( newItem ) )
 					newRow.append( newItem )
 				returnvalue.addRow( *newRow )
@@ -203,26 +309,28 @@ class matrix( object ):
 		"""
 		return float( self.determinant( ) )
 
-	def __eq__( self, matrix ):
+	def __eq__( self, value ):
 		"""
 		Equality
 
 		Call: mat1 == mat2
 
 		:Parameters:
-			matrix : matrix
+			value : matrix
 				The matrix to compare this matrix to
 			
 		:rtype: boolean
 		:returns: True if the matrices are identical
 		"""
-		if not ( type( self ) == type( matrix ) ):
+		if not isinstance( value, matrix ):
 			return NotImplemented
-		if not ( self.size == matrix.size ):
+		if not ( self.size == value.size ):
 			return False
-		for i in range( self._height ):
-			for j in range( self._width ):
-				if not ( self.value[ i ][ j ] == matrix.value[ i ][ j ] ):
+		# compare a row at a time, which stops at the first differing row.
+		for a, b in izip( self._value, value._value ):
+			if not ( a == b ):
+				# a frozenMatrix row is a tuple, which never equals a list.
+				if ( type( a ) is type( b ) ) or not ( list( a ) == list( b ) ):
 					return False
 		return True
 
@@ -248,6 +356,8 @@ class matrix( object ):
 			return list( self._value )
 		if name == 'size':
 			return ( int( self._width ), int( self._height ) )
+		# anything else is missing, which pickle and hasattr( ) rely on seeing
+		raise AttributeError( name )
 
 	def __getitem__( self , index ):
 		"""
@@ -293,15 +403,15 @@ class matrix( object ):
 
 	def __iter__( self ):
 		"""
-		Simple iterator method
+		Iterates over each item in the matrix, first row0, then row1, etc. Each call returns
+		a new iterator, so iterations over the same matrix can be nested.
 
 		Call: for x in mat:, list( mat ), etc.
 
-		:rtype: matrix
-		:returns: self
+		:rtype: iterator
+		:returns: An iterator over the items of the matrix
 		"""
-		self._iterpos = 0
-		return self
+		return chain.from_iterable( self._value )
 
 	def __mod__( self, mod ):
 		"""
@@ -316,15 +426,9 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: A matrix with all items modded
 		"""
-		if not ( type( mod ) in  MATRIX_VALID_TYPES):
+		if not ( type( mod ) in _scalarTypes or _lookupScalarType( type( mod ) ) ):
 			return NotImplemented
-		returnvalue = matrix( )
-		for i in range( self._height ):
-			currentRow = list( )
-			for j in range( self._width ):
-				currentRow.append( self._value[ i ][ j ] % mod )
-			returnvalue.addRow( *currentRow )
-		return returnvalue
+		return self.map( lambda item: item % mod )
 	
 	def __mul__( self, obj ):
 		"""
@@ -340,18 +444,19 @@ class matrix( object ):
 		:returns: The result of the multiplication ( Linear Algebra )
 		"""
 		returnvalue = matrix( )
-		if ( type( obj ) in MATRIX_VALID_TYPES):
+		if ( type( obj ) in _scalarTypes or _lookupScalarType( type( obj ) ) ):
 			for row in self._value:
 				newRow = list( )
 				for item in row:
 					newRow.append( item * obj )
 				returnvalue.addRow( *newRow )
 			return returnvalue
-		if ( type ( obj ) == type ( self ) ):
+		if isinstance( obj, matrix ):
 			if not ( self._width == obj.height ):
 				raise ValueError( "Matrices are the incorrect size for '*'" )
 			else:
 				for i in range( self._height ):
+					checkpoint( )
 					row = list()
 					for j in range( obj.width ):
 						item = 0
@@ -362,20 +467,23 @@ class matrix( object ):
 				return returnvalue
 		return NotImplemented
 	
-	def __ne__( self, matrix ):
+	def __ne__( self, value ):
 		"""
 		Non-equality
 
 		Call: matrix1 != matrix2
 
 		:Parameters:
-			matrix : matrix
+			value : matrix
 				The matrix to compare this matrix to.
 
 		:rtype: boolean
 		:returns: True if the matrices are NOT equal
 		"""
-		return not __eq__( matrix )
+		returnvalue = self.__eq__( value )
+		if ( returnvalue is NotImplemented ):
+			return returnvalue
+		return not returnvalue
 	
 	def __neg__( self ):
 		"""
@@ -384,7 +492,7 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: A matrix with the sign of each item changed.
 		"""
-		return self.__mul__( -1 )
+		return self.map( neg )
 
 	def __nonzero__( self ):
 		"""
@@ -412,34 +520,70 @@ class matrix( object ):
 		"""
 		return matrix( self )
 
-	def __pow__( self, power ):
+	def __pow__( self, power, modulo = None ):
 		"""
-		Power. This is only valid for square matrices
+		Power. This is only valid for square matrices. Uses repeated squaring, so about
+		log2( power ) products are needed, or the Cayley-Hamilton theorem when that takes
+		fewer ( see charpoly.power ). A power of 0 gives the identity matrix, and a negative
+		power raises the inverse.
 
-		Call: mat ** x or pow( mat, x )
+		Call: mat ** x or pow( mat, x ) or pow( mat, x, m )
 		
 		:Parameters:
 			power : int
 				The power to raise this matrix to
+			modulo : int
+				If given, every item of the result is reduced modulo this. Only for \
+				int matrices and non-negative powers.
 			
 		:rtype: matrix
 		:returns: The result of the calculation ( Linear Algebra )
 		"""
-		if not ( type( power ) in  ( types.IntType, types.LongType ) ):
+		if not ( type( power ) in MATRIX_VALID_INTS ):
 			return NotImplemented
 		if not self.isSquare( ):
 			raise ValueError( "Power invalid for non-square matrices" )
-		if ( power > 0 ):
-			p = power
-			returnvalue = matrix( self )
-		elif ( power < 0 ):
-			p =  -power
-			returnvalue = self.inverse( )
-		elif ( power == 0 ):
-			return NotImplemented
-		for i in range( p - 1 ):
-			returnvalue *= returnvalue
-		return returnvalue
+		if modulo is not None:
+			if not ( type( modulo ) in MATRIX_VALID_INTS ) or ( modulo < 1 ):
+				raise ValueError( "Modulus must be a positive integer" )
+			if not self._isInteger( ):
+				raise ValueError( "Modular power is only defined for integer matrices" )
+			if ( power < 0 ):
+				raise ValueError( "Modular power is not defined for negative powers" )
+		n = self._width
+		if not power:
+			returnvalue = identMatrix( n )
+			if ( modulo == 1 ):
+				return returnvalue % 1
+			return returnvalue
+		base = self
+		if ( power < 0 ):
+			power = -power
+			base = self.inverse( )
+		if ( modulo is None ) and ( n - 1 < power.bit_length( ) ) and ( n < power ) and base._isExact( ):
+			# Cayley-Hamilton: reduce x ** power modulo the characteristic polynomial, and at
+			# most n - 1 products are needed however large the power is.
+			import charpoly
+			return charpoly.power( base, power )
+		# square and multiply, alternating between three sets of row buffers
+		if modulo is None:
+			base = [ list( row ) for row in base._value ]
+		else:
+			base = [ [ item % modulo for item in row ] for row in base._value ]
+		scratch = [ [ 0 ] * n for i in xrange( n ) ]
+		result = None
+		while power:
+			if ( power & 1 ):
+				if result is None:
+					result = [ list( row ) for row in base ]
+				else:
+					_multiplyInto( result, zip( *base ), scratch, modulo )
+					result, scratch = scratch, result
+			power >>= 1
+			if power:
+				_multiplyInto( base, zip( *base ), scratch, modulo )
+				base, scratch = scratch, base
+		return _fromRows( result )
 
 	def __repr__( self ):
 		"""
@@ -450,20 +594,10 @@ class matrix( object ):
 		:rtype: string
 		:returns: A formatted representation of this matrix.
 		"""
-		returnvalue = str( )
-		itemwidth = self._maxValueLength( )
-		for i  in range( self._height ):
-			if i:
-				returnvalue += '\n'
-			returnvalue += '['
-			for j in range( self._width ):
-				if type( self._value[ i ][ j ] ) == types.FloatType:
-					formatstring = " %%%d.3f " % ( itemwidth )
-				else:
-					formatstring = " %%%ds " % itemwidth
-				returnvalue += ( formatstring % self._value[ i ][ j ] )
-			returnvalue += ']'
-		return returnvalue
+		if ( self._height * self._width > MATRIX_REPR_THRESHOLD ):
+			return self.summary( )
+		formatRow = _rowFormatter( self._maxValueLength( ) )
+		return '\n'.join( [ formatRow( row ) for row in self._value ] )
 
 	def __rmul__( self, obj ):
 		"""
@@ -478,7 +612,7 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: The same as mat * x
 		"""
-		if ( type( obj ) in MATRIX_VALID_TYPES ):
+		if ( type( obj ) in _scalarTypes or _lookupScalarType( type( obj ) ) ):
 			return self.__mul__( obj )
 		return NotImplemented
 
@@ -497,35 +631,76 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: The result of the calculation ( Linear Algebra )
 		"""
-		if not ( type( self ) == type( obj ) ):
+		if not isinstance( obj, matrix ):
 			return NotImplemented
 		if not ( self.size == obj.size ):
-			raise ValueError( "Matrices must be the same size for '+'" )
-		returnvalue = matrix( )
-		for i in range( self._height ):
-			currentRow = list( )
-			for j in range( self._width ):
-				currentRow.append( self._value[ i ][ j ] - obj.value[ i ][ j ] )
-			returnvalue.addRow( *currentRow )
-		return returnvalue
+			raise ValueError( "Matrices must be the same size for '-'" )
+		return self.map2( sub, obj )
 
-	def _maxValueLength( self ):
+	def _isExact( self ):
+		"""
+		Internal Function: checks whether every item in the matrix is an int, long or fraction.
+
+		:rtype: boolean
+		:returns: True if the matrix contains only exact items.
+		"""
+		exact = MATRIX_VALID_INTS
+		fractionModule = _loadFraction( )
+		if fractionModule:
+			exact += ( fractionModule.fraction, )
+		for row in self._value:
+			for item in row:
+				if not ( type( item ) in exact ):
+					return False
+		return True
+
+	def _isInteger( self ):
+		"""
+		Internal Function: checks whether every item in the matrix is an int or long.
+
+		:rtype: boolean
+		:returns: True if the matrix contains only integers.
+		"""
+		ints = MATRIX_VALID_INTS
+		for row in self._value:
+			for item in row:
+				if not ( type( item ) in ints ):
+					return False
+		return True
+
+	def _maxValueLength( self, rows = None ):
 		"""
 		Get the string length of the longest item in the matrix.
 		This is for formatting the output of __str__ and __repr__.
 
+		:Parameters:
+			rows : list
+				The rows to measure, if not the whole matrix.
+
 		:rtype: int
 		:returns: The string length of the longest item in the matrix.
 		"""
+		if rows is None:
+			rows = self._value
 		returnvalue = 0
-		for row in self._value:
+		floatType = types.FloatType
+		for row in rows:
 			for item in row:
-				if ( type( item ) == type( float( ) ) ):
-					returnvalue = max(returnvalue, len(  '%.3f' % item ) )
+				if ( type( item ) == floatType ):
+					length = len( '%.3f' % item )
 				else:
-					returnvalue = max(returnvalue, len( str( item ) ) )
+					length = len( str( item ) )
+				if ( length > returnvalue ):
+					returnvalue = length
 		return returnvalue
 
+	def _replaceRows( self, rows ):
+		"""
+		Internal Function: replaces the rows of this matrix with rows of the same size,
+		without checking them.
+		"""
+		self._value[ : ] = rows
+
 	def addColumn( self, *column ):
 		"""
 		Adds a column to the matrix. This must be the same height as the current columns, if there are any.
@@ -562,11 +737,71 @@ class matrix( object ):
 	# Aliases for adjoin	t
 	adj = adjugate = adjoint
 
-	def approx( self ): #stub!
+	def approx( self ):
 		"""
 		Approximates all values by converting fractions to floating point numbers
+		( see the approx module ).
+
+		:rtype: matrix
+		:returns: A copy of this matrix with floats in place of fractions.
+		"""
+		import approx
+		return approx.approximate( self )
+
+	def allclose( self, value, rtol = 1e-05, atol = 1e-08 ):
+		"""
+		Approximate equality. Checks that every item is within a tolerance of the
+		corresponding item of another matrix: abs( a - b ) <= atol + rtol * abs( b )
+
+		:Parameters:
+			value : matrix
+				The matrix to compare this matrix to
+			rtol : float
+				The relative tolerance
+			atol : float
+				The absolute tolerance
+
+		:rtype: boolean
+		:returns: True if the matrices are the same size and all items are within tolerance.
+		"""
+		if not isinstance( value, matrix ):
+			raise TypeError( "Inappropriate argument type for allclose" )
+		if not ( self.size == value.size ):
+			return False
+		for rowA, rowB in izip( self._value, value._value ):
+			for a, b in izip( rowA, rowB ):
+				if ( abs( a - b ) > atol + rtol * abs( b ) ):
+					return False
+		return True
+
+	def characteristicPolynomial( self, method = None ):
+		"""
+		Characteristic polynomial. Only for square matrices. Exact for int and fraction
+		matrices ( see the charpoly module ).
+
+		:Parameters:
+			method : string
+				'berkowitz' or 'hessenberg'; chosen from the item types if not given.
+
+		:rtype: list
+		:returns: The coefficients of det( xI - A ), highest degree first.
+		"""
+		import charpoly
+		return charpoly.characteristicPolynomial( self, method )
+
+	# An alias for characteristicPolynomial
+	charpoly = characteristicPolynomial
+
+	def cholesky( self ):
 		"""
-		print "FIXME: This method has not yet been implemented"
+		Cholesky factorization, A = L L', for a symmetric positive definite matrix. Only
+		the lower triangle is read. See the decompose module.
+
+		:rtype: decompose.choleskyFactorization
+		:returns: The factorization, which can solve, and find the determinant, repeatedly.
+		"""
+		import decompose
+		return decompose.choleskyFactorization( self )
 
 	def cofactor( self, row, column ):
 		"""
@@ -599,6 +834,16 @@ class matrix( object ):
 			returnvalue.addRow( *newRow )
 		return returnvalue
 				
+	def columnspace( self ):
+		"""
+		A basis for the column space of this matrix ( see the echelon module ).
+
+		:rtype: matrix
+		:returns: A matrix whose columns are the pivot columns of this matrix.
+		"""
+		import echelon
+		return echelon.echelon( self ).columnspace( )
+
 	def deleteColumn( self, column ):
 		"""
 		Deletes a column from this matrix
@@ -639,14 +884,83 @@ class matrix( object ):
 			raise ValueError( "Determinant is not defined for non-square matrix" )
 		if ( self._height == 1 and self._width == 1):
 			return self._value[ 0 ][ 0 ]
+		# diagonal, triangular and permutation matrices have O( n ) determinants
+		import structured
+		form = structured.detect( self )
+		if form is not None:
+			return form.determinant( )
+		if ( self._height >= MATRIX_MODULAR_THRESHOLD ) and self._isInteger( ):
+			# cofactor expansion is factorial time, and elimination suffers from coefficient growth.
+			import modular
+			return modular.determinant( self )
 		returnvalue = 0
 		for i in range( self._width ):
+			checkpoint( )
 			returnvalue += self._value[ 0 ][ i ] * self.cofactor( 0, i )
 		return returnvalue
 
 	# An alias for determinant
 	det = determinant
 			
+	def eigenvalues( self ):
+		"""
+		Eigenvalues. Only for square matrices. Computed in floating point ( see the eigen module ).
+
+		:rtype: list
+		:returns: The eigenvalues, repeated according to multiplicity.
+		"""
+		import eigen
+		return eigen.eigenvalues( self )
+
+	def eigenvectors( self ):
+		"""
+		Eigenvalues and eigenvectors. Only for square matrices. Computed in floating point
+		( see the eigen module ).
+
+		:rtype: tuple
+		:returns: The eigenvalues, and a matrix whose columns are the matching eigenvectors.
+		"""
+		import eigen
+		return eigen.eigenvectors( self )
+			
+	def echelon( self ):
+		"""
+		Eliminates this matrix once, for its reduced row echelon form, pivot columns, rank,
+		null space and column space together. Exact for int and fraction matrices.
+
+		:rtype: echelon.echelonForm
+		:returns: The results of the elimination.
+		"""
+		import echelon
+		return echelon.echelon( self )
+
+	def fingerprint( self ):
+		"""
+		A digest of the size and contents of this matrix, computed a row at a time. Matrices
+		whose items are exactly equal ( 0.5, fraction( 1, 2 ) and fraction( 2, 4 ) count as
+		equal ) have the same fingerprint, so it can be used as a key for de-duplicating or
+		caching results. Fractions which only compare equal because fraction comparisons
+		are rounded have different fingerprints.
+
+		:rtype: string
+		:returns: A hexadecimal SHA-1 digest of the matrix.
+		"""
+		digest = hashlib.sha1( '%dx%d\n' % ( self._height, self._width ) )
+		canonical = _canonical
+		for row in self._value:
+			digest.update( ' '.join( [ canonical( item ) for item in row ] ) )
+			digest.update( '\n' )
+		return digest.hexdigest( )
+
+	def freeze( self ):
+		"""
+		Creates an immutable copy of this matrix.
+
+		:rtype: frozenMatrix
+		:returns: A frozenMatrix with the same items as this matrix.
+		"""
+		return frozenMatrix( self )
+
 	def frobenius( self, value ):
 		"""
 		Returns the Frobenius inner product of this matrix and the passed-in matrix
@@ -671,10 +985,7 @@ class matrix( object ):
 		:rtype: list
 		:returns: The column as a list
 		"""
-		returnvalue = list( )
-		for row in self._value:
-			returnvalue.append( row[ column ] )
-		return returnvalue
+		return [ row[ column ] for row in self._value ]
 
 	def getRow( self, row ):
 		"""
@@ -704,17 +1015,11 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: The Hadamard product of this matrix and the passed-in matrix.
 		"""
-		if not ( type( self ) == type( value ) ):
+		if not isinstance( value, matrix ):
 			raise TypeError( "Inapproproate argument type for hadamard product" )
 		if not( self.size == value.size ):
 			raise ValueError( "Matrices must be of the same size for hadamard product" )
-		returnvalue = matrix( )
-		for i in xrange( self._height ):
-			newRow = list( )
-			for j in xrange( self._width ):
-				newRow.append( self[ i ][ j ] * value[ i ][ j ] )
-			returnvalue.addRow( *newRow )
-		return returnvalue
+		return self.map2( mul, value )
 				
 
 	def insertColumn( self, index, *column ):
@@ -734,19 +1039,16 @@ class matrix( object ):
 		if self._height:
 			if not ( len( column ) == self._height ):
 				raise ValueError( 'Improper length for new column: %d, should be %d' % ( len( column ), self._height ) )
-		else:
+		scalarTypes = _scalarTypes
+		for item in column:
+			if not ( type( item ) in scalarTypes or _lookupScalarType( type( item ) ) ):
+				raise TypeError( _scalarTypeMessage )
+		if not self._height:
 			self._height = len( column )
 			for i in range( self._height ):
 				self._value.append( list( ) )
 		self._width += 1
 		for i in range( self._height ):
-			if not ( type( column[ i ] ) in MATRIX_VALID_TYPES):
-				message = "Values must be of type "
-				for t in range( len( MATRIX_VALID_TYPENAMES ) ):
-					if t:
-						message += ' or '
-					message += "'%s'" % MATRIX_VALID_TYPENAMES[ t ]
-				raise TypeError( message )
 			self._value[ i ].insert( index, column[ i ] )
 
 	def insertRow( self, index, *row ):
@@ -766,20 +1068,15 @@ class matrix( object ):
 		if self._width:
 			if not ( len( row ) == self._width ):
 				raise ValueError( 'Improper length for new row: %d, should be %d' % ( len( row ), self._width ) )
-		else:
-			self._width = len( row )
-		self._height += 1
 		#make a deep copy
-		newrow = list( )
-		for item in row:
-			if not ( type( item ) in MATRIX_VALID_TYPES ):
-				message = "Values must be of type "
-				for t in range( len( MATRIX_VALID_TYPENAMES ) ):
-					if t:
-						message += ' or '
-					message += "'%s'" % MATRIX_VALID_TYPENAMES[ t ]
-				raise TypeError( message )
-			newrow.append( item )
+		newrow = list( row )
+		scalarTypes = _scalarTypes
+		for item in newrow:
+			if not ( type( item ) in scalarTypes or _lookupScalarType( type( item ) ) ):
+				raise TypeError( _scalarTypeMessage )
+		if not self._width:
+			self._width = len( newrow )
+		self._height += 1
 		self._value.insert( index, newrow )
 
 	def inverse( self ):
@@ -791,6 +1088,17 @@ class matrix( object ):
 		"""
 		if not self.isSquare( ):
 			raise ValueError( "Inverse is not defined for a non-square matrix" )
+		import structured
+		form = structured.detect( self )
+		if form is not None:
+			return form.inverse( ).materialize( )
+		# eliminate in floating point, and for an exact matrix only exactly if the result
+		# does not check out
+		import approx
+		try:
+			return approx.inverse( self, self._isExact( ) )
+		except ( TypeError, OverflowError ): # complex items, or floats out of range
+			pass
 		if not self.determinant( ):
 			raise ValueError( 'This matrix is not invertible' )
 		# future division breaks the "/" operator, so we have to call the function directly.			
@@ -803,7 +1111,11 @@ class matrix( object ):
 		:rtype: boolean
 		:returns: True if the matrix can be inverted.
 		"""
-		return bool( self.isSquare( ) and self.determinant( ) )
+		if not self.isSquare( ):
+			return False
+		# elimination stops at the first column without a pivot
+		import echelon
+		return echelon.isInvertible( self )
 
 	def isSquare( self ):
 		"""
@@ -821,15 +1133,9 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: A copy with all items in the matrix as an int.
 		"""
-		returnvalue = matrix( )
-		for row in self._value:
-			newRow = list( )
-			for item in row:
-				# round the item to 3 decimal places before converting,
-				# so floats like 1.999999964 become 2, not 1
-				newRow.append( int( round( item, 3 ) ) )
-			returnvalue.addRow( *newRow )
-		return returnvalue
+		# round the item to 3 decimal places before converting,
+		# so floats like 1.999999964 become 2, not 1
+		return self.map( lambda item: round( item, 3 ), itemType = int )
 	
 	def itemsToFloat( self ):
 		"""
@@ -838,27 +1144,77 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: A copy with all items in the matrix as an float.
 		"""
-		returnvalue = matrix( )
+		return self.map( float )
+
+	def itercols( self ):
+		"""
+		Iterates over the columns of the matrix.
+
+		:rtype: generator
+		:returns: A generator yielding each column as a list
+		"""
+		for column in izip( *self._value ):
+			yield list( column )
+
+	def iterenumerate( self ):
+		"""
+		Iterates over the items of the matrix along with their positions, first row0, then row1, etc.
+
+		:rtype: generator
+		:returns: A generator yielding a ( row, column, item ) tuple for each item
+		"""
+		i = 0
 		for row in self._value:
-			newRow = list( )
+			j = 0
 			for item in row:
-				newRow.append( float( item ) )
-			returnvalue.addRow( *newRow )
-		return returnvalue
+				yield ( i, j, item )
+				j += 1
+			i += 1
+
+	def iternonzero( self ):
+		"""
+		Iterates over the non-zero items of the matrix along with their positions.
+
+		:rtype: generator
+		:returns: A generator yielding a ( row, column, item ) tuple for each non-zero item
+		"""
+		i = 0
+		for row in self._value:
+			j = 0
+			for item in row:
+				if item:
+					yield ( i, j, item )
+				j += 1
+			i += 1
+
+	def iterrows( self ):
+		"""
+		Iterates over the rows of the matrix.
 
-	def kronecker( self, value ):
+		:rtype: generator
+		:returns: A generator yielding a copy of each row as a list
+		"""
+		for row in self._value:
+			yield list( row )
+
+	def kronecker( self, value, lazy = False ):
 		"""
 		Returns the Kronecker product of this matrix and the passed-in matrix
 
 		:Paramters:
 			value : matrix
 			The value of the matrix to combine this matrix with
+			lazy : boolean
+			If True, return a kroneckerMatrix which keeps the two factors instead of forming the product.
 
 		:rtype: matrix
 		:returns: The Kronecker Product of the two matrices
 		"""
-		if not ( type( self ) == type( value ) ):
+		if not isinstance( value, matrix ):
 			raise TypeError( "Inappropriate argument type for kronecker product" )
+		if lazy:
+			import kronecker
+			return kronecker.kroneckerMatrix( self, value )
 		returnvalue = matrix( )
 		for i in xrange( self._height ):
 			for j in xrange( value._height ):
@@ -870,6 +1226,83 @@ class matrix( object ):
 		return returnvalue
 						
 
+	def lu( self ):
+		"""
+		LU factorization with partial pivoting, P A = L U, for a square matrix. See the
+		decompose module.
+
+		:rtype: decompose.luFactorization
+		:returns: The factorization, which can solve, and find the determinant, repeatedly.
+		"""
+		import decompose
+		return decompose.luFactorization( self )
+
+	def map( self, function, inPlace = False, itemType = None ):
+		"""
+		Applies a function to every item, in a single pass over the rows. The results are
+		not checked, so the function must return valid items.
+
+		:Parameters:
+			function : function
+				Takes an item and returns the new item.
+			inPlace : boolean
+				If True, this matrix is changed instead of a new one being made.
+			itemType : type
+				If given, each result is converted to this scalar type.
+
+		:rtype: matrix
+		:returns: The new matrix, or this one if inPlace is set.
+		"""
+		if itemType is not None:
+			if not ( itemType in _scalarTypes or _lookupScalarType( itemType ) ):
+				raise TypeError( _scalarTypeMessage )
+			rows = [ [ itemType( function( item ) ) for item in row ] for row in self._value ]
+		else:
+			rows = [ map( function, row ) for row in self._value ]
+		if inPlace:
+			self._replaceRows( rows )
+			return self
+		return _fromRows( rows )
+
+	def map2( self, function, other, inPlace = False, itemType = None ):
+		"""
+		Applies a function to the matching items of this matrix and another, or to each
+		item and a number, in a single pass over the rows. The results are not checked,
+		so the function must return valid items.
+
+		:Parameters:
+			function : function
+				Takes an item of this matrix and the matching item of other ( or other \
+				itself, if it is a number ) and returns the new item.
+			other : matrix; number
+				A matrix of the same size, or a number.
+			inPlace : boolean
+				If True, this matrix is changed instead of a new one being made.
+			itemType : type
+				If given, each result is converted to this scalar type.
+
+		:rtype: matrix
+		:returns: The new matrix, or this one if inPlace is set.
+		"""
+		if isinstance( other, matrix ):
+			if not ( self.size == other.size ):
+				raise ValueError( "Matrices must be the same size" )
+			pairs = izip( self._value, other._value )
+		elif ( type( other ) in _scalarTypes or _lookupScalarType( type( other ) ) ):
+			pairs = izip( self._value, repeat( [ other ] * self._width ) )
+		else:
+			raise TypeError( "Inappropriate argument type for map2" )
+		if itemType is not None:
+			if not ( itemType in _scalarTypes or _lookupScalarType( itemType ) ):
+				raise TypeError( _scalarTypeMessage )
+			rows = [ [ itemType( function( x, y ) ) for x, y in izip( row, otherRow ) ] for row, otherRow in pairs ]
+		else:
+			rows = [ map( function, row, otherRow ) for row, otherRow in pairs ]
+		if inPlace:
+			self._replaceRows( rows )
+			return self
+		return _fromRows( rows )
+
 	def minor( self, i, j ):
 		"""
 		The Minor of a matrix
@@ -886,18 +1319,65 @@ class matrix( object ):
 		m.deleteColumn( j )
 		return m.determinant( )
 
-	#next() method for the iterator; returns each item in the matrix, first row0, then row1, etc.
-	def next( self ):
+	def nullspace( self ):
+		"""
+		A basis for the null space of this matrix ( see the echelon module ).
+
+		:rtype: matrix
+		:returns: A matrix whose columns are the basis vectors, or an empty matrix if the \
+		null space is trivial.
+		"""
+		import echelon
+		return echelon.echelon( self ).nullspace( )
+
+	def permuted( self ):
+		"""
+		Creates a permutedMatrix view of this matrix, in which row and column swaps,
+		deletions and transposes only change index maps. Changes made through the view's
+		setItem( ) write through to this matrix.
+
+		:rtype: permutedMatrix
+		:returns: A view of this matrix.
+		"""
+		return permutedMatrix( self )
+
+	def polynomial( self, coefficients ):
 		"""
-		Iterator method.
+		Evaluates a polynomial at this matrix. Only for square matrices. Polynomials of
+		degree n or more are reduced modulo the characteristic polynomial first, so at most
+		n - 1 matrix products are needed.
+
+		:Parameters:
+			coefficients : list
+				The coefficients of the polynomial, highest degree first.
+
+		:rtype: matrix
+		:returns: The value of the polynomial at this matrix.
 		"""
-		if self._iterpos < ( self._width * self._height ):
-			x,y = divmod( self._iterpos, self._width )
-			v = self[ x ][ y ]
-			self._iterpos += 1
-			return v
-		del self._iterpos
-		raise StopIteration( )
+		import charpoly
+		return charpoly.evaluate( coefficients, self )
+
+	def qr( self ):
+		"""
+		QR factorization by Householder reflections, A = Q R, for a matrix with at least as
+		many rows as columns. Solving with it gives least squares solutions for tall
+		matrices. See the decompose module.
+
+		:rtype: decompose.qrFactorization
+		:returns: The factorization, which can solve, and find the determinant, repeatedly.
+		"""
+		import decompose
+		return decompose.qrFactorization( self )
+
+	def rank( self ):
+		"""
+		Rank ( see the echelon module ).
+
+		:rtype: int
+		:returns: The number of linearly independent rows of this matrix.
+		"""
+		import echelon
+		return echelon.rank( self )
 
 	def roundItems( self, digits = 0 ):
 		"""
@@ -910,20 +1390,106 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: A matrix with all items rounded to 'digits' places.
 		"""
-		returnvalue = matrix( )
-		for row in self._value:
-			newRow = list( )
-			for item in row:
-				item = round( item, digits )
-				if ( digits <= 0 ):
-					item = int( item )
-				newRow.append( item )
-			returnvalue.addRow( *newRow )
-		return returnvalue
+		if ( digits <= 0 ):
+			return self.map( lambda item: round( item, digits ), itemType = int )
+		return self.map( lambda item: round( item, digits ) )
 
 	# An alias for roundItems
 	round = roundItems # alias  
 
+	def rref( self ):
+		"""
+		Reduced row echelon form. Exact for int and fraction matrices ( see the echelon module ).
+
+		:rtype: tuple
+		:returns: The reduced row echelon form as a matrix, and a tuple of the pivot columns.
+		"""
+		import echelon
+		form = echelon.echelon( self )
+		return form.rref( ), form.pivots
+
+	def solve( self, b ):
+		"""
+		Solves the system matrix * x = b. Only for square, invertible matrices. Matrices of
+		ints and fractions are solved exactly: in floating point with an exact check where
+		possible ( see the approx module ), otherwise with the multi-modular method in the
+		modular module. Matrices of floats are solved by LU factorization.
+
+		:Parameters:
+			b : list
+				The right hand side, either a list of numbers or a matrix with one column.
+
+		:rtype: list or matrix
+		:returns: The solution x, as a one-column matrix if b was a matrix.
+		"""
+		if not self.isSquare( ):
+			raise ValueError( "Solve is only defined for a square matrix" )
+		import structured
+		form = structured.detect( self )
+		if form is not None:
+			return form.solve( b )
+		import approx
+		try:
+			return approx.solve( self, b, self._isExact( ) )
+		except ( TypeError, OverflowError ): # complex items, or floats out of range
+			pass
+		if isinstance( b, matrix ):
+			return self.inverse( ) * b
+		return ( self.inverse( ) * matrix( [ [ x ] for x in b ] ) ).getColumn( 0 )
+
+	def solveRefined( self, b, tolerance = None, maxIterations = None ):
+		"""
+		Solves the system matrix * x = b in floating point, refining the solution with
+		exact residuals until it is accurate to the precision of a float ( see the
+		refine module ). Only for square, invertible matrices.
+
+		:Parameters:
+			b : list
+				The right hand side, either a list of numbers or a matrix with one column.
+			tolerance : float
+				The relative size of correction at which to stop.
+			maxIterations : int
+				The most corrections to make.
+
+		:rtype: refinement
+		:returns: The solution, in its solution attribute, and the convergence diagnostics.
+		"""
+		if not self.isSquare( ):
+			raise ValueError( "Solve is only defined for a square matrix" )
+		import refine
+		return refine.solve( self, b, tolerance, maxIterations )
+
+	def summary( self, edgeItems = None ):
+		"""
+		A summarized representation, showing only the rows and columns at the edges of the
+		matrix with '...' in place of the rest. Only the items shown are formatted.
+
+		:Parameters:
+			edgeItems : int
+				How many rows and columns to show at each edge. Defaults to MATRIX_REPR_EDGEITEMS.
+
+		:rtype: string
+		:returns: A formatted summary of this matrix.
+		"""
+		if edgeItems is None:
+			edgeItems = MATRIX_REPR_EDGEITEMS
+		edgeItems = max( edgeItems, 0 )
+		rows = self._value
+		rowGap = ( self._height > 2 * edgeItems )
+		if rowGap:
+			# slice from len( rows ) - edgeItems, since rows[ -0: ] would be every row
+			rows = rows[ :edgeItems ] + rows[ len( rows ) - edgeItems: ]
+		if ( self._width > 2 * edgeItems ):
+			rows = [ row[ :edgeItems ] + row[ len( row ) - edgeItems: ] for row in rows ]
+			formatItems = _rowFormatter( self._maxValueLength( rows ) )
+			lines = [ formatItems( row[ :edgeItems ] )[ :-1 ] + ' ... ' + formatItems( row[ edgeItems: ] )[ 1: ] for row in rows ]
+		else:
+			formatItems = _rowFormatter( self._maxValueLength( rows ) )
+			lines = [ formatItems( row ) for row in rows ]
+		if rowGap:
+			lines.insert( edgeItems, ' ...' )
+		return '\n'.join( lines )
+
 	def swapColumns( self, i, j ):
 		"""
 		Swaps columns i and j.
@@ -934,12 +1500,11 @@ class matrix( object ):
 			j : int
 				The second of 2 columns to swap.
 		"""
-		if not ( type( i ) in MATRIX_VALID_INTS and type( j ) in MATRIX_VALID_INTS ): # this should be fixed to accomodate 'long' types
-			raise TypeError( "Row indices must be of type 'int'" )
-		columnA = self.deleteColumn( max( i, j ) )
-		columnB = self.deleteColumn( min( i, j ) )
-		self.insertColumn( min( i, j ), *columnA )
-		self.insertColumn( max( i, j ), *columnB )
+		if not ( type( i ) in MATRIX_VALID_INTS and type( j ) in MATRIX_VALID_INTS ):
+			raise TypeError( "Column indices must be of type 'int'" )
+		# swap the items in place rather than moving whole columns around.
+		for row in self._value:
+			row[ i ], row[ j ] = row[ j ], row[ i ]
 	
 	def swapRows( self, i, j ):
 		"""
@@ -951,12 +1516,10 @@ class matrix( object ):
 			j : int
 				The second of 2 rows to swap.
 		"""
-		if not ( type( i ) in MATRIX_VALID_INTS and type( j ) in MATRIX_VALID_INTS ): # this should be fixed to accomodate 'long' types
+		if not ( type( i ) in MATRIX_VALID_INTS and type( j ) in MATRIX_VALID_INTS ):
 			raise TypeError( "Row indices must be of type 'int'" )
-		rowA = self.deleteRow( max( i, j ) )
-		rowB = self.deleteRow( min( i, j ) )
-		self.insertRow( min( i, j ), *rowA )
-		self.insertRow( max( i, j ), *rowB )
+		rows = self._value
+		rows[ i ], rows[ j ] = rows[ j ], rows[ i ]
 
 	def transpose( self ):
 		"""
@@ -965,16 +1528,416 @@ class matrix( object ):
 		:rtype: matrix
 		:returns: The transpose of this matrix.
 		"""
-		returnvalue = matrix( )
-		for i in range( self._width ):
-			row = list( )
-			for j in range( self._height ):
-				row.append( self._value[ j ][ i ] )
-			returnvalue.addRow( *row )
+		return _fromRows( [ list( column ) for column in izip( *self._value ) ] )
+
+	def writeTo( self, file, chunkRows = 256 ):
+		"""
+		Writes the full formatted representation of this matrix to a file, however large
+		it is, without building the whole string in memory.
+
+		:Parameters:
+			file : file
+				The file ( anything with a 'write' method ) to write to.
+			chunkRows : int
+				How many rows to format per write.
+		"""
+		formatRow = _rowFormatter( self._maxValueLength( ) )
+		rows = self._value
+		for start in xrange( 0, self._height, chunkRows ):
+			chunk = [ formatRow( row ) for row in rows[ start:start + chunkRows ] ]
+			chunk.append( '' )
+			file.write( '\n'.join( chunk ) )
+
+	# An alias for writeTo
+	write_to = writeTo
+
+
+class frozenMatrix( matrix ):
+	"""
+	An immutable matrix. Rows are stored as tuples and every method which would modify
+	the matrix raises a TypeError, so a frozenMatrix can be shared between threads without
+	copying or locking, and can be used as a dictionary key. All of the read-only matrix
+	operations are available, and return ordinary ( mutable ) matrices.
+	"""
+
+	def __init__( self, *rows ):
+		"""
+		Accepts the same arguments as the matrix constructor. Freezing a frozenMatrix
+		shares its storage rather than copying it.
+
+		:Parameters:
+			rows : list
+				Arguments for creating a matrix.
+		"""
+		if ( len( rows ) == 1 ) and isinstance( rows[ 0 ], frozenMatrix ):
+			source = rows[ 0 ]
+			value = source._value
+		else:
+			if ( len( rows ) == 1 ) and isinstance( rows[ 0 ], matrix ):
+				source = rows[ 0 ]
+			else:
+				source = matrix( *rows )
+			value = tuple( [ tuple( row ) for row in source._value ] )
+		setattr = object.__setattr__
+		setattr( self, '_value', value )
+		setattr( self, '_width', source._width )
+		setattr( self, '_height', source._height )
+		setattr( self, '_hash', None )
+
+	def __hash__( self ):
+		"""
+		Hash. Based on the fingerprint, so matrices whose items are exactly equal ( such
+		as 0.5 and fraction( 1, 2 ) ) hash alike.
+
+		Call: hash( frozenmatrix )
+
+		:rtype: int
+		:returns: The hash value of this matrix.
+		"""
+		if self._hash is None:
+			object.__setattr__( self, '_hash', hash( self.fingerprint( ) ) )
+		return self._hash
+
+	def __reduce__( self ):
+		"""
+		Pickle support, so frozen matrices can be sent to process pools.
+		"""
+		if not self._height:
+			return ( frozenMatrix, ( ) )
+		return ( frozenMatrix, ( list( self._value ), ) )
+
+	def __setattr__( self, name, value ):
+		raise TypeError( "frozenMatrix objects are immutable" )
+
+	def _immutable( self, *args ):
+		"""
+		Internal Function: replaces the methods which modify a matrix.
+		"""
+		raise TypeError( "frozenMatrix objects are immutable" )
+
+	addColumn = addRow = deleteColumn = deleteRow = insertColumn = insertRow = swapColumns = swapRows = _replaceRows = _immutable
+
+	def freeze( self ):
+		"""
+		A frozenMatrix is already immutable, so this returns the matrix itself.
+
+		:rtype: frozenMatrix
+		:returns: self
+		"""
+		return self
+
+	def sharedArray( self ):
+		"""
+		Copies the items into shared memory, which worker processes started afterwards
+		( for instance through a multiprocessing.Pool initializer ) can read without it being
+		pickled. See fromSharedArray( ).
+
+		A matrix of ints is stored as 64 bit integers, so it stays exact, and a matrix with
+		floats as doubles. A TypeError is raised for any other item, for an int which does
+		not fit in 64 bits, and for an int in a matrix of floats which a double can not hold
+		exactly, rather than changing the value.
+
+		:rtype: multiprocessing.RawArray
+		:returns: The items in row order.
+		"""
+		import ctypes
+		from multiprocessing.sharedctypes import RawArray
+		items = list( chain.from_iterable( self._value ) )
+		itemTypes = set( [ type( item ) for item in items ] )
+		if not itemTypes.issubset( MATRIX_VALID_INTS + ( types.FloatType, ) ):
+			raise TypeError( "Only matrices of ints and floats can be shared" )
+		if ( types.FloatType in itemTypes ):
+			itemType, limit = ctypes.c_double, 2 ** 53
+		else:
+			itemType, limit = ctypes.c_longlong, 2 ** 63
+		for item in items:
+			if ( type( item ) in MATRIX_VALID_INTS ) and not ( -limit <= item < limit ):
+				raise TypeError( "The int %d can not be shared exactly" % item )
+		returnvalue = RawArray( itemType, len( items ) )
+		returnvalue[ : ] = items
 		return returnvalue
 
+	def thaw( self ):
+		"""
+		Creates a mutable copy of this matrix.
 
-	
+		:rtype: matrix
+		:returns: A matrix with the same items as this one.
+		"""
+		return _fromRows( [ list( row ) for row in self._value ] )
+
+
+
+class permutedMatrix( object ):
+	"""
+	A view of a matrix through a row index map and a column index map. Swapping or deleting
+	rows and columns, and transposing, only change the maps, so no items are moved. This
+	suits pivoting routines; materialize( ) gives an ordinary matrix when they are done.
+
+	The view reads the rows of the matrix it was made from, so rows should not be added
+	to or deleted from that matrix while the view is in use.
+	"""
+
+	def __init__( self, base, rows = None, columns = None, transposed = False ):
+		"""
+		Constructor.
+
+		:Parameters:
+			base : matrix
+				The matrix to view.
+			rows : list
+				Which row of base each row of the view shows. Defaults to all rows in order.
+			columns : list
+				Which column of base each column of the view shows. Defaults to all columns in order.
+			transposed : boolean
+				If True, the view shows the transpose, and rows and columns refer to the \
+				columns and rows of base respectively.
+		"""
+		self._data = base._value
+		if transposed:
+			height, width = base._width, base._height
+		else:
+			height, width = base._height, base._width
+		self._rows = range( height ) if rows is None else list( rows )
+		self._columns = range( width ) if columns is None else list( columns )
+		self._transposed = transposed
+
+	def __getattr__( self, name ):
+		"""
+		Get attribute.
+
+		Call: view.width; view.height; view.size; view.rowIndex; view.columnIndex
+
+		:rtype: int, list, or tuple
+		:returns: The value requested.
+		"""
+		if name == 'width':
+			return len( self._columns )
+		if name == 'height':
+			return len( self._rows )
+		if name == 'size':
+			return ( len( self._columns ), len( self._rows ) )
+		if name == 'rowIndex':
+			return list( self._rows )
+		if name == 'columnIndex':
+			return list( self._columns )
+		raise AttributeError( name )
+
+	def __getitem__( self, index ):
+		"""
+		Get a row of the view.
+
+		Call: view[x] or view[x][y]
+
+		:rtype: list
+		:returns: A copy of the row requested
+		"""
+		return self.getRow( index )
+
+	def __iter__( self ):
+		"""
+		Iterates over each item in the view, first row0, then row1, etc.
+
+		:rtype: generator
+		:returns: A generator over the items of the view
+		"""
+		for i in xrange( len( self._rows ) ):
+			for item in self.getRow( i ):
+				yield item
+
+	def __repr__( self ):
+		"""
+		Representation. Formats the view for printing.
+
+		Call: repr( view ); str( view )
+
+		:rtype: string
+		:returns: A formatted representation of the view.
+		"""
+		return repr( self.materialize( ) )
+
+	__str__ = __repr__
+
+	def deleteColumn( self, column ):
+		"""
+		Deletes a column from the view. The matrix itself is not changed.
+
+		:Parameters:
+			column : int
+				The column number to delete ( Starting at 0 )
+
+		:rtype: list
+		:returns: The deleted column
+		"""
+		returnvalue = self.getColumn( column )
+		del self._columns[ column ]
+		return returnvalue
+
+	def deleteRow( self, row ):
+		"""
+		Deletes a row from the view. The matrix itself is not changed.
+
+		:Parameters:
+			row : int
+				The row number to delete ( Starting at 0 )
+
+		:rtype: list
+		:returns: The deleted row
+		"""
+		returnvalue = self.getRow( row )
+		del self._rows[ row ]
+		return returnvalue
+
+	def getColumn( self, column ):
+		"""
+		Get a column from the view
+
+		:Parameters:
+			column : int
+				The column to get.
+
+		:rtype: list
+		:returns: The column as a list
+		"""
+		c = self._columns[ column ]
+		if self._transposed:
+			row = self._data[ c ]
+			return [ row[ r ] for r in self._rows ]
+		data = self._data
+		return [ data[ r ][ c ] for r in self._rows ]
+
+	def getRow( self, row ):
+		"""
+		Get a row from the view
+
+		:Parameters:
+			row : int
+				The row to get.
+
+		:rtype: list
+		:returns: The row as a list
+		"""
+		r = self._rows[ row ]
+		if self._transposed:
+			data = self._data
+			return [ data[ c ][ r ] for c in self._columns ]
+		row = self._data[ r ]
+		return [ row[ c ] for c in self._columns ]
+
+	def item( self, row, column ):
+		"""
+		Get a single item of the view
+
+		:rtype: number
+		:returns: The item at row, column.
+		"""
+		if self._transposed:
+			return self._data[ self._columns[ column ] ][ self._rows[ row ] ]
+		return self._data[ self._rows[ row ] ][ self._columns[ column ] ]
+
+	def materialize( self ):
+		"""
+		Creates a matrix with the items of the view in their current order.
+
+		:rtype: matrix
+		:returns: The view as a matrix
+		"""
+		return _fromRows( [ self.getRow( i ) for i in xrange( len( self._rows ) ) ] )
+
+	# An alias for materialize
+	toMatrix = materialize
+
+	def setItem( self, row, column, value ):
+		"""
+		Set a single item of the view, which changes the underlying matrix.
+
+		:Parameters:
+			row : int
+				The row of the item
+			column : int
+				The column of the item
+			value : number
+				The new value
+		"""
+		if not ( type( value ) in _scalarTypes or _lookupScalarType( type( value ) ) ):
+			raise TypeError( _scalarTypeMessage )
+		if self._transposed:
+			self._data[ self._columns[ column ] ][ self._rows[ row ] ] = value
+		else:
+			self._data[ self._rows[ row ] ][ self._columns[ column ] ] = value
+
+	def swapColumns( self, i, j ):
+		"""
+		Swaps columns i and j of the view.
+
+		:Parameters:
+			i : int
+				The first of 2 columns to swap.
+			j : int
+				The second of 2 columns to swap.
+		"""
+		columns = self._columns
+		columns[ i ], columns[ j ] = columns[ j ], columns[ i ]
+
+	def swapRows( self, i, j ):
+		"""
+		Swaps rows i and j of the view.
+
+		:Parameters:
+			i : int
+				The first of 2 rows to swap.
+			j : int
+				The second of 2 rows to swap.
+		"""
+		rows = self._rows
+		rows[ i ], rows[ j ] = rows[ j ], rows[ i ]
+
+	def transpose( self ):
+		"""
+		Transpose of the view. Only the index maps are copied.
+
+		:rtype: permutedMatrix
+		:returns: A view of the transpose, sharing this view's matrix.
+		"""
+		returnvalue = permutedMatrix.__new__( permutedMatrix )
+		returnvalue._data = self._data
+		returnvalue._rows = list( self._columns )
+		returnvalue._columns = list( self._rows )
+		returnvalue._transposed = not self._transposed
+		return returnvalue
+
+
+def _fromRows( rows ):
+	"""
+	Internal Function: creates a matrix from a list of rows without checking them. The
+	rows must be lists of valid items, all the same length, and are used as they are.
+
+	:rtype: matrix
+	:returns: A matrix with the given rows
+	"""
+	returnvalue = matrix( )
+	returnvalue._value = rows
+	returnvalue._height = len( rows )
+	returnvalue._width = len( rows[ 0 ] ) if rows else 0
+	return returnvalue
+
+def fromSharedArray( array, width ):
+	"""
+	Creates a frozenMatrix from an array made by frozenMatrix.sharedArray( ).
+
+	:Parameters:
+		array : multiprocessing.RawArray
+			The items of the matrix in row order.
+		width : int
+			The width of the matrix.
+
+	:rtype: frozenMatrix
+	:returns: The matrix stored in the array, with ints if it was a matrix of ints.
+	"""
+	if not width:
+		return frozenMatrix( )
+	items = array[ : ]
+	return frozenMatrix( [ items[ i:i + width ] for i in xrange( 0, len( items ), width ) ] )
 
 def identMatrix( size ):
 	"""
@@ -985,7 +1948,8 @@ def identMatrix( size ):
 			The width and height of the matrix to return.
 			
 	:rtype: matrix
-	:returns: An identity matrix of the specified size.
+	:returns: An identity matrix of the specified size. See structured.identityMatrix \
+	for one which stores only its size.
 	"""
 	returnvalue = matrix( )
 	for i in range( size ):
@@ -1012,3 +1976,57 @@ def zeroMatrix( width, height ):
 		newrow = [ 0 ] * height
 		returnvalue.addRow( *newrow )
 	return returnvalue
+
+def registerScalarType( scalarType, name = None ):
+	"""
+	Registers a type as a valid matrix item type. A type can also register itself
+	automatically the first time it is seen by setting a '__matrixscalar__' class
+	attribute to True. Item types need to support the arithmetic operators used by
+	the matrix operations they take part in.
+
+	:Parameters:
+		scalarType : type
+			The type to register
+		name : string
+			The name of the type for error messages. Defaults to the name of the type.
+	"""
+	global MATRIX_VALID_TYPES, MATRIX_VALID_TYPENAMES, _scalarTypeMessage
+	if ( scalarType in _scalarTypes ):
+		return
+	if name is None:
+		name = scalarType.__name__
+	_scalarTypes[ scalarType ] = name
+	MATRIX_VALID_TYPES += ( scalarType, )
+	MATRIX_VALID_TYPENAMES += ( name, )
+	_scalarTypeMessage = "Values must be of type " + ' or '.join( [ "'%s'" % n for n in MATRIX_VALID_TYPENAMES ] )
+
+def where( condition, a, b ):
+	"""
+	Chooses each item from a where the matching item of condition is true, and from b
+	where it is not, in a single pass.
+
+	:Parameters:
+		condition : matrix
+			The matrix whose items choose between a and b.
+		a : matrix; number
+			A matrix of the same size as condition, or a number for every item.
+		b : matrix; number
+			A matrix of the same size as condition, or a number for every item.
+
+	:rtype: matrix
+	:returns: The chosen items.
+	"""
+	if not isinstance( condition, matrix ):
+		raise TypeError( "Inappropriate argument type for where" )
+	choices = list( )
+	for value in ( a, b ):
+		if isinstance( value, matrix ):
+			if not ( value.size == condition.size ):
+				raise ValueError( "Matrices must be the same size" )
+			choices.append( value._value )
+		elif ( type( value ) in _scalarTypes or _lookupScalarType( type( value ) ) ):
+			choices.append( repeat( [ value ] * condition._width ) )
+		else:
+			raise TypeError( _scalarTypeMessage )
+	return _fromRows( [ [ x if c else y for c, x, y in izip( rowC, rowA, rowB ) ]
+		for rowC, rowA, rowB in izip( condition._value, choices[ 0 ], choices[ 1 ] ) ] )
@@ -0,0 +1,247 @@
+"""
+matrixchain.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Products of chains of matrices, in the cheapest order.
+
+Call: chainProduct( a, b, c, d ) or planChain( a, b, c, d ).execute( a, b, c, d )
+
+The order is chosen by dynamic programming over the shapes of the matrices. The cost of
+each product is the number of scalar multiplications it needs, and since the rows of
+the left factor are multiplied out one nonzero at a time when they are sparse, that is
+p * q * r scaled by the fraction of nonzero items in the left factor. The density of
+each intermediate product is estimated from the densities of its factors.
+"""
+
+from itertools import izip
+from operator import mul
+import matrix as _matrix
+from matrix import matrix
+from aio import checkpoint
+
+VERSION = "0.1"
+
+MATRIXCHAIN_SPARSE_RATIO = 0.5 # rows with fewer nonzero items than this fraction are multiplied out sparsely
+
+
+def _density( value ):
+	"""
+	Internal Function: the fraction of the items of a matrix which are nonzero.
+	"""
+	size = value.width * value.height
+	if not size:
+		return 1.0
+	return sum( [ len( [ x for x in row if x ] ) for row in value.value ] ) / float( size )
+
+def _productDensity( a, b, inner ):
+	"""
+	Internal Function: the expected density of a product, assuming the nonzero items are
+	spread at random.
+	"""
+	return 1.0 - ( 1.0 - a * b ) ** inner
+
+def _multiplyRows( rows, other, out ):
+	"""
+	Internal Function: multiplies a list of rows by the rows of another matrix, writing
+	the product into the existing rows of out. Sparse rows are multiplied out one nonzero
+	item at a time, dense ones by columns.
+	"""
+	width = len( other[ 0 ] ) if other else 0
+	columns = None
+	limit = len( other ) * MATRIXCHAIN_SPARSE_RATIO
+	for row, outRow in izip( rows, out ):
+		checkpoint( )
+		nonzero = [ ( x, other[ k ] ) for k, x in enumerate( row ) if x ]
+		if ( len( nonzero ) < limit ):
+			total = [ 0 ] * width
+			for x, otherRow in nonzero:
+				total = [ s + x * t for s, t in izip( total, otherRow ) ]
+			outRow[ : ] = total
+		else:
+			if columns is None:
+				columns = zip( *other )
+			outRow[ : ] = [ sum( map( mul, row, column ) ) for column in columns ]
+
+
+class chainPlan( object ):
+	"""
+	The order in which to multiply a chain of matrices, and its estimated cost.
+	"""
+
+	def __init__( self, shapes, densities = None ):
+		"""
+		Constructor. Finds the cheapest order by dynamic programming, in O( k ** 3 ) time
+		for a chain of k matrices.
+
+		:Parameters:
+			shapes : list
+				The ( height, width ) of each matrix in the chain.
+			densities : list
+				The fraction of nonzero items in each matrix. All are taken as dense \
+				if not given.
+		"""
+		k = len( shapes )
+		if not k:
+			raise ValueError( "A chain product needs at least one matrix" )
+		for i in xrange( k - 1 ):
+			if not ( shapes[ i ][ 1 ] == shapes[ i + 1 ][ 0 ] ):
+				raise ValueError( "Matrices are the incorrect size for '*'" )
+		if densities is None:
+			densities = [ 1.0 ] * k
+		self.shapes = list( shapes )
+		self.densities = list( densities )
+		dims = [ shapes[ 0 ][ 0 ] ] + [ shape[ 1 ] for shape in shapes ]
+		# cost[ i ][ j ], density[ i ][ j ] and split[ i ][ j ] are for the product of
+		# matrices i through j.
+		cost = [ [ 0 ] * k for i in xrange( k ) ]
+		density = [ [ 1.0 ] * k for i in xrange( k ) ]
+		split = [ [ None ] * k for i in xrange( k ) ]
+		for i in xrange( k ):
+			density[ i ][ i ] = densities[ i ]
+		for length in xrange( 2, k + 1 ):
+			for i in xrange( k - length + 1 ):
+				j = i + length - 1
+				best = None
+				for s in xrange( i, j ):
+					c = cost[ i ][ s ] + cost[ s + 1 ][ j ] + dims[ i ] * dims[ s + 1 ] * dims[ j + 1 ] * density[ i ][ s ]
+					if best is None or ( c < best ):
+						best = c
+						split[ i ][ j ] = s
+				s = split[ i ][ j ]
+				cost[ i ][ j ] = best
+				density[ i ][ j ] = _productDensity( density[ i ][ s ], density[ s + 1 ][ j ], dims[ s + 1 ] )
+		self._split = split
+		self.cost = cost[ 0 ][ k - 1 ]
+		# the cost of multiplying from left to right, for comparison
+		naive = 0
+		d = densities[ 0 ]
+		for j in xrange( 1, k ):
+			naive += dims[ 0 ] * dims[ j ] * dims[ j + 1 ] * d
+			d = _productDensity( d, densities[ j ], dims[ j ] )
+		self.naiveCost = naive
+		self.order = self._order( 0, k - 1 )
+
+	def __repr__( self ):
+		"""
+		Representation. Shows the order, with the matrices numbered from 0, and the costs.
+
+		Call: repr( plan ); str( plan )
+
+		:rtype: string
+		:returns: A description of the plan.
+		"""
+		return "%s: about %d multiplications ( %d from left to right )" % ( self._format( self.order ),
+			round( self.cost ), round( self.naiveCost ) )
+
+	__str__ = __repr__
+
+	def _format( self, order ):
+		"""
+		Internal Function: formats a nested order as a string.
+		"""
+		if isinstance( order, tuple ):
+			return '( %s %s )' % ( self._format( order[ 0 ] ), self._format( order[ 1 ] ) )
+		return str( order )
+
+	def _order( self, i, j ):
+		"""
+		Internal Function: the order for matrices i to j, as nested pairs of indices.
+		"""
+		if ( i == j ):
+			return i
+		s = self._split[ i ][ j ]
+		return ( self._order( i, s ), self._order( s + 1, j ) )
+
+	def execute( self, *matrices ):
+		"""
+		Multiplies the matrices in the planned order. Each product is written into a row
+		buffer left over from an earlier product of the same shape, if there is one.
+
+		:Parameters:
+			matrices : matrix
+				The matrices the plan was made for, or others of the same shapes.
+
+		:rtype: matrix
+		:returns: The product of the chain.
+		"""
+		if ( len( matrices ) == 1 ) and isinstance( matrices[ 0 ], ( list, tuple ) ):
+			matrices = matrices[ 0 ]
+		if not ( [ ( m.height, m.width ) for m in matrices ] == self.shapes ):
+			raise ValueError( "The matrices do not match the plan" )
+		if ( len( matrices ) == 1 ):
+			return matrix( matrices[ 0 ] )
+		spare = dict( ) # ( height, width ) -> row buffers no longer in use
+		inputs = [ m.value for m in matrices ]
+
+		def evaluate( order ):
+			# returns the rows of the product, and whether they are an intermediate buffer
+			if not isinstance( order, tuple ):
+				return inputs[ order ], False
+			left, leftOwned = evaluate( order[ 0 ] )
+			right, rightOwned = evaluate( order[ 1 ] )
+			shape = ( len( left ), len( right[ 0 ] ) )
+			buffers = spare.get( shape )
+			if buffers:
+				out = buffers.pop( )
+			else:
+				out = [ [ 0 ] * shape[ 1 ] for i in xrange( shape[ 0 ] ) ]
+			_multiplyRows( left, right, out )
+			for rows, owned in ( ( left, leftOwned ), ( right, rightOwned ) ):
+				if owned:
+					spare.setdefault( ( len( rows ), len( rows[ 0 ] ) ), list( ) ).append( rows )
+			return out, True
+
+		rows, owned = evaluate( self.order )
+		return _matrix._fromRows( rows )
+
+
+def planChain( *matrices ):
+	"""
+	Plans the cheapest order to multiply a chain of matrices in, from their shapes and
+	the density of their nonzero items.
+
+	:Parameters:
+		matrices : matrix
+			The matrices, in the order they are to be multiplied.
+
+	:rtype: chainPlan
+	:returns: The plan, which reports its cost and can be executed.
+	"""
+	if ( len( matrices ) == 1 ) and isinstance( matrices[ 0 ], ( list, tuple ) ):
+		matrices = matrices[ 0 ]
+	return chainPlan( [ ( m.height, m.width ) for m in matrices ], [ _density( m ) for m in matrices ] )
+
+def chainProduct( *matrices ):
+	"""
+	Multiplies a chain of matrices in the cheapest order ( see planChain ).
+
+	Call: chainProduct( a, b, c ) or chainProduct( [ a, b, c ] )
+
+	:Parameters:
+		matrices : matrix
+			The matrices, in the order they are to be multiplied.
+
+	:rtype: matrix
+	:returns: The product of the chain.
+	"""
+	if ( len( matrices ) == 1 ) and isinstance( matrices[ 0 ], ( list, tuple ) ):
+		matrices = matrices[ 0 ]
+	return planChain( *matrices ).execute( *matrices )
+
+# Aliases for chainProduct
+chain_product = chainProduct
+multi_dot = chainProduct
@@ -0,0 +1,365 @@
+"""
+modular.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Multi-modular linear algebra for integer ( and rational ) matrices. Each computation is
+carried out modulo a number of word-sized primes, where the numbers never grow, and the
+exact result is rebuilt with the Chinese Remainder Theorem. The Hadamard bound tells us
+how many primes are needed. Every prime is independent of the others, so the work can be
+spread over several processes.
+"""
+
+import types
+from matrix import matrix
+from fraction import fraction
+from primes import isPrime, gcd
+from aio import checkpoint
+
+VERSION = "0.1"
+
+MODULAR_PRIME_BITS = 31 # the primes used are just below 2 ** MODULAR_PRIME_BITS, so products fit in a machine word.
+MODULAR_RANK_PRIMES = 3 # how many primes the rank is computed modulo.
+MODULAR_VALID_INTS = ( types.IntType, types.LongType )
+
+_primes = list( )
+
+
+def modularPrimes( count ):
+	"""
+	Returns the largest primes below 2 ** MODULAR_PRIME_BITS. The list is cached.
+
+	:Parameters:
+		count : int
+			How many primes to return
+
+	:rtype: list
+	:returns: The first count primes below 2 ** MODULAR_PRIME_BITS, in descending order.
+	"""
+	if not _primes:
+		candidate = 2 ** MODULAR_PRIME_BITS - 1
+	else:
+		candidate = _primes[ -1 ] - 2
+	while ( len( _primes ) < count ):
+		if isPrime( candidate ):
+			_primes.append( candidate )
+		candidate -= 2
+	return _primes[ :count ]
+
+def _integerRows( value, b = None ):
+	"""
+	Internal Function: converts a matrix ( or 2-dimensional list ) of ints and fractions
+	into a list of integer rows. Each row ( and the matching item of b ) is multiplied by
+	the least common multiple of its denominators.
+
+	:rtype: tuple
+	:returns: The integer rows, the integer right hand side ( or None ), and the product \
+	of the row multipliers.
+	"""
+	if isinstance( value, matrix ):
+		value = value.value
+	rows = list( )
+	rhs = None
+	if b is not None:
+		rhs = list( )
+	scale = 1
+	for i in xrange( len( value ) ):
+		row = list( value[ i ] )
+		if b is not None:
+			row.append( b[ i ] )
+		multiplier = 1
+		hasFractions = False
+		for item in row:
+			if ( type( item ) == fraction ):
+				hasFractions = True
+				if not ( type( item.numerator ) in MODULAR_VALID_INTS and type( item.denominator ) in MODULAR_VALID_INTS ):
+					raise TypeError( "Multi-modular methods require integer or rational items" )
+				d = abs( item.denominator )
+				multiplier = multiplier // gcd( multiplier, d ) * d
+			elif not ( type( item ) in MODULAR_VALID_INTS ):
+				raise TypeError( "Multi-modular methods require integer or rational items" )
+		if not hasFractions:
+			newRow = row
+		else:
+			newRow = list( )
+			for item in row:
+				if ( type( item ) == fraction ):
+					newRow.append( item.numerator * ( multiplier // item.denominator ) )
+				else:
+					newRow.append( item * multiplier )
+			scale *= multiplier
+		if b is not None:
+			rhs.append( newRow.pop( ) )
+		rows.append( newRow )
+	return rows, rhs, scale
+
+def _hadamardSquare( rows, rhs = None ):
+	"""
+	Internal Function: the square of the Hadamard bound on the determinant of rows. If
+	rhs is given, the bound also covers every matrix made by replacing a column of rows
+	with rhs ( the Cramer's rule numerators ).
+	"""
+	returnvalue = 1
+	for i in xrange( len( rows ) ):
+		s = sum( [ x * x for x in rows[ i ] ] )
+		if rhs is not None:
+			s += rhs[ i ] * rhs[ i ]
+		returnvalue *= max( s, 1 )
+	return returnvalue
+
+def _primesNeeded( boundSquare ):
+	"""
+	Internal Function: how many primes are needed for their product to exceed twice the
+	bound, which is enough to recover any integer of absolute value up to the bound.
+	"""
+	count = 0
+	product = 1
+	while ( product * product <= 4 * boundSquare ):
+		count += 1
+		product *= modularPrimes( count )[ -1 ]
+	return max( count, 1 )
+
+def _determinantModP( args ):
+	"""
+	Internal Function: the determinant of an integer matrix modulo a prime, by
+	Gaussian elimination over the integers mod p.
+	"""
+	rows, p = args
+	n = len( rows )
+	a = [ [ x % p for x in row ] for row in rows ]
+	returnvalue = 1
+	for k in xrange( n ):
+		checkpoint( )
+		if not a[ k ][ k ]:
+			for i in xrange( k + 1, n ):
+				if a[ i ][ k ]:
+					a[ k ], a[ i ] = a[ i ], a[ k ]
+					returnvalue = -returnvalue
+					break
+			else:
+				return 0
+		pivotRow = a[ k ]
+		pivot = pivotRow[ k ]
+		returnvalue = returnvalue * pivot % p
+		inverse = pow( pivot, p - 2, p )
+		tail = pivotRow[ k + 1: ]
+		for i in xrange( k + 1, n ):
+			row = a[ i ]
+			f = row[ k ] * inverse % p
+			if f:
+				a[ i ] = row[ :k + 1 ] + [ ( x - f * y ) % p for x, y in zip( row[ k + 1: ], tail ) ]
+	return returnvalue % p
+
+def _rankModP( args ):
+	"""
+	Internal Function: the rank of an integer matrix modulo a prime.
+	"""
+	rows, p = args
+	a = [ [ x % p for x in row ] for row in rows ]
+	height = len( a )
+	width = height and len( a[ 0 ] )
+	rank = 0
+	for column in xrange( width ):
+		checkpoint( )
+		for i in xrange( rank, height ):
+			if a[ i ][ column ]:
+				break
+		else:
+			continue
+		a[ rank ], a[ i ] = a[ i ], a[ rank ]
+		pivotRow = a[ rank ]
+		inverse = pow( pivotRow[ column ], p - 2, p )
+		tail = pivotRow[ column + 1: ]
+		for i in xrange( rank + 1, height ):
+			row = a[ i ]
+			f = row[ column ] * inverse % p
+			if f:
+				a[ i ] = row[ :column + 1 ] + [ ( x - f * y ) % p for x, y in zip( row[ column + 1: ], tail ) ]
+		rank += 1
+	return rank
+
+def _solveModP( args ):
+	"""
+	Internal Function: solves an integer system modulo a prime with Gauss-Jordan
+	elimination.
+
+	:rtype: list
+	:returns: The determinant followed by the determinant times each unknown, all \
+	modulo p, or None if the matrix is singular modulo p.
+	"""
+	rows, rhs, p = args
+	n = len( rows )
+	a = [ [ x % p for x in rows[ i ] ] + [ rhs[ i ] % p ] for i in xrange( n ) ]
+	det = 1
+	for k in xrange( n ):
+		checkpoint( )
+		if not a[ k ][ k ]:
+			for i in xrange( k + 1, n ):
+				if a[ i ][ k ]:
+					a[ k ], a[ i ] = a[ i ], a[ k ]
+					det = -det
+					break
+			else:
+				return None
+		pivotRow = a[ k ]
+		pivot = pivotRow[ k ]
+		det = det * pivot % p
+		inverse = pow( pivot, p - 2, p )
+		pivotRow = a[ k ] = [ x * inverse % p for x in pivotRow ]
+		for i in xrange( n ):
+			if ( i == k ):
+				continue
+			row = a[ i ]
+			f = row[ k ]
+			if f:
+				a[ i ] = [ ( x - f * y ) % p for x, y in zip( row, pivotRow ) ]
+	return [ det % p ] + [ a[ i ][ n ] * det % p for i in xrange( n ) ]
+
+def _map( function, jobs, processes ):
+	"""
+	Internal Function: applies function to each job, in a pool of worker processes if
+	processes is more than 1.
+	"""
+	if processes and ( processes > 1 ) and ( len( jobs ) > 1 ):
+		import multiprocessing
+		pool = multiprocessing.Pool( min( processes, len( jobs ) ) )
+		try:
+			return pool.map( function, jobs )
+		finally:
+			pool.close( )
+			pool.join( )
+	return map( function, jobs )
+
+def _chineseRemainder( residues, moduli ):
+	"""
+	Internal Function: combines residues into the unique integer of smallest absolute
+	value with those residues modulo the given ( coprime ) moduli.
+	"""
+	value = 0
+	modulus = 1
+	for r, p in zip( residues, moduli ):
+		# solve value + modulus * t == r ( mod p )
+		t = ( r - value ) * pow( modulus % p, p - 2, p ) % p
+		value += modulus * t
+		modulus *= p
+	if ( value > modulus // 2 ):
+		value -= modulus
+	return value
+
+def determinant( value, processes = None ):
+	"""
+	Determinant of a matrix of ints ( or fractions ), computed modulo several primes and
+	combined with the Chinese Remainder Theorem.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list ) of ints and fractions.
+		processes : int
+			The number of worker processes to use. By default everything runs in this process.
+
+	:rtype: int or fraction
+	:returns: The exact determinant
+	"""
+	rows, rhs, scale = _integerRows( value )
+	n = len( rows )
+	for row in rows:
+		if ( len( row ) != n ):
+			raise ValueError( "Determinant is not defined for non-square matrix" )
+	if not n:
+		return 1
+	moduli = modularPrimes( _primesNeeded( _hadamardSquare( rows ) ) )
+	residues = _map( _determinantModP, [ ( rows, p ) for p in moduli ], processes )
+	returnvalue = _chineseRemainder( residues, moduli )
+	if ( scale == 1 ):
+		return returnvalue
+	if returnvalue % scale:
+		return fraction( returnvalue, scale )
+	return returnvalue // scale
+
+def rank( value, processes = None ):
+	"""
+	Rank of a matrix of ints ( or fractions ). The rank modulo a prime is never more than
+	the true rank, and only falls short for primes dividing every largest non-zero minor, so
+	the largest of the ranks modulo MODULAR_RANK_PRIMES large primes is taken.
+
+	:Parameters:
+		value : matrix
+			A matrix ( or 2-dimensional list ) of ints and fractions.
+		processes : int
+			The number of worker processes to use. By default everything runs in this process.
+
+	:rtype: int
+	:returns: The rank of the matrix
+	"""
+	rows, rhs, scale = _integerRows( value )
+	return max( _map( _rankModP, [ ( rows, p ) for p in modularPrimes( MODULAR_RANK_PRIMES ) ], processes ) )
+
+def solve( value, b, processes = None ):
+	"""
+	Solves the system value * x = b exactly for a non-singular matrix of ints ( or fractions ).
+	The determinant and the Cramer's rule numerators are found modulo each prime, and the
+	solution is rebuilt from them.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list ) of ints and fractions.
+		b : list
+			The right hand side, either a list of numbers or a matrix with one column.
+		processes : int
+			The number of worker processes to use. By default everything runs in this process.
+
+	:rtype: list or matrix
+	:returns: The solution x as fractions and ints, as a one-column matrix if b was a matrix.
+	"""
+	columnMatrix = isinstance( b, matrix )
+	if columnMatrix:
+		if not ( b.width == 1 ):
+			raise ValueError( "The right hand side must be a list or a matrix with one column" )
+		b = b.getColumn( 0 )
+	rows, rhs, scale = _integerRows( value, b )
+	n = len( rows )
+	for row in rows:
+		if ( len( row ) != n ):
+			raise ValueError( "Solve is only defined for a square matrix" )
+	if not ( len( rhs ) == n ):
+		raise ValueError( "The right hand side must have one item per row" )
+	needed = _primesNeeded( _hadamardSquare( rows, rhs ) )
+	moduli = list( )
+	residues = list( )
+	candidates = 0
+	# a prime dividing the determinant gives no information, so keep going until there
+	# are enough primes which don't.
+	while ( len( moduli ) < needed ):
+		batch = modularPrimes( candidates + needed - len( moduli ) )[ candidates: ]
+		candidates += len( batch )
+		for p, result in zip( batch, _map( _solveModP, [ ( rows, rhs, p ) for p in batch ], processes ) ):
+			if result is not None:
+				moduli.append( p )
+				residues.append( result )
+		# if none of the first primes worked, the matrix is most likely singular. Check.
+		if not ( moduli or determinant( rows, processes ) ):
+			raise ValueError( 'This matrix is not invertible' )
+	det = _chineseRemainder( [ r[ 0 ] for r in residues ], moduli )
+	returnvalue = list( )
+	for i in xrange( 1, n + 1 ):
+		numerator = _chineseRemainder( [ r[ i ] for r in residues ], moduli )
+		if numerator % det:
+			returnvalue.append( fraction( numerator, det ) )
+		else:
+			returnvalue.append( numerator // det )
+	if columnMatrix:
+		return matrix( [ [ x ] for x in returnvalue ] )
+	return returnvalue
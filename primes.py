@@ -0,0 +1,247 @@
+"""
+primes.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+"""
+
+import types
+from collections import OrderedDict
+
+VERSION = "0.1"
+
+PRIMES_SIEVE_LIMIT = 65536 # primes below this are found by table lookup and used for trial division.
+PRIMES_CACHE_SIZE = 4096 # how many recent factorizations to remember.
+PRIMES_VALID_TYPES = ( types.IntType, types.LongType )
+
+# Bases for the Miller-Rabin test. Testing against all of these is deterministic
+# for every n < 3317044064679887385961981, and a very strong probable-prime test above that.
+_MILLER_RABIN_BASES = ( 2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41 )
+
+_sieveLimit = 0
+_sievePrimes = list( )
+_sieveSet = frozenset( )
+_cache = OrderedDict( )
+
+
+def gcd( a, b ):
+	"""
+	Greatest common divisor of two integers.
+
+	:Parameters:
+		a : int
+			The first number
+		b : int
+			The second number
+
+	:rtype: int
+	:returns: The (non-negative) greatest common divisor of a and b
+	"""
+	while b:
+		a, b = b, a % b
+	return abs( a )
+
+def sieve( limit = None ):
+	"""
+	Returns the primes below limit. The table is cached, and only rebuilt when
+	a larger limit than any previous one is requested.
+
+	:Parameters:
+		limit : int
+			The upper bound (exclusive). Defaults to PRIMES_SIEVE_LIMIT.
+
+	:rtype: list
+	:returns: A list of all primes less than limit, in ascending order.
+	"""
+	global _sieveLimit, _sievePrimes, _sieveSet
+	if limit is None:
+		limit = PRIMES_SIEVE_LIMIT
+	if ( limit > _sieveLimit ):
+		flags = bytearray( [ 1 ] ) * limit
+		flags[ 0:2 ] = bytearray( 2 )
+		i = 2
+		while ( i * i < limit ):
+			if flags[ i ]:
+				flags[ i*i::i ] = bytearray( len( xrange( i*i, limit, i ) ) )
+			i += 1
+		_sievePrimes = [ p for p in xrange( limit ) if flags[ p ] ]
+		_sieveSet = frozenset( _sievePrimes )
+		_sieveLimit = limit
+	if ( limit == _sieveLimit ):
+		return list( _sievePrimes )
+	return [ p for p in _sievePrimes if p < limit ]
+
+def isPrime( n ):
+	"""
+	Tests a number for primality. Small numbers are looked up in the sieve,
+	larger ones go through trial division by a few small primes and then
+	the Miller-Rabin test.
+
+	:Parameters:
+		n : int
+			The number to test
+
+	:rtype: boolean
+	:returns: True if n is prime
+	"""
+	if ( n < 2 ):
+		return False
+	if not _sieveLimit:
+		sieve( )
+	if ( n < _sieveLimit ):
+		return n in _sieveSet
+	for p in _MILLER_RABIN_BASES:
+		if not ( n % p ):
+			return False
+	d = n - 1
+	s = 0
+	while not ( d & 1 ):
+		d >>= 1
+		s += 1
+	for a in _MILLER_RABIN_BASES:
+		x = pow( a, d, n )
+		if ( x == 1 or x == n - 1 ):
+			continue
+		for r in xrange( s - 1 ):
+			x = x * x % n
+			if ( x == n - 1 ):
+				break
+		else:
+			return False
+	return True
+
+def pollardBrent( n ):
+	"""
+	Finds a non-trivial factor of a composite number using Brent's variant of
+	Pollard's rho algorithm.
+
+	:Parameters:
+		n : int
+			An odd composite number
+
+	:rtype: int
+	:returns: A factor of n other than 1 and n.
+	"""
+	if not ( n & 1 ):
+		return 2
+	c = 1
+	while True:
+		y, r, q, g = 2, 1, 1, 1
+		m = 128
+		while ( g == 1 ):
+			x = y
+			for i in xrange( r ):
+				y = ( y * y + c ) % n
+			k = 0
+			while ( k < r and g == 1 ):
+				ys = y
+				for i in xrange( min( m, r - k ) ):
+					y = ( y * y + c ) % n
+					q = q * abs( x - y ) % n
+				g = gcd( q, n )
+				k += m
+			r <<= 1
+		if ( g == n ):
+			# the batched gcd overshot; step back one value at a time.
+			g = 1
+			while ( g == 1 ):
+				ys = ( ys * ys + c ) % n
+				g = gcd( abs( x - ys ), n )
+		if ( g != n ):
+			return g
+		c += 1 # this polynomial failed, try another one.
+
+def _factorLarge( n, returnvalue ):
+	"""
+	Internal Function: appends the prime factors of n, which has no factors
+	below the sieve limit, to returnvalue.
+	"""
+	stack = [ n ]
+	while stack:
+		n = stack.pop( )
+		if ( n == 1 ):
+			continue
+		if isPrime( n ):
+			returnvalue.append( n )
+			continue
+		d = pollardBrent( n )
+		stack.append( d )
+		stack.append( n // d )
+
+def factor( value ):
+	"""
+	Determines the prime factors of an integer. Recent results are memoized.
+
+	:Parameters:
+		value : int
+			The number to find the factors of
+
+	:rtype: list
+	:returns: A list containing the prime factors of value in ascending order, \
+	with repetition. Negative numbers include a factor of -1, and 0 has no factors.
+	"""
+	if not ( type( value ) in PRIMES_VALID_TYPES ):
+		raise TypeError( "Only integers can be factored" )
+	if ( value in _cache ):
+		returnvalue = _cache.pop( value )
+		_cache[ value ] = returnvalue
+		return list( returnvalue )
+	key = value
+	returnvalue = list( )
+	if value < 0:
+		value = -value
+		returnvalue.append( -1 )
+	if ( value > 1 ):
+		if not _sieveLimit:
+			sieve( )
+		for p in _sievePrimes:
+			if ( p * p > value ):
+				break
+			while not ( value % p ):
+				returnvalue.append( p )
+				value //= p
+		if ( value >= _sieveLimit * _sieveLimit ):
+			large = list( )
+			_factorLarge( value, large )
+			large.sort( )
+			returnvalue.extend( large )
+		elif ( value > 1 ):
+			returnvalue.append( value )
+	_cache[ key ] = tuple( returnvalue )
+	if ( len( _cache ) > PRIMES_CACHE_SIZE ):
+		_cache.popitem( last = False )
+	return returnvalue
+
+def factorization( value ):
+	"""
+	Determines the prime factorization of an integer as prime/exponent pairs.
+
+	:Parameters:
+		value : int
+			The number to factor
+
+	:rtype: dict
+	:returns: A dictionary mapping each prime factor of value to its multiplicity.
+	"""
+	returnvalue = dict( )
+	for p in factor( value ):
+		returnvalue[ p ] = returnvalue.get( p, 0 ) + 1
+	return returnvalue
+
+def clearCache( ):
+	"""
+	Forgets all memoized factorizations.
+	"""
+	_cache.clear( )
@@ -0,0 +1,457 @@
+"""
+rationalmatrix.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+"""
+
+import types
+from operator import mul
+import matrix as _matrix
+from matrix import matrix
+from fraction import fraction
+from primes import gcd
+from aio import checkpoint
+
+VERSION = "0.1"
+
+RATIONAL_VALID_INTS = ( types.IntType, types.LongType )
+
+
+def _lcm( a, b ):
+	"""
+	Internal Function: least common multiple of two positive integers.
+	"""
+	return a // gcd( a, b ) * b
+
+def _toRational( item ):
+	"""
+	Internal Function: splits a matrix item into an integer numerator and a positive
+	integer denominator. Floats are converted the same way the fraction constructor does.
+	"""
+	if ( type( item ) in RATIONAL_VALID_INTS ):
+		return item, 1
+	if ( type( item ) != fraction ):
+		item = fraction( item )
+	numerator, denominator = item.numerator, item.denominator
+	if not ( type( numerator ) in RATIONAL_VALID_INTS and type( denominator ) in RATIONAL_VALID_INTS ):
+		raise TypeError( "rationalMatrix items must be real and rational" )
+	if ( denominator < 0 ):
+		return -numerator, -denominator
+	return numerator, denominator
+
+def _bareissGaussJordan( rows ):
+	"""
+	Internal Function: fraction-free Gauss-Jordan elimination. Every division is exact,
+	so all of the arithmetic stays in integers. Rows are modified in place.
+
+	:Parameters:
+		rows : list
+			A list of lists of integers, with at least as many columns as rows.
+
+	:rtype: tuple
+	:returns: The determinant of the leading square part of rows ( 0 if it is \
+	singular ), and the last pivot. On success that part has been reduced to the \
+	last pivot times the identity.
+	"""
+	n = len( rows )
+	previous = 1
+	sign = 1
+	for k in xrange( n ):
+		checkpoint( )
+		if not rows[ k ][ k ]:
+			for p in xrange( k + 1, n ):
+				if rows[ p ][ k ]:
+					rows[ k ], rows[ p ] = rows[ p ], rows[ k ]
+					sign = -sign
+					break
+			else:
+				return 0, 0
+		pivotRow = rows[ k ]
+		pivot = pivotRow[ k ]
+		for i in xrange( n ):
+			if ( i == k ):
+				continue
+			row = rows[ i ]
+			f = row[ k ]
+			if ( previous == 1 ):
+				rows[ i ] = [ pivot * x - f * y for x, y in zip( row, pivotRow ) ]
+			else:
+				rows[ i ] = [ ( pivot * x - f * y ) // previous for x, y in zip( row, pivotRow ) ]
+		previous = pivot
+	return sign * previous, previous
+
+def _bareissDeterminant( rows ):
+	"""
+	Internal Function: fraction-free ( Bareiss ) determinant of a square integer matrix.
+	Rows are modified in place.
+	"""
+	n = len( rows )
+	previous = 1
+	sign = 1
+	for k in xrange( n - 1 ):
+		checkpoint( )
+		if not rows[ k ][ k ]:
+			for p in xrange( k + 1, n ):
+				if rows[ p ][ k ]:
+					rows[ k ], rows[ p ] = rows[ p ], rows[ k ]
+					sign = -sign
+					break
+			else:
+				return 0
+		pivotRow = rows[ k ]
+		pivot = pivotRow[ k ]
+		for i in xrange( k + 1, n ):
+			row = rows[ i ]
+			f = row[ k ]
+			rows[ i ] = [ 0 ] * ( k + 1 ) + [ ( pivot * row[ j ] - f * pivotRow[ j ] ) // previous for j in xrange( k + 1, n ) ]
+		previous = pivot
+	if not n:
+		return 1
+	return sign * rows[ n - 1 ][ n - 1 ]
+
+
+class rationalMatrix( object ):
+	"""
+	A matrix of rational numbers, stored as a matrix of integers and a single shared
+	denominator. All arithmetic is done on plain integers and the result is normalized
+	once, which is much faster than working with a matrix of fraction objects.
+	"""
+
+	def __init__( self, value = None, denominator = 1 ):
+		"""
+		Constructor. Accepts a matrix, a rationalMatrix, or a 2-dimensional list of numbers.
+		If a denominator is given, the items of value must be integers and are taken as
+		the numerators over that denominator.
+
+		:Parameters:
+			value : matrix
+				The values for the new matrix.
+			denominator : int
+				The shared denominator of the items of value.
+		"""
+		self._numerators = list( )
+		self._denominator = 1
+		if value is None:
+			return
+		if ( type( value ) == type( self ) ):
+			self._numerators = [ list( row ) for row in value._numerators ]
+			self._denominator = value._denominator
+			return
+		if isinstance( value, matrix ):
+			value = value.value
+		if not ( type( denominator ) in RATIONAL_VALID_INTS ):
+			raise TypeError( "The denominator of a rationalMatrix must be an integer" )
+		if not denominator:
+			raise ZeroDivisionError( "The denominator of a rationalMatrix cannot be 0" )
+		rows = [ [ _toRational( item ) for item in row ] for row in value ]
+		if rows and [ r for r in rows if len( r ) != len( rows[ 0 ] ) ]:
+			raise ValueError( "All rows of a rationalMatrix must be the same length" )
+		common = 1
+		for row in rows:
+			for n, d in row:
+				if ( d != 1 ):
+					common = _lcm( common, d )
+		self._numerators = [ [ n * ( common // d ) for n, d in row ] for row in rows ]
+		self._denominator = common * denominator
+		self._normalize( )
+
+	def __add__( self, value ):
+		"""
+		Addition. Requires matrices of the same size.
+
+		Call: rat1 + rat2, rat + mat
+
+		:rtype: rationalMatrix
+		:returns: The result of the addition ( Linear Algebra )
+		"""
+		if isinstance( value, matrix ):
+			value = rationalMatrix( value )
+		if not ( type( value ) == type( self ) ):
+			return NotImplemented
+		if not ( self.size == value.size ):
+			raise ValueError( "Matrices must be the same size for '+'" )
+		common = _lcm( self._denominator, value._denominator )
+		a = common // self._denominator
+		b = common // value._denominator
+		return self._new( [ [ a * x + b * y for x, y in zip( r1, r2 ) ] for r1, r2 in zip( self._numerators, value._numerators ) ], common )
+
+	__radd__ = __add__
+
+	def __eq__( self, value ):
+		"""
+		Equality
+
+		Call: rat1 == rat2, rat == mat
+
+		:rtype: boolean
+		:returns: True if the matrices are identical
+		"""
+		if isinstance( value, matrix ):
+			value = rationalMatrix( value )
+		if not ( type( value ) == type( self ) ):
+			return NotImplemented
+		# both sides are normalized, so equal matrices have identical storage.
+		return ( self._denominator == value._denominator ) and ( self._numerators == value._numerators )
+
+	def __getattr__( self, name ):
+		"""
+		Get attribute.
+
+		Call: rat.width; rat.height; rat.size; rat.numerators; rat.denominator
+
+		:rtype: int, list, or tuple
+		:returns: The value requested.
+		"""
+		if name == 'width':
+			return len( self._numerators[ 0 ] ) if self._numerators else 0
+		if name == 'height':
+			return len( self._numerators )
+		if name == 'size':
+			return ( self.width, self.height )
+		if name == 'numerators':
+			return [ list( row ) for row in self._numerators ]
+		if name == 'denominator':
+			return self._denominator
+		raise AttributeError( name )
+
+	def __getitem__( self, index ):
+		"""
+		Get a row of this matrix
+
+		Call: rat[x] or rat[x][y]
+
+		:rtype: list
+		:returns: A copy of the requested row, as fractions and ints.
+		"""
+		return self._itemsOf( self._numerators[ index ] )
+
+	def __invert__( self ):
+		"""
+		Inverse.
+
+		Call: ~rat
+
+		:rtype: rationalMatrix
+		:returns: The inverse of the matrix.
+		"""
+		return self.inverse( )
+
+	def __mul__( self, value ):
+		"""
+		Multiplication
+
+		Call: rat * rat, rat * mat, rat * x
+
+		:rtype: rationalMatrix
+		:returns: The result of the multiplication ( Linear Algebra )
+		"""
+		if isinstance( value, matrix ):
+			value = rationalMatrix( value )
+		if ( type( value ) == type( self ) ):
+			if not ( self.width == value.height ):
+				raise ValueError( "Matrices are the incorrect size for '*'" )
+			columns = zip( *value._numerators )
+			return self._new( [ [ sum( map( mul, row, column ) ) for column in columns ] for row in self._numerators ],
+				self._denominator * value._denominator )
+		try:
+			numerator, denominator = _toRational( value )
+		except TypeError:
+			return NotImplemented
+		return self._new( [ [ x * numerator for x in row ] for row in self._numerators ], self._denominator * denominator )
+
+	def __ne__( self, value ):
+		"""
+		Non-equality
+
+		Call: rat1 != rat2
+
+		:rtype: boolean
+		:returns: True if the matrices are NOT equal
+		"""
+		returnvalue = self.__eq__( value )
+		if ( returnvalue is NotImplemented ):
+			return returnvalue
+		return not returnvalue
+
+	def __neg__( self ):
+		"""
+		Negative of a matrix
+
+		:rtype: rationalMatrix
+		:returns: A matrix with the sign of each item changed.
+		"""
+		return self._new( [ [ -x for x in row ] for row in self._numerators ], self._denominator, False )
+
+	def __repr__( self ):
+		"""
+		Representation. Formats the matrix for printing.
+
+		Call: repr( rat ); str( rat )
+
+		:rtype: string
+		:returns: A formatted representation of this matrix.
+		"""
+		return repr( self.toMatrix( ) )
+
+	def __rmul__( self, value ):
+		"""
+		Right side multiplication
+
+		Call: mat * rat, x * rat
+
+		:rtype: rationalMatrix
+		:returns: The result of the multiplication ( Linear Algebra )
+		"""
+		if isinstance( value, matrix ):
+			return rationalMatrix( value ) * self
+		return self.__mul__( value )
+
+	__str__ = __repr__
+
+	def __sub__( self, value ):
+		"""
+		Subtraction. Requires matrices of the same size.
+
+		Call: rat1 - rat2, rat - mat
+
+		:rtype: rationalMatrix
+		:returns: The result of the subtraction ( Linear Algebra )
+		"""
+		if isinstance( value, matrix ):
+			value = rationalMatrix( value )
+		if not ( type( value ) == type( self ) ):
+			return NotImplemented
+		return self + ( -value )
+
+	def __rsub__( self, value ):
+		"""
+		Right side subtraction
+
+		Call: mat - rat
+
+		:rtype: rationalMatrix
+		:returns: The result of the subtraction ( Linear Algebra )
+		"""
+		return ( -self ) + value
+
+	def _itemsOf( self, row ):
+		"""
+		Internal Function: converts a row of numerators to fractions ( or ints, where the
+		denominator divides out ).
+		"""
+		d = self._denominator
+		if ( d == 1 ):
+			return list( row )
+		returnvalue = list( )
+		for n in row:
+			if n % d:
+				returnvalue.append( fraction( n, d ) )
+			else:
+				returnvalue.append( n // d )
+		return returnvalue
+
+	def _new( self, numerators, denominator, normalize = True ):
+		"""
+		Internal Function: creates a rationalMatrix directly from its storage, skipping
+		the conversions done by the constructor.
+		"""
+		returnvalue = rationalMatrix( )
+		returnvalue._numerators = numerators
+		returnvalue._denominator = denominator
+		if normalize:
+			returnvalue._normalize( )
+		return returnvalue
+
+	def _normalize( self ):
+		"""
+		Internal Function: divides out any factor common to all of the numerators and the
+		denominator, and makes the denominator positive.
+		"""
+		d = self._denominator
+		if ( d < 0 ):
+			d = -d
+			self._numerators = [ [ -x for x in row ] for row in self._numerators ]
+		g = d
+		for row in self._numerators:
+			for x in row:
+				if x:
+					g = gcd( g, x )
+					if ( g == 1 ):
+						break
+			if ( g == 1 ):
+				break
+		if ( g > 1 ):
+			self._numerators = [ [ x // g for x in row ] for row in self._numerators ]
+			d //= g
+		self._denominator = d
+
+	def determinant( self ):
+		"""
+		Determinant. Only for square matrices.
+
+		:rtype: fraction or int
+		:returns: The determinant of this matrix
+		"""
+		if not ( self.width == self.height ):
+			raise ValueError( "Determinant is not defined for non-square matrix" )
+		numerator = _bareissDeterminant( [ list( row ) for row in self._numerators ] )
+		denominator = self._denominator ** self.height
+		if numerator % denominator:
+			return fraction( numerator, denominator )
+		return numerator // denominator
+
+	# An alias for determinant
+	det = determinant
+
+	def inverse( self ):
+		"""
+		Inverse. Computed with fraction-free Gauss-Jordan elimination on the integer part.
+
+		:rtype: rationalMatrix
+		:returns: The inverse of this matrix.
+		"""
+		if not ( self.width == self.height ):
+			raise ValueError( "Inverse is not defined for a non-square matrix" )
+		n = self.height
+		rows = list( )
+		for i in xrange( n ):
+			identity = [ 0 ] * n
+			identity[ i ] = 1
+			rows.append( self._numerators[ i ] + identity )
+		determinant, pivot = _bareissGaussJordan( rows )
+		if not determinant:
+			raise ValueError( 'This matrix is not invertible' )
+		# the row swaps are already part of the right half, so only the pivot itself is needed.
+		d = self._denominator
+		return self._new( [ [ x * d for x in row[ n: ] ] for row in rows ], pivot )
+
+	def toMatrix( self ):
+		"""
+		Converts this matrix to a regular matrix of fractions and ints.
+
+		:rtype: matrix
+		:returns: An equivalent matrix object
+		"""
+		return _matrix._fromRows( [ self._itemsOf( row ) for row in self._numerators ] )
+
+	def transpose( self ):
+		"""
+		Transpose of a matrix.
+
+		:rtype: rationalMatrix
+		:returns: The transpose of this matrix.
+		"""
+		return self._new( [ list( column ) for column in zip( *self._numerators ) ], self._denominator, False )
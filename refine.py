@@ -0,0 +1,221 @@
+"""
+refine.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Iterative refinement of the solutions of linear systems, with exact residuals.
+
+Call: refine.solve( a, b ) or a.solveRefined( b )
+
+The matrix is factored once, in floating point. Every float is a fraction whose
+denominator is a power of 2, so the matrix and right hand side are scaled row by row to
+integers, and the solution is kept as integers over a common power of 2. The residual
+b - A x is then computed exactly in integer arithmetic, rounded once to floats, and
+the correction is found with the stored factors. Each step gains roughly as many digits
+as the factorization is accurate to, until the solution is correct to the precision of
+a float, even for matrices too ill-conditioned for the factorization alone.
+"""
+
+import types
+from operator import mul, truediv
+from fraction import fraction
+from primes import gcd
+from matrix import matrix
+from aio import checkpoint
+
+VERSION = "0.1"
+
+REFINE_TOLERANCE = 2.0 ** -52 # the relative size of the last correction at which the solution is taken as converged
+REFINE_MAX_ITERATIONS = 10
+REFINE_VALID_INTS = ( types.IntType, types.LongType )
+
+
+def _ratio( item ):
+	"""
+	Internal Function: an int, long, float or fraction as an exact numerator and denominator.
+	"""
+	if ( type( item ) in REFINE_VALID_INTS ):
+		return item, 1
+	if ( type( item ) == types.FloatType ):
+		return item.as_integer_ratio( )
+	if ( type( item ) == fraction ) and ( type( item.numerator ) in REFINE_VALID_INTS ) and \
+		( type( item.denominator ) in REFINE_VALID_INTS ):
+		if ( item.denominator < 0 ):
+			return -item.numerator, -item.denominator
+		return item.numerator, item.denominator
+	raise TypeError( "Iterative refinement requires int, float or rational items" )
+
+def _integerRows( value, b ):
+	"""
+	Internal Function: scales each row of the system ( and the matching item of b ) by
+	the least common multiple of its denominators.
+
+	:rtype: tuple
+	:returns: The integer rows, the integer right hand side and the multiplier of each row.
+	"""
+	rows = list( )
+	rhs = list( )
+	multipliers = list( )
+	for row, item in zip( value, b ):
+		ratios = [ _ratio( x ) for x in row ] + [ _ratio( item ) ]
+		multiplier = 1
+		for n, d in ratios:
+			if ( d != 1 ):
+				multiplier = multiplier // gcd( multiplier, d ) * d
+		integers = [ n * ( multiplier // d ) for n, d in ratios ]
+		rhs.append( integers.pop( ) )
+		rows.append( integers )
+		multipliers.append( multiplier )
+	return rows, rhs, multipliers
+
+def _addExactly( numerators, shift, values ):
+	"""
+	Internal Function: adds a list of floats to a list of numbers held exactly as integers
+	over 2 ** shift.
+
+	:rtype: tuple
+	:returns: The new numerators and shift.
+	"""
+	ratios = [ x.as_integer_ratio( ) for x in values ]
+	exponent = max( [ shift ] + [ d.bit_length( ) - 1 for n, d in ratios ] )
+	return [ ( x << ( exponent - shift ) ) + ( n << ( exponent - d.bit_length( ) + 1 ) ) for x, ( n, d ) in zip( numerators, ratios ) ], exponent
+
+
+class refinement( object ):
+	"""
+	The solution of a linear system found by iterative refinement, with the diagnostics
+	of how it converged.
+
+	:Attributes:
+		solution : list
+			The solution, as floats.
+		exact : list
+			The solution exactly as it was accumulated, as ints and fractions.
+		converged : boolean
+			Whether the last correction was within the tolerance.
+		iterations : int
+			The number of corrections made after the first solve.
+		residuals : list
+			The largest absolute value of the exact residual b - A x before each \
+			correction, and after the last.
+		corrections : list
+			The size of each correction relative to the solution, in the infinity norm.
+	"""
+
+	def __init__( self, value, b, tolerance = None, maxIterations = None ):
+		"""
+		Constructor. Solves the system value * x = b.
+
+		:Parameters:
+			value : matrix
+				A square, non-singular matrix ( or 2-dimensional list ) of ints, floats \
+				and fractions.
+			b : list
+				The right hand side.
+			tolerance : float
+				The relative size of correction at which to stop. Defaults to REFINE_TOLERANCE.
+			maxIterations : int
+				The most corrections to make. Defaults to REFINE_MAX_ITERATIONS.
+		"""
+		import decompose
+		if tolerance is None:
+			tolerance = REFINE_TOLERANCE
+		if maxIterations is None:
+			maxIterations = REFINE_MAX_ITERATIONS
+		if isinstance( value, matrix ):
+			value = value.value
+		n = len( value )
+		if [ row for row in value if not ( len( row ) == n ) ]:
+			raise ValueError( "Solve is only defined for a square matrix" )
+		if not ( len( b ) == n ):
+			raise ValueError( "The right hand side must have one item per row" )
+		if not n:
+			# an empty system is solved exactly by the empty solution
+			self.solution, self.exact = list( ), list( )
+			self.residuals, self.corrections = [ 0.0 ], list( )
+			self.converged = True
+			self.iterations = 0
+			return
+		rows, rhs, multipliers = _integerRows( value, b )
+		factors = decompose.lu( value )
+		if factors.singular:
+			raise ValueError( 'This matrix is not invertible' )
+		# x is kept exactly, as the integers numerators over 2 ** shift
+		numerators = [ 0 ] * n
+		shift = 0
+		self.residuals = list( )
+		self.corrections = list( )
+		self.converged = False
+		stalled = False
+		steps = 0
+		while True:
+			checkpoint( )
+			scaled = [ ( r << shift ) - sum( map( mul, row, numerators ) ) for row, r in zip( rows, rhs ) ]
+			residual = [ truediv( s, m << shift ) for s, m in zip( scaled, multipliers ) ]
+			self.residuals.append( max( [ abs( r ) for r in residual ] ) )
+			if not [ s for s in scaled if s ]:
+				self.converged = True
+				break
+			if self.converged or stalled or ( steps > maxIterations ):
+				break
+			correction = factors.solve( residual )
+			numerators, shift = _addExactly( numerators, shift, correction )
+			if steps:
+				size = max( [ abs( truediv( x, 1 << shift ) ) for x in numerators ] ) or 1.0
+				change = max( [ abs( c ) for c in correction ] ) / size
+				self.corrections.append( change )
+				self.converged = change <= tolerance
+				# the corrections stop shrinking when the matrix is too ill-conditioned for the factors
+				stalled = ( len( self.corrections ) > 1 ) and ( change > self.corrections[ -2 ] / 2 )
+			steps += 1
+		self.iterations = max( steps - 1, 0 )
+		self.solution = [ truediv( x, 1 << shift ) for x in numerators ]
+		self.exact = [ x >> shift if not ( x & ( ( 1 << shift ) - 1 ) ) else fraction( x, 1 << shift ) for x in numerators ]
+
+	def __repr__( self ):
+		"""
+		Representation. Summarizes the convergence.
+
+		:rtype: string
+		:returns: A description of the refinement.
+		"""
+		return "<refinement: %s after %d iterations, residual %g>" % ( "converged" if self.converged else "not converged",
+			self.iterations, self.residuals[ -1 ] )
+
+
+def solve( value, b, tolerance = None, maxIterations = None ):
+	"""
+	Solves the system value * x = b by iterative refinement with exact residuals.
+
+	:Parameters:
+		value : matrix
+			A square, non-singular matrix ( or 2-dimensional list ) of ints, floats and \
+			fractions.
+		b : list
+			The right hand side, either a list of numbers or a matrix with one column.
+		tolerance : float
+			The relative size of correction at which to stop. Defaults to REFINE_TOLERANCE.
+		maxIterations : int
+			The most corrections to make. Defaults to REFINE_MAX_ITERATIONS.
+
+	:rtype: refinement
+	:returns: The solution, in its solution attribute, and the convergence diagnostics.
+	"""
+	if isinstance( b, matrix ):
+		if not ( b.width == 1 ):
+			raise ValueError( "The right hand side must be a list or a matrix with one column" )
+		b = b.getColumn( 0 )
+	return refinement( value, b, tolerance, maxIterations )
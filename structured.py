@@ -0,0 +1,792 @@
+"""
+structured.py
+(c) 2007 Thomas McGrew
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+Square matrices with a known structure, which store only that structure: diagonal,
+identity, permutation, and upper and lower triangular matrices.
+
+Multiplying a matrix by a diagonal or permutation matrix takes time proportional to the
+size of the matrix, and by a triangular one about half the usual time. Determinants are
+O( n ) ( the product of the diagonal, or the sign of the permutation ), solves are O( n )
+or O( n ** 2 ) by substitution, and transposes and inverses keep the structure.
+
+detect( ) finds the structure of an ordinary matrix, which matrix.determinant,
+matrix.inverse and matrix.solve use to take the same shortcuts.
+"""
+
+import types
+from operator import mul
+import matrix as _matrix
+from matrix import matrix
+from fraction import fraction
+
+VERSION = "0.1"
+
+STRUCTURED_VALID_COLLECTIONS = ( types.ListType, types.TupleType )
+STRUCTURED_EXACT_TYPES = ( types.IntType, types.LongType, fraction )
+
+
+def _divide( a, b ):
+	"""
+	Internal Function: a / b, exactly if both are ints or fractions.
+	"""
+	if not b:
+		raise ValueError( 'This matrix is not invertible' )
+	if ( type( a ) in STRUCTURED_EXACT_TYPES ) and ( type( b ) in STRUCTURED_EXACT_TYPES ):
+		returnvalue = fraction( a, b )
+		if ( type( returnvalue ) == fraction ) and ( returnvalue.denominator in ( 1, -1 ) ):
+			return int( returnvalue.numerator * returnvalue.denominator )
+		return returnvalue
+	return a / b
+
+def _isScalar( value ):
+	"""
+	Internal Function: checks for a number which can be an item of a matrix.
+	"""
+	return ( type( value ) in _matrix._scalarTypes ) or _matrix._lookupScalarType( type( value ) )
+
+
+class structuredMatrix( object ):
+	"""
+	The parts shared by the structured matrices. Each kind provides its own rows, its
+	products with lists of rows and with vectors, and the determinant, inverse,
+	transpose and solve for its structure.
+	"""
+
+	def __getattr__( self, name ):
+		"""
+		Get attribute.
+
+		Call: s.width; s.height; s.size
+
+		:rtype: int or tuple
+		:returns: The value requested.
+		"""
+		if name in ( 'width', 'height' ):
+			return self._size
+		if name == 'size':
+			return ( self._size, self._size )
+		raise AttributeError( name )
+
+	def __getitem__( self, index ):
+		"""
+		Get a row.
+
+		Call: s[x] or s[x][y]
+
+		:rtype: list
+		:returns: The row requested.
+		"""
+		if ( index < 0 ):
+			index += self._size
+		if not ( 0 <= index < self._size ):
+			raise IndexError( 'Invalid index, row %d does not exist' % index )
+		return self._row( index )
+
+	def __invert__( self ):
+		"""
+		Inverse.
+
+		Call: ~s
+
+		:returns: The inverse, with the same structure.
+		"""
+		return self.inverse( )
+
+	def __iter__( self ):
+		"""
+		Iterates over each item, first row0, then row1, etc.
+
+		:rtype: generator
+		:returns: A generator over the items
+		"""
+		for i in xrange( self._size ):
+			for item in self._row( i ):
+				yield item
+
+	def __mul__( self, value ):
+		"""
+		Multiplication
+
+		Call: s * mat, s * s, s * list, s * x
+
+		:Parameters:
+			value : number; matrix; structuredMatrix; list
+				What to multiply by. A list is treated as a column vector.
+
+		:rtype: matrix, structuredMatrix or list
+		:returns: The result of the multiplication ( Linear Algebra ). Products which \
+		keep a structure, such as two diagonal matrices, are structured.
+		"""
+		if isinstance( value, structuredMatrix ):
+			if not ( self._size == value._size ):
+				raise ValueError( "Matrices are the incorrect size for '*'" )
+			returnvalue = self._multiplyStructured( value )
+			if returnvalue is NotImplemented:
+				returnvalue = value._rightMultiplyStructured( self )
+			if not ( returnvalue is NotImplemented ):
+				return returnvalue
+			value = value.materialize( )
+		if isinstance( value, matrix ):
+			if not ( self._size == value.height ):
+				raise ValueError( "Matrices are the incorrect size for '*'" )
+			return _matrix._fromRows( self._leftMultiply( value.value ) )
+		if ( type( value ) in STRUCTURED_VALID_COLLECTIONS ):
+			if not ( self._size == len( value ) ):
+				raise ValueError( "Vector is the incorrect length for '*'" )
+			return self._multiplyVector( value )
+		if _isScalar( value ):
+			return self._scale( value )
+		return NotImplemented
+
+	def __repr__( self ):
+		"""
+		Representation. Formats the matrix for printing, materializing it only if it is
+		small enough to be printed in full.
+
+		Call: repr( s ); str( s )
+
+		:rtype: string
+		:returns: A formatted representation of the matrix.
+		"""
+		if ( self._size * self._size <= _matrix.MATRIX_REPR_THRESHOLD ):
+			return repr( self.materialize( ) )
+		return "<%s %dx%d>" % ( self.__class__.__name__, self._size, self._size )
+
+	def __rmul__( self, value ):
+		"""
+		Right side multiplication
+
+		Call: mat * s, x * s
+
+		:rtype: matrix or structuredMatrix
+		:returns: The result of the multiplication ( Linear Algebra )
+		"""
+		if isinstance( value, matrix ):
+			if not ( value.width == self._size ):
+				raise ValueError( "Matrices are the incorrect size for '*'" )
+			return _matrix._fromRows( self._rightMultiply( value.value ) )
+		if _isScalar( value ):
+			return self._scale( value )
+		return NotImplemented
+
+	__str__ = __repr__
+
+	def _multiplyStructured( self, value ):
+		"""
+		Internal Function: self * value for another structured matrix, or NotImplemented
+		if this kind doesn't know a structured result.
+		"""
+		return NotImplemented
+
+	def _rightMultiplyStructured( self, value ):
+		"""
+		Internal Function: value * self for another structured matrix, or NotImplemented
+		if this kind doesn't know a structured result.
+		"""
+		return NotImplemented
+
+	def det( self ):
+		"""
+		Determinant.
+
+		:rtype: number
+		:returns: The determinant
+		"""
+		return self.determinant( )
+
+	def isSquare( self ):
+		"""
+		Checks for a square matrix. Structured matrices always are.
+
+		:rtype: boolean
+		:returns: True
+		"""
+		return True
+
+	def materialize( self ):
+		"""
+		Forms the full matrix.
+
+		:rtype: matrix
+		:returns: The matrix
+		"""
+		return _matrix._fromRows( [ self._row( i ) for i in xrange( self._size ) ] )
+
+	# An alias for materialize
+	toMatrix = materialize
+
+	def solve( self, b ):
+		"""
+		Solves s * x = b.
+
+		:Parameters:
+			b : list; matrix
+				The right hand side; a list is a single column, and each column of a \
+				matrix is solved for separately.
+
+		:rtype: list or matrix
+		:returns: x, in the same form as b
+		"""
+		if isinstance( b, matrix ):
+			if not ( b.height == self._size ):
+				raise ValueError( "Right hand side is the incorrect size for solve" )
+			columns = [ self._solveVector( list( column ) ) for column in zip( *b.value ) ]
+			return _matrix._fromRows( [ list( row ) for row in zip( *columns ) ] )
+		if not ( type( b ) in STRUCTURED_VALID_COLLECTIONS ) or not ( len( b ) == self._size ):
+			raise ValueError( "Right hand side is the incorrect size for solve" )
+		return self._solveVector( list( b ) )
+
+
+class diagonalMatrix( structuredMatrix ):
+	"""
+	A diagonal matrix, stored as its diagonal.
+	"""
+
+	def __init__( self, diagonal ):
+		"""
+		Constructor.
+
+		:Parameters:
+			diagonal : list
+				The items on the diagonal.
+		"""
+		self.diagonal = list( diagonal )
+		self._size = len( self.diagonal )
+
+	def _leftMultiply( self, rows ):
+		"""
+		Internal Function: self * rows, which scales each row.
+		"""
+		return [ [ d * x for x in row ] for d, row in zip( self.diagonal, rows ) ]
+
+	def _multiplyStructured( self, value ):
+		"""
+		Internal Function: a product of diagonal matrices is diagonal, and a diagonal
+		matrix times a triangular one is triangular.
+		"""
+		if isinstance( value, identityMatrix ):
+			return self
+		if isinstance( value, diagonalMatrix ):
+			return diagonalMatrix( map( mul, self.diagonal, value.diagonal ) )
+		if isinstance( value, triangularMatrix ):
+			rows = [ [ d * x for x in row ] for d, row in zip( self.diagonal, value._rows ) ]
+			return triangularMatrix._fromTriangle( rows, value.lower )
+		return NotImplemented
+
+	def _multiplyVector( self, vector ):
+		"""
+		Internal Function: self * vector
+		"""
+		return map( mul, self.diagonal, vector )
+
+	def _rightMultiply( self, rows ):
+		"""
+		Internal Function: rows * self, which scales each column.
+		"""
+		diagonal = self.diagonal
+		return [ map( mul, row, diagonal ) for row in rows ]
+
+	def _rightMultiplyStructured( self, value ):
+		"""
+		Internal Function: a triangular matrix times a diagonal one is triangular.
+		"""
+		if isinstance( value, triangularMatrix ):
+			diagonal = self.diagonal
+			if value.lower:
+				rows = [ map( mul, row, diagonal[ :len( row ) ] ) for row in value._rows ]
+			else:
+				rows = [ map( mul, row, diagonal[ i: ] ) for i, row in enumerate( value._rows ) ]
+			return triangularMatrix._fromTriangle( rows, value.lower )
+		return NotImplemented
+
+	def _row( self, i ):
+		"""
+		Internal Function: row i, in full.
+		"""
+		returnvalue = [ 0 ] * self._size
+		returnvalue[ i ] = self.diagonal[ i ]
+		return returnvalue
+
+	def _scale( self, value ):
+		"""
+		Internal Function: the matrix multiplied by a number.
+		"""
+		return diagonalMatrix( [ d * value for d in self.diagonal ] )
+
+	def _solveVector( self, b ):
+		"""
+		Internal Function: solves for a single right hand side.
+		"""
+		return map( _divide, b, self.diagonal )
+
+	def determinant( self ):
+		"""
+		Determinant: the product of the diagonal.
+
+		:rtype: number
+		:returns: The determinant
+		"""
+		return reduce( mul, self.diagonal, 1 )
+
+	def inverse( self ):
+		"""
+		Inverse: the reciprocals of the diagonal.
+
+		:rtype: diagonalMatrix
+		:returns: The inverse
+		"""
+		return diagonalMatrix( [ _divide( 1, d ) for d in self.diagonal ] )
+
+	def transpose( self ):
+		"""
+		Transpose, which is the same matrix.
+
+		:rtype: diagonalMatrix
+		:returns: A copy of the matrix.
+		"""
+		return diagonalMatrix( self.diagonal )
+
+
+class identityMatrix( diagonalMatrix ):
+	"""
+	An identity matrix, stored as its size alone.
+	"""
+
+	def __init__( self, size ):
+		"""
+		Constructor.
+
+		:Parameters:
+			size : int
+				The number of rows ( and columns ).
+		"""
+		self._size = size
+
+	def __getattr__( self, name ):
+		"""
+		Get attribute.
+
+		Call: ident.diagonal; ident.width; ident.height; ident.size
+
+		:returns: The value requested.
+		"""
+		if name == 'diagonal':
+			return [ 1 ] * self._size
+		return diagonalMatrix.__getattr__( self, name )
+
+	def _leftMultiply( self, rows ):
+		"""
+		Internal Function: self * rows, a copy of the rows.
+		"""
+		return [ list( row ) for row in rows ]
+
+	def _multiplyStructured( self, value ):
+		"""
+		Internal Function: the identity times any structured matrix is that matrix.
+		"""
+		return value
+
+	def _multiplyVector( self, vector ):
+		"""
+		Internal Function: self * vector
+		"""
+		return list( vector )
+
+	_rightMultiply = _leftMultiply
+
+	def _rightMultiplyStructured( self, value ):
+		"""
+		Internal Function: any structured matrix times the identity is that matrix.
+		"""
+		return value
+
+	def _scale( self, value ):
+		"""
+		Internal Function: the matrix multiplied by a number.
+		"""
+		return diagonalMatrix( [ value ] * self._size )
+
+	def _solveVector( self, b ):
+		"""
+		Internal Function: solves for a single right hand side.
+		"""
+		return list( b )
+
+	def determinant( self ):
+		"""
+		Determinant, which is 1.
+
+		:rtype: int
+		:returns: 1
+		"""
+		return 1
+
+	def inverse( self ):
+		"""
+		Inverse, which is the identity.
+
+		:rtype: identityMatrix
+		:returns: The identity
+		"""
+		return identityMatrix( self._size )
+
+	transpose = inverse
+
+
+class permutationMatrix( structuredMatrix ):
+	"""
+	A permutation matrix, stored as the column of the 1 in each row.
+	"""
+
+	def __init__( self, permutation ):
+		"""
+		Constructor.
+
+		:Parameters:
+			permutation : list
+				For each row, the column of its 1. Each of 0 to n - 1 must appear once.
+		"""
+		self.permutation = list( permutation )
+		self._size = len( self.permutation )
+		if not ( sorted( self.permutation ) == range( self._size ) ):
+			raise ValueError( "Not a permutation of 0 to %d" % ( self._size - 1 ) )
+
+	def _inversePermutation( self ):
+		"""
+		Internal Function: the row of the 1 in each column.
+		"""
+		returnvalue = [ 0 ] * self._size
+		for i, p in enumerate( self.permutation ):
+			returnvalue[ p ] = i
+		return returnvalue
+
+	def _leftMultiply( self, rows ):
+		"""
+		Internal Function: self * rows, which reorders the rows.
+		"""
+		return [ list( rows[ p ] ) for p in self.permutation ]
+
+	def _multiplyStructured( self, value ):
+		"""
+		Internal Function: a product of permutation matrices is a permutation matrix.
+		"""
+		if isinstance( value, identityMatrix ):
+			return self
+		if isinstance( value, permutationMatrix ):
+			other = value.permutation
+			return permutationMatrix( [ other[ p ] for p in self.permutation ] )
+		return NotImplemented
+
+	def _multiplyVector( self, vector ):
+		"""
+		Internal Function: self * vector
+		"""
+		return [ vector[ p ] for p in self.permutation ]
+
+	def _rightMultiply( self, rows ):
+		"""
+		Internal Function: rows * self, which reorders the columns.
+		"""
+		inverse = self._inversePermutation( )
+		return [ [ row[ k ] for k in inverse ] for row in rows ]
+
+	def _row( self, i ):
+		"""
+		Internal Function: row i, in full.
+		"""
+		returnvalue = [ 0 ] * self._size
+		returnvalue[ self.permutation[ i ] ] = 1
+		return returnvalue
+
+	def _scale( self, value ):
+		"""
+		Internal Function: the matrix multiplied by a number, which is no longer a permutation.
+		"""
+		return _matrix._fromRows( [ [ x * value for x in self._row( i ) ] for i in xrange( self._size ) ] )
+
+	def _solveVector( self, b ):
+		"""
+		Internal Function: solves for a single right hand side.
+		"""
+		return [ b[ k ] for k in self._inversePermutation( ) ]
+
+	def determinant( self ):
+		"""
+		Determinant: the sign of the permutation, from the number of even length cycles.
+
+		:rtype: int
+		:returns: 1 or -1
+		"""
+		returnvalue = 1
+		seen = [ False ] * self._size
+		for start in xrange( self._size ):
+			if seen[ start ]:
+				continue
+			length = 0
+			i = start
+			while not seen[ i ]:
+				seen[ i ] = True
+				i = self.permutation[ i ]
+				length += 1
+			if not ( length % 2 ):
+				returnvalue = -returnvalue
+		return returnvalue
+
+	def inverse( self ):
+		"""
+		Inverse, which is the transpose.
+
+		:rtype: permutationMatrix
+		:returns: The inverse
+		"""
+		return permutationMatrix( self._inversePermutation( ) )
+
+	transpose = inverse
+
+
+class triangularMatrix( structuredMatrix ):
+	"""
+	An upper or lower triangular matrix, stored as the part of each row on and above
+	( or below ) the diagonal.
+	"""
+
+	def __init__( self, value, lower = False ):
+		"""
+		Constructor. Items on the other side of the diagonal are ignored.
+
+		:Parameters:
+			value : matrix
+				A square matrix ( or 2-dimensional list ).
+			lower : boolean
+				If True the matrix is lower triangular, otherwise upper triangular.
+		"""
+		if isinstance( value, matrix ):
+			value = value.value
+		n = len( value )
+		if [ row for row in value if not ( len( row ) == n ) ]:
+			raise ValueError( "Triangular matrices must be square" )
+		if lower:
+			self._rows = [ list( row[ :i + 1 ] ) for i, row in enumerate( value ) ]
+		else:
+			self._rows = [ list( row[ i: ] ) for i, row in enumerate( value ) ]
+		self.lower = lower
+		self._size = n
+
+	@classmethod
+	def _fromTriangle( cls, rows, lower ):
+		"""
+		Internal Function: creates a triangular matrix from its stored rows, without copying them.
+		"""
+		returnvalue = cls.__new__( cls )
+		returnvalue._rows = rows
+		returnvalue.lower = lower
+		returnvalue._size = len( rows )
+		return returnvalue
+
+	def _leftMultiply( self, rows ):
+		"""
+		Internal Function: self * rows. Each row of the product is a combination of only
+		the rows on one side of the diagonal.
+		"""
+		width = rows and len( rows[ 0 ] )
+		returnvalue = list( )
+		for i, row in enumerate( self._rows ):
+			total = [ 0 ] * width
+			if self.lower:
+				pairs = zip( row, rows[ :i + 1 ] )
+			else:
+				pairs = zip( row, rows[ i: ] )
+			for t, other in pairs:
+				if t:
+					total = [ s + t * x for s, x in zip( total, other ) ]
+			returnvalue.append( total )
+		return returnvalue
+
+	def _multiplyStructured( self, value ):
+		"""
+		Internal Function: a product of triangular matrices on the same side is triangular.
+		"""
+		if isinstance( value, identityMatrix ):
+			return self
+		if isinstance( value, triangularMatrix ) and ( value.lower == self.lower ):
+			return triangularMatrix( self._leftMultiply( [ value._row( i ) for i in xrange( self._size ) ] ), self.lower )
+		return NotImplemented
+
+	def _multiplyVector( self, vector ):
+		"""
+		Internal Function: self * vector
+		"""
+		if self.lower:
+			return [ sum( map( mul, row, vector[ :i + 1 ] ) ) for i, row in enumerate( self._rows ) ]
+		return [ sum( map( mul, row, vector[ i: ] ) ) for i, row in enumerate( self._rows ) ]
+
+	def _rightMultiply( self, rows ):
+		"""
+		Internal Function: rows * self. Each column of the triangle is a stored row of
+		the transpose, and only meets the matching part of each row.
+		"""
+		columns = self.transpose( )._rows
+		if self.lower:
+			return [ [ sum( map( mul, row[ j: ], column ) ) for j, column in enumerate( columns ) ] for row in rows ]
+		return [ [ sum( map( mul, row[ :j + 1 ], column ) ) for j, column in enumerate( columns ) ] for row in rows ]
+
+	def _row( self, i ):
+		"""
+		Internal Function: row i, in full.
+		"""
+		if self.lower:
+			return self._rows[ i ] + [ 0 ] * ( self._size - i - 1 )
+		return [ 0 ] * i + self._rows[ i ]
+
+	def _scale( self, value ):
+		"""
+		Internal Function: the matrix multiplied by a number.
+		"""
+		return triangularMatrix._fromTriangle( [ [ x * value for x in row ] for row in self._rows ], self.lower )
+
+	def _solveVector( self, b ):
+		"""
+		Internal Function: solves for a single right hand side by forward ( lower ) or
+		back ( upper ) substitution.
+		"""
+		n = self._size
+		x = list( b )
+		if self.lower:
+			for i, row in enumerate( self._rows ):
+				x[ i ] = _divide( x[ i ] - sum( map( mul, row[ :i ], x[ :i ] ) ), row[ i ] )
+		else:
+			for i in xrange( n - 1, -1, -1 ):
+				row = self._rows[ i ]
+				x[ i ] = _divide( x[ i ] - sum( map( mul, row[ 1: ], x[ i + 1: ] ) ), row[ 0 ] )
+		return x
+
+	def diagonal( self ):
+		"""
+		The items on the diagonal.
+
+		:rtype: list
+		:returns: The diagonal
+		"""
+		if self.lower:
+			return [ row[ -1 ] for row in self._rows ]
+		return [ row[ 0 ] for row in self._rows ]
+
+	def determinant( self ):
+		"""
+		Determinant: the product of the diagonal.
+
+		:rtype: number
+		:returns: The determinant
+		"""
+		return reduce( mul, self.diagonal( ), 1 )
+
+	def inverse( self ):
+		"""
+		Inverse, which is triangular on the same side. Column j is found by substitution
+		through only the rows which can be nonzero in it.
+
+		:rtype: triangularMatrix
+		:returns: The inverse
+		"""
+		n = self._size
+		for d in self.diagonal( ):
+			if not d:
+				raise ValueError( 'This matrix is not invertible' )
+		columns = list( )
+		for j in xrange( n ):
+			if self.lower:
+				# the column is zero above row j, so solve the trailing system
+				part = triangularMatrix._fromTriangle( [ row[ j: ] for row in self._rows[ j: ] ], True )
+				columns.append( [ 0 ] * j + part._solveVector( [ 1 ] + [ 0 ] * ( n - j - 1 ) ) )
+			else:
+				# the column is zero below row j, so solve the leading system
+				part = triangularMatrix._fromTriangle( [ row[ :j + 1 - i ] for i, row in enumerate( self._rows[ :j + 1 ] ) ], False )
+				columns.append( part._solveVector( [ 0 ] * j + [ 1 ] ) + [ 0 ] * ( n - j - 1 ) )
+		return triangularMatrix( [ list( row ) for row in zip( *columns ) ], self.lower )
+
+	def transpose( self ):
+		"""
+		Transpose, which is triangular on the other side.
+
+		:rtype: triangularMatrix
+		:returns: The transpose
+		"""
+		n = self._size
+		rows = self._rows
+		if self.lower:
+			# column j of a lower triangle runs from row j down
+			return triangularMatrix._fromTriangle( [ [ rows[ k ][ j ] for k in xrange( j, n ) ] for j in xrange( n ) ], False )
+		# column j of an upper triangle runs from row 0 to row j
+		return triangularMatrix._fromTriangle( [ [ rows[ k ][ j - k ] for k in xrange( j + 1 ) ] for j in xrange( n ) ], True )
+
+
+def _isOne( x ):
+	"""
+	Internal Function: checks for an item which is exactly the int 1, or a fraction equal
+	to it. fraction comparisons are rounded, so near 1 fractions must not pass.
+	"""
+	if ( type( x ) in ( types.IntType, types.LongType ) ):
+		return x == 1
+	if ( type( x ) == fraction ):
+		return ( x.numerator == x.denominator ) and \
+			( type( x.numerator ) in ( types.IntType, types.LongType ) )
+	return False
+
+def detect( value ):
+	"""
+	Finds the structure of a square matrix, stopping at the first item which rules
+	each structure out. The check takes O( n ** 2 ) time at most, and usually very
+	little for a matrix with no structure.
+
+	:Parameters:
+		value : matrix
+			A square matrix ( or 2-dimensional list ).
+
+	:rtype: structuredMatrix
+	:returns: An identity, diagonal, permutation or triangular matrix with the same \
+	items, or None if the matrix has none of those structures.
+	"""
+	if isinstance( value, matrix ):
+		value = value.value
+	n = len( value )
+	if [ row for row in value if not ( len( row ) == n ) ]:
+		return None
+	upper = lower = True
+	for i, row in enumerate( value ):
+		if lower and [ x for x in row[ i + 1: ] if x ]:
+			lower = False
+		if upper and [ x for x in row[ :i ] if x ]:
+			upper = False
+		if not ( upper or lower ):
+			break
+	if upper and lower:
+		diagonal = [ value[ i ][ i ] for i in xrange( n ) ]
+		if not [ d for d in diagonal if not ( ( type( d ) in ( types.IntType, types.LongType ) ) and ( d == 1 ) ) ]:
+			return identityMatrix( n )
+		return diagonalMatrix( diagonal )
+	if upper or lower:
+		return triangularMatrix( value, lower )
+	permutation = list( )
+	for row in value:
+		ones = [ j for j, x in enumerate( row ) if x ]
+		if not ( len( ones ) == 1 ) or not _isOne( row[ ones[ 0 ] ] ):
+			return None
+		permutation.append( ones[ 0 ] )
+	if not ( sorted( permutation ) == range( n ) ):
+		return None
+	return permutationMatrix( permutation )